@@ -1,20 +1,42 @@
+import os
+
+import requests
 import streamlit as st
-from main import main  # Import your combined agent from main.py
 
-# Initialize the combined agent
-agent = main()
+# The pipeline runs in the resident proposal service (python service.py); this UI
+# only calls its API, so a Streamlit rerun never reloads models or reruns main()
+SERVICE_URL = os.getenv("PROPOSAL_SERVICE_URL", "http://127.0.0.1:8000")
+
+
+@st.cache_resource
+def get_session():
+    # One keep-alive session per UI process, shared across reruns
+    return requests.Session()
+
 
 # Streamlit UI
-st.title("Your Multi-Agent System")
+st.title("AI/ML Use Case Proposal Generator")
 
-# Input field for user query
-user_input = st.text_input("Enter your query:")
+# Input fields for the target company
+company = st.text_input("Company:", "Apple Inc.")
+industry = st.text_input("Industry:", "Technology and Consumer Electronics")
 
-# Button to trigger the agent
-if st.button("Run"):
-    # Run the agent with the user input
+# Button to request a proposal from the service
+if st.button("Generate proposal"):
     try:
-        response = agent.run(user_input)  # Ensure this matches your method in main.py
-        st.write("Response:", response)
-    except Exception as e:
-        st.error(f"Error: {e}")
\ No newline at end of file
+        with st.spinner("Generating proposal..."):
+            response = get_session().post(
+                f"{SERVICE_URL}/proposals",
+                json={"company": company, "industry": industry, "formats": ["markdown"]},
+                timeout=600,
+            )
+        payload = response.json()
+        if response.status_code != 200:
+            st.error(f"Error: {payload.get('error', response.reason)}")
+        else:
+            proposal = payload["proposals"]["markdown"]
+            st.caption(f"Generated in {payload['elapsed_ms'] / 1000:.1f} s")
+            st.download_button("Download proposal", proposal, file_name="AI_ML_Proposal.md")
+            st.markdown(proposal)
+    except requests.RequestException as e:
+        st.error(f"Proposal service unavailable at {SERVICE_URL}: {e}")
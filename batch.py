@@ -0,0 +1,288 @@
+"""
+Batch entry point that runs many company/industry targets through the pipeline.
+
+Targets are read from a CSV (``company,industry`` columns) or JSONL file (objects
+with ``company`` and ``industry`` keys). Each stage runs on its own bounded worker
+pool so research for one target overlaps with generation and resource search for
+others. The BERT model, HTTP sessions, response cache and document store are
+loaded once and shared by every target.
+
+Every finished stage is appended to a JSONL checkpoint, so rerunning the same
+command after a crash resumes each target from its last completed stage.
+
+Usage:
+    python batch.py targets.csv --checkpoint batch_checkpoint.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from embedding_cache import EmbeddingCache
+from github_search import GITHUB_SEARCH_URL, GitHubSearch
+from http_session import create_session
+from industry_research_agent import FACETS, SERPER_SEARCH_URL, IndustryResearchAgent
+from proposal import ProposalAgent
+from proposal_renderer import FORMATS
+from resource_asset_agent import ResourceAssetAgent
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from search_results import SearchResults
+import tracing
+from use_case_generation_agent import DocumentStore, RAGAgent, SimpleEmbedding
+
+STAGES = ["research", "use_cases", "resources", "proposal"]
+
+
+def load_targets(path):
+    """
+    Reads company/industry targets from a CSV or JSONL file.
+
+    Returns:
+        list: Dicts with ``company`` and ``industry`` keys, in file order.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [
+        {"company": row["company"].strip(), "industry": row["industry"].strip()}
+        for row in rows
+    ]
+
+
+def target_key(target):
+    return f"{target['company']}|{target['industry']}".lower()
+
+
+def _as_text(data):
+    # Same conversion main.py applies before handing research data to the RAG agent
+    if isinstance(data, str):
+        return data
+    return data.to_text() if isinstance(data, SearchResults) else str(data)
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of completed stages, one record per target and stage.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            valid_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    valid_bytes += len(line)
+                    self.completed.setdefault(record["key"], {})[record["stage"]] = record["result"]
+            # Drop a torn final line left by a crash mid-write
+            if valid_bytes != os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid_bytes)
+
+    def get(self, key, stage):
+        return self.completed.get(key, {}).get(stage)
+
+    def record(self, key, stage, result):
+        line = json.dumps({"key": key, "stage": stage, "result": result})
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.completed.setdefault(key, {})[stage] = result
+
+
+class BatchRunner:
+    """
+    Runs targets through the four pipeline stages with per-stage worker pools.
+
+    Args:
+        checkpoint (Checkpoint): Progress log used to skip completed stages.
+        output_dir (str): Directory the proposals are written to.
+        workers (dict): Worker count per stage name.
+        max_in_flight (int): Number of targets moving through the pipeline at once.
+        cache (ResponseCache): Response cache shared by every agent.
+        formats (list): Proposal formats written per target, rendered in one pass.
+    """
+
+    def __init__(self, checkpoint, output_dir="output", workers=None, max_in_flight=8, cache=None,
+                 formats=("markdown",)):
+        self.checkpoint = checkpoint
+        self.output_dir = output_dir
+        self.formats = list(formats)
+        self.max_in_flight = max_in_flight
+        self.cache = cache or ResponseCache()
+        workers = {"research": 4, "use_cases": 2, "resources": 4, "proposal": 2, **(workers or {})}
+        self.pools = {stage: ThreadPoolExecutor(max_workers=workers[stage], thread_name_prefix=stage)
+                      for stage in STAGES}
+
+        # Shared, loaded once for the whole batch
+        self.serper_key = os.getenv("SERPER_API_KEY")
+        self.groq_key = os.getenv("GROQ_API_KEY")
+        self.github_key = os.getenv("GITHUB_API_KEY")
+        # Same endpoint and model overrides as main.py
+        self.serper_url = os.getenv("SERPER_BASE_URL", SERPER_SEARCH_URL)
+        self.serper_session = create_session(workers["research"] * len(FACETS))
+        self.github_session = create_session(workers["resources"])
+        # One client, so every target draws on the same GitHub rate-limit budget
+        self.github_search = GitHubSearch(self.github_key, session=self.github_session,
+                                          base_url=os.getenv("GITHUB_SEARCH_URL", GITHUB_SEARCH_URL))
+        self.embedding_model = SimpleEmbedding(
+            os.getenv("PIPELINE_EMBEDDING_MODEL", "bert-base-uncased"), cache=EmbeddingCache(),
+            backend=os.getenv("PIPELINE_EMBEDDING_BACKEND", "fp32"),
+            num_threads=int(os.getenv("PIPELINE_EMBEDDING_THREADS", 0)) or None,
+        )
+        self.embedding_model.warm_up()
+        self.document_store = DocumentStore()
+        # None gives every target its own in-memory index; ProposalService sets a
+        # persistent one shared across requests
+        self.vector_store = None
+        self.retrieval = os.getenv("PIPELINE_RETRIEVAL", "hybrid")
+        self.context_tokens = int(os.getenv("PIPELINE_CONTEXT_TOKENS", 2048)) or None
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def research(self, target):
+        agent = IndustryResearchAgent(target["company"], target["industry"], self.serper_key,
+                                      base_url=self.serper_url, session=self.serper_session, cache=self.cache)
+        results = agent.run()
+        if all(value is None for value in results.values()):
+            # Raise rather than checkpoint empty research, so a rerun retries it
+            raise RuntimeError("Research failed for every facet")
+        return {
+            "industry_data": _as_text(results.get("industry_data")),
+            "company_data": _as_text(results.get("company_data")),
+            # Compact dicts, so the checkpoint stays small and JSON-serializable
+            "facets": {facet: value and value.to_dict() for facet, value in results.items()},
+        }
+
+    def use_cases(self, research):
+        agent = RAGAgent(research["industry_data"], research["company_data"], api_key=self.groq_key,
+                         cache=self.cache, embedding_model=self.embedding_model,
+                         document_store=self.document_store, index_path=None,
+                         research=research.get("facets"), retrieval=self.retrieval,
+                         context_tokens=self.context_tokens, vector_store=self.vector_store)
+        use_cases = agent.generate_use_cases()
+        if not use_cases:
+            raise RuntimeError("Use case generation failed")
+        # Plain dicts so the stage result can be checkpointed as JSON
+        return [use_case.to_dict() for use_case in use_cases]
+
+    def resources(self, use_cases):
+        agent = ResourceAssetAgent(use_cases, self.github_key, cache=self.cache, session=self.github_session,
+                                   search_engine=self.github_search)
+        return agent.search_datasets()
+
+    def proposal(self, target, research, use_cases, datasets):
+        agent = ProposalAgent({"industry": target["industry"]}, {"company_name": target["company"]},
+                              use_cases, datasets)
+        slug = re.sub(r"[^a-z0-9]+", "_", target["company"].lower()).strip("_")
+        paths = {fmt: os.path.join(self.output_dir, f"{slug}_AI_ML_Proposal.{FORMATS[fmt].extension}")
+                 for fmt in self.formats}
+        files = {fmt: open(path, "w", encoding="utf-8") for fmt, path in paths.items()}
+        try:
+            agent.write_formats(files)
+        finally:
+            for f in files.values():
+                f.close()
+        return ", ".join(paths.values())
+
+    @staticmethod
+    def _run_stage(stage, fn, *args):
+        with tracing.span(f"stage.{stage}"):
+            return fn(*args)
+
+    def _stage(self, key, stage, fn, *args):
+        # Resume from the checkpoint, otherwise run on the stage's own pool
+        result = self.checkpoint.get(key, stage)
+        if result is None:
+            result = self.pools[stage].submit(self._run_stage, stage, fn, *args).result()
+            self.checkpoint.record(key, stage, result)
+        return result
+
+    def run_target(self, target):
+        key = target_key(target)
+        research = self._stage(key, "research", self.research, target)
+        use_cases = self._stage(key, "use_cases", self.use_cases, research)
+        datasets = self._stage(key, "resources", self.resources, use_cases)
+        return self._stage(key, "proposal", self.proposal, target, research, use_cases, datasets)
+
+    def run(self, targets):
+        """
+        Runs every target and returns a summary of completed and failed targets.
+        """
+        summary = {"completed": 0, "skipped": 0, "failed": []}
+        pending = []
+        for target in targets:
+            if self.checkpoint.get(target_key(target), "proposal") is not None:
+                summary["skipped"] += 1
+            else:
+                pending.append(target)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="target") as drivers:
+            futures = [(target, drivers.submit(self.run_target, target)) for target in pending]
+            for target, future in futures:
+                try:
+                    path = future.result()
+                    summary["completed"] += 1
+                    print(f"[{summary['completed']}/{len(pending)}] {target['company']}: {path}")
+                except Exception as e:
+                    summary["failed"].append({"target": target, "error": str(e)})
+                    print(f"Failed {target['company']} ({target['industry']}): {e}")
+                    traceback.print_exc()
+
+        for pool in self.pools.values():
+            pool.shutdown()
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the proposal pipeline over many targets.")
+    parser.add_argument("targets", help="CSV or JSONL file of company/industry targets")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl")
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--formats", default="markdown",
+                        help=f"Comma-separated proposal formats ({', '.join(FORMATS)})")
+    parser.add_argument("--trace-report", help="Write a per-stage timing report (JSON) to this path")
+    parser.add_argument("--chrome-trace", help="Write a Chrome trace of every stage call to this path")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage.replace('_', '-')}-workers", type=int, dest=f"{stage}_workers")
+    args = parser.parse_args()
+
+    load_dotenv()
+    workers = {stage: getattr(args, f"{stage}_workers") for stage in STAGES
+               if getattr(args, f"{stage}_workers")}
+    tracer = tracing.enable() if args.trace_report or args.chrome_trace else None
+    cache = ResponseCache(path=os.getenv("PIPELINE_CACHE_PATH", DEFAULT_CACHE_PATH))
+    runner = BatchRunner(Checkpoint(args.checkpoint), args.output_dir, workers, args.max_in_flight, cache,
+                         formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()])
+    summary = runner.run(load_targets(args.targets))
+
+    print(f"\nCompleted: {summary['completed']}  Skipped: {summary['skipped']}  Failed: {len(summary['failed'])}")
+    print("Response cache:", cache.stats())
+    if tracer is not None:
+        tracing.disable()
+        if args.trace_report:
+            tracer.write_report(args.trace_report)
+        if args.chrome_trace:
+            tracer.write_chrome_trace(args.chrome_trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Recall@k versus latency for the IVF index against exact FlatIndex search.
+
+The corpus is a synthetic mixture of clusters, which is closer to embedded
+research text than uniformly random vectors.
+
+Usage:
+    python -m benchmarks.bench_ann --vectors 200000 --nlist 512 --nprobe 1 4 16 64
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from vector_index import FlatIndex, IVFIndex
+
+
+def clustered_vectors(rng, n, dimension, clusters, spread):
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    vectors = centers[rng.integers(0, clusters, n)]
+    vectors += spread * rng.standard_normal((n, dimension), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def run_queries(index, queries, top_k):
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = index.search(query, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(rows)
+    return results, statistics.median(timings), np.percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=1000, help="clusters in the synthetic data")
+    parser.add_argument("--spread", type=float, default=1.0, help="noise around each cluster centre")
+    parser.add_argument("--nlist", type=int, default=316)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(rng, args.vectors + args.queries, args.dimension, args.clusters, args.spread)
+    corpus, queries = data[:args.vectors], data[args.vectors:]
+    ids = np.arange(args.vectors)
+    spans = np.zeros((args.vectors, 2), dtype=np.int64)
+
+    exact = FlatIndex(args.dimension, initial_capacity=args.vectors)
+    exact.add(corpus, ids, spans)
+    truth, exact_p50, exact_p99 = run_queries(exact, queries, args.top_k)
+
+    ivf = IVFIndex(args.dimension, nlist=args.nlist, train_size=args.vectors + 1,
+                   initial_capacity=args.vectors)
+    ivf.add(corpus, ids, spans)
+    start = time.perf_counter()
+    ivf.train()
+    train_s = time.perf_counter() - start
+
+    print(f"{args.vectors} vectors, dim {args.dimension}, nlist {ivf.nlist}, k-means train {train_s:.1f}s")
+    print(f"{'backend':>12} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'exact':>12} {1.0:10.3f} {exact_p50:8.2f} {exact_p99:8.2f}")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        results, p50, p99 = run_queries(ivf, queries, args.top_k)
+        recall = np.mean([len(set(r) & set(t)) / len(t) for r, t in zip(results, truth)])
+        print(f"{'ivf/' + str(nprobe):>12} {recall:10.3f} {p50:8.2f} {p99:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures prompt size under context token budgets and completion cache reuse.
+
+Research comes from the local Serper stand-in and completions from the local
+Groq stand-in, so the prompts counted are the ones that reached the server.
+Each budget builds a fresh RAGAgent over the same research and generates once;
+"whole" is the unbudgeted path that joins the retrieved documents. The cache
+section then reruns generation against a ResponseCache, as a batch rerun would,
+and counts the completion requests that still go upstream.
+
+Usage:
+    python -m benchmarks.bench_context_budget --model /path/to/small-bert --budgets 0 4096 2048 1024
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeGroq, FakeSerper, sample_use_cases
+from document_store import DocumentStore
+from industry_research_agent import IndustryResearchAgent
+from response_cache import ResponseCache
+from use_case_generation_agent import RAGAgent, SimpleEmbedding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="bert-base-uncased")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 4096, 2048, 1024, 512],
+                        help="context token budgets; 0 joins whole documents")
+    parser.add_argument("--context-size", type=int, default=16, help="documents retrieved per prompt")
+    parser.add_argument("--serper-results", type=int, default=20)
+    parser.add_argument("--snippet-words", type=int, default=150)
+    parser.add_argument("--use-cases", type=int, default=10)
+    args = parser.parse_args()
+
+    embedding = SimpleEmbedding(args.model)
+    embedding.warm_up(background=False)
+    content = sample_use_cases(args.use_cases, as_json=True)
+
+    with tempfile.TemporaryDirectory() as directory, \
+            FakeSerper(results=args.serper_results, snippet_words=args.snippet_words, rich=True) as serper, \
+            FakeGroq(content=content) as groq:
+        research = IndustryResearchAgent("Example Corp", "Technology", "test-key", base_url=serper.search_url).run()
+        store = DocumentStore(os.path.join(directory, "documents.jsonl"))
+
+        def agent(budget, cache=None, **params):
+            return RAGAgent(research["industry_data"].to_text(), research["company_data"].to_text(),
+                            api_key="test-key", base_url=groq.url, embedding_model=embedding,
+                            document_store=store, index_path=None, research=research,
+                            context_size=args.context_size, context_tokens=budget or None,
+                            cache=cache, **params)
+
+        def prompt_tokens():
+            prompt = groq.completions[-1]["messages"][0]["content"]
+            return len(embedding.tokenize(prompt, add_special_tokens=False)["input_ids"])
+
+        print(f"{args.context_size} retrieved documents, {args.serper_results} hits x "
+              f"{args.snippet_words}-word snippets per search\n")
+        print(f"{'budget':>7} {'prompt tokens':>13} {'chunks packed':>13} {'prompt ms':>9} {'use cases':>9}")
+        for budget in args.budgets:
+            rag = agent(budget)
+            start = time.perf_counter()
+            rag._build_prompt()
+            build_ms = (time.perf_counter() - start) * 1000
+            use_cases = rag.generate_use_cases() or []
+            report = rag.context_report if budget else {}
+            packed = f"{report['packed']}/{report['chunks']}" if report else "-"
+            print(f"{budget or 'whole':>7} {prompt_tokens():13d} {packed:>13} {build_ms:9.1f} {len(use_cases):9d}")
+
+        cache = ResponseCache(path=os.path.join(directory, "responses.sqlite"))
+        runs = [("first run", {}), ("rerun", {}), ("rerun, temperature 0.2", {"temperature": 0.2}),
+                ("rerun, temperature 0.2", {"temperature": 0.2})]
+        print(f"\n{'completion cache':<24} {'upstream requests':>17}")
+        for label, params in runs:
+            before = groq.request_count
+            agent(args.budgets[-1], cache=cache, **params).generate_use_cases()
+            print(f"{label:<24} {groq.request_count - before:17d}")
+
+
+if __name__ == "__main__":
+    main()
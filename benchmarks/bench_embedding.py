@@ -0,0 +1,55 @@
+"""
+Compares per-document SimpleEmbedding.encode calls with batched encode_batch.
+
+Usage:
+    python -m benchmarks.bench_embedding --docs 256 --batch-size 16
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from use_case_generation_agent import SimpleEmbedding
+
+WORDS = ("apple technology industry ai ml market customer growth data privacy services "
+         "revenue forecast sentiment supply chain devices cloud analytics retail").split()
+
+
+def synthetic_docs(count, min_words, max_words, seed=0):
+    # Mixed lengths, as with real Serper snippets and full research payloads
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="bert-base-uncased")
+    parser.add_argument("--docs", type=int, default=128)
+    parser.add_argument("--min-words", type=int, default=5)
+    parser.add_argument("--max-words", type=int, default=400)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    model = SimpleEmbedding(args.model, batch_size=args.batch_size)
+    docs = synthetic_docs(args.docs, args.min_words, args.max_words)
+    model.encode_batch(docs[:2])  # warm-up
+
+    start = time.perf_counter()
+    per_doc = np.vstack([model.encode(doc) for doc in docs])
+    per_doc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = model.encode_batch(docs)
+    batched_time = time.perf_counter() - start
+
+    print(f"documents           : {args.docs} ({args.min_words}-{args.max_words} words)")
+    print(f"per-document encode : {args.docs / per_doc_time:8.1f} docs/sec")
+    print(f"encode_batch        : {args.docs / batched_time:8.1f} docs/sec (batch_size={args.batch_size})")
+    print(f"speedup             : {per_doc_time / batched_time:.2f}x")
+    print(f"max abs difference  : {np.abs(per_doc - batched).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
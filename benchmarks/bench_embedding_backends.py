@@ -0,0 +1,101 @@
+"""
+Compares SimpleEmbedding backends with the fp32 model: encode latency, model
+memory footprint, and how closely retrieval agrees with fp32.
+
+Agreement is the fraction of the fp32 top-k documents that each backend also
+returns in its top-k, averaged over the queries; for the same model the mean
+cosine similarity between the two backends' document vectors is shown too.
+
+Usage:
+    python -m benchmarks.bench_embedding_backends --model bert-base-uncased --threads 4
+    python -m benchmarks.bench_embedding_backends --configs fp32 int8 small small:int8
+"""
+import argparse
+import gc
+import io
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.bench_embedding import synthetic_docs
+from use_case_generation_agent import SimpleEmbedding
+
+
+def model_megabytes(model):
+    # Serialized state dict size; unlike summing parameters() it also counts the
+    # packed int8 weights that dynamic quantization stores outside the parameters
+    import torch
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def parse_config(config, default_model):
+    # "int8" -> default model, int8; "small:int8" -> small model, int8; "small" -> fp32
+    model, _, backend = config.rpartition(":") if ":" in config else ("", "", config)
+    if backend not in ("fp32", "int8"):
+        model, backend = backend, "fp32"
+    return model or default_model, backend
+
+
+def top_k(doc_vectors, query_vectors, k):
+    scores = query_vectors @ doc_vectors.T
+    return [set(np.argsort(row)[::-1][:k]) for row in scores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="bert-base-uncased", help="fp32 baseline model")
+    parser.add_argument("--configs", nargs="+", default=["fp32", "int8", "small"],
+                        help="[model:]backend entries; a bare model name runs it in fp32")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--docs", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    docs = synthetic_docs(args.docs, 5, 120)
+    queries = synthetic_docs(args.queries, 3, 8, seed=1)
+    baseline = None
+    print(f"{args.docs} documents, {args.queries} queries, top-{args.top_k}, threads={args.threads or 'default'}\n")
+    print(f"{'config':<42} {'model MB':>9} {'docs/s':>8} {'query ms':>9} {'agreement':>10} {'cosine':>7}")
+    for config in ["fp32"] + [c for c in args.configs if c != "fp32"]:
+        model_name, backend = parse_config(config, args.model)
+        embedding = SimpleEmbedding(model_name, batch_size=args.batch_size, backend=backend,
+                                    num_threads=args.threads)
+        label = embedding.version
+        try:
+            embedding.encode_batch(docs[:2])  # load and warm up
+        except Exception as e:
+            print(f"{label:<42} unavailable: {e}")
+            continue
+
+        start = time.perf_counter()
+        doc_vectors = embedding.encode_batch(docs)
+        docs_per_second = len(docs) / (time.perf_counter() - start)
+        query_times, query_vectors = [], []
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(embedding.encode(query)[0])
+            query_times.append(time.perf_counter() - start)
+        query_vectors = np.vstack(query_vectors)
+        hits = top_k(doc_vectors, query_vectors, args.top_k)
+
+        if baseline is None:
+            baseline = (embedding.model_name, doc_vectors, hits)
+            agreement, cosine = 1.0, 1.0
+        else:
+            agreement = statistics.mean(len(a & b) / args.top_k for a, b in zip(baseline[2], hits))
+            same_space = embedding.model_name == baseline[0]
+            cosine = float(np.mean(np.sum(doc_vectors * baseline[1], axis=1))) if same_space else None
+        print(f"{label:<42} {model_megabytes(embedding.model):9.1f} {docs_per_second:8.1f} "
+              f"{statistics.median(query_times) * 1000:9.2f} {agreement:10.3f} "
+              f"{'-' if cosine is None else f'{cosine:.4f}':>7}")
+        del embedding
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
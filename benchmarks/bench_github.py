@@ -0,0 +1,60 @@
+"""
+Compares one-at-a-time GitHub searches with the concurrent, rate-limited
+ResourceAssetAgent against a local GitHub stand-in that enforces a rate limit.
+
+Usage:
+    python -m benchmarks.bench_github --use-cases 20 --rate-limit 10 --window 2 --latency 0.05
+"""
+import argparse
+import time
+
+from benchmarks.fake_services import FakeGitHub
+from github_search import GitHubSearch, RateLimiter
+from http_session import create_session
+from resource_asset_agent import ResourceAssetAgent
+
+
+def naive_search(github, queries):
+    # The old behaviour: one request per use case in turn, with no limiter or retries
+    session = create_session(1)
+    failed = 0
+    for query in queries:
+        response = session.get(github.search_url, params={"q": f"{query} dataset"})
+        failed += response.status_code != 200
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--use-cases", type=int, default=20)
+    parser.add_argument("--rate-limit", type=int, default=10, help="requests allowed per window")
+    parser.add_argument("--window", type=float, default=2.0, help="rate-limit window (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake per-request latency (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    queries = [f"use case {i}" for i in range(args.use_cases)]
+
+    with FakeGitHub(rate_limit=args.rate_limit, window=args.window, latency=args.latency) as github:
+        start = time.perf_counter()
+        naive_failed = naive_search(github, queries)
+        naive = time.perf_counter() - start
+
+    with FakeGitHub(rate_limit=args.rate_limit, window=args.window, latency=args.latency) as github:
+        engine = GitHubSearch("test-key", base_url=github.search_url, backoff=0.1,
+                              limiter=RateLimiter(args.rate_limit / args.window, capacity=args.rate_limit))
+        agent = ResourceAssetAgent(queries, "test-key", max_workers=args.workers, search_engine=engine)
+        start = time.perf_counter()
+        results = agent.search_datasets()
+        limited = time.perf_counter() - start
+        limited_failed = sum(not entry["datasets"] for entry in results)
+        throttled = github.throttled
+
+    print(f"use cases                : {args.use_cases} ({args.rate_limit} requests / {args.window:.0f} s allowed)")
+    print(f"sequential, no limiter   : {naive:.2f} s, {naive_failed} searches throttled away")
+    print(f"concurrent, rate-limited : {limited:.2f} s, {limited_failed} failed, "
+          f"{throttled} throttled responses, {engine.retries} retries, "
+          f"{engine.limiter.waited:.2f} s waiting on the limiter across workers")
+
+
+if __name__ == "__main__":
+    main()
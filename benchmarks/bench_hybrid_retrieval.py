@@ -0,0 +1,119 @@
+"""
+Compares dense, lexical (BM25) and hybrid (reciprocal rank fusion) retrieval.
+
+The synthetic corpus mimics research records: every document pairs a topic's
+vocabulary with one company's ticker and product name. Entity queries name a
+ticker or product plus generic words, and hit when that company's document is
+in the top-k. Topic queries use only topic words, and score the fraction of the
+top-k sharing the topic. Latency is the median per query, through
+RAGAgent.retrieve with a warm model.
+
+Usage:
+    python -m benchmarks.bench_hybrid_retrieval --model /path/to/small-bert --docs 2000 --queries 100
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from benchmarks.bench_embedding import WORDS
+from document_store import DocumentStore
+from use_case_generation_agent import RETRIEVAL_MODES, RAGAgent, SimpleEmbedding
+
+TOPICS = [
+    "battery energy storage grid charging",
+    "fraud payments chargeback risk scoring",
+    "clinical trials patients diagnosis imaging",
+    "warehouse logistics routing fleet delivery",
+    "streaming subscribers churn content engagement",
+    "semiconductor fabrication yield wafer lithography",
+    "insurance claims underwriting policy premiums",
+    "retail inventory shelf pricing promotions",
+]
+
+
+def synthetic_corpus(count, words, seed=0):
+    # (text, topic, ticker, product) per document; tickers and products are unique
+    rng = random.Random(seed)
+    corpus, seen = [], set()
+    while len(corpus) < count:
+        ticker = "".join(rng.choice(string.ascii_uppercase) for _ in range(4))
+        product = f"{''.join(rng.choice(string.ascii_lowercase) for _ in range(6)).capitalize()} {rng.randint(2, 99)}"
+        if ticker in seen or product in seen:
+            continue
+        seen.update((ticker, product))
+        topic = rng.randrange(len(TOPICS))
+        body = rng.choices(TOPICS[topic].split(), k=words // 3) + rng.choices(WORDS, k=words - words // 3)
+        rng.shuffle(body)
+        text = f"{ticker} ({product}): {' '.join(body)}"
+        corpus.append((text, topic, ticker, product))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="bert-base-uncased")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=40, help="words per document")
+    parser.add_argument("--queries", type=int, default=100, help="queries of each kind")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=RETRIEVAL_MODES, default=list(RETRIEVAL_MODES))
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    corpus = synthetic_corpus(args.docs, args.words)
+    embedding = SimpleEmbedding(args.model)
+    embedding.warm_up(background=False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = DocumentStore(os.path.join(directory, "documents.jsonl"))
+        agent = RAGAgent("industry context", "company context", embedding_model=embedding,
+                         document_store=store, index_path=None)
+        start = time.perf_counter()
+        doc_ids = agent.add_knowledge_batch([(text, {"type": "synthetic"}) for text, *_ in corpus])
+        ingest = time.perf_counter() - start
+        start = time.perf_counter()
+        len(store.lexical_index)  # first use scans the store
+        lexical_build = time.perf_counter() - start
+        # Later additions update the built BM25 index in place
+        extra = synthetic_corpus(100, args.words, seed=2)
+        start = time.perf_counter()
+        extra_ids = agent.add_knowledge_batch([(text, {"type": "synthetic"}) for text, *_ in extra])
+        incremental = time.perf_counter() - start
+
+        topic_of = {doc_id: topic for doc_id, (_, topic, _, _) in zip(doc_ids + extra_ids, corpus + extra)}
+        entity_queries = []
+        for position in rng.sample(range(len(corpus)), min(args.queries, len(corpus))):
+            _, _, ticker, product = corpus[position]
+            entity = ticker if rng.random() < 0.5 else product
+            entity_queries.append((f"{entity} {' '.join(rng.choices(WORDS, k=4))}", doc_ids[position]))
+        topic_queries = [(" ".join(rng.sample(TOPICS[topic].split(), 3)), topic)
+                         for topic in (rng.randrange(len(TOPICS)) for _ in range(args.queries))]
+
+        print(f"{args.docs} documents of {args.words} words, top-{args.top_k}")
+        print(f"ingest (store + embed): {ingest:.2f} s, BM25 build from store: {lexical_build * 1000:.1f} ms, "
+              f"100 incremental adds (store + BM25 + embed): {incremental * 1000:.1f} ms\n")
+        print(f"{'mode':<8} {'entity hit@k':>12} {'topic prec@k':>12} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode in args.modes:
+            agent.retrieve(entity_queries[0][0], args.top_k, mode=mode)  # warm up
+            timings, hits, precision = [], 0, []
+            for query, target in entity_queries:
+                start = time.perf_counter()
+                results = agent.retrieve(query, args.top_k, mode=mode)
+                timings.append(time.perf_counter() - start)
+                hits += any(doc_id == target for doc_id, _ in results)
+            for query, topic in topic_queries:
+                start = time.perf_counter()
+                results = agent.retrieve(query, args.top_k, mode=mode)
+                timings.append(time.perf_counter() - start)
+                precision.append(sum(topic_of.get(doc_id) == topic for doc_id, _ in results) / args.top_k)
+            timings.sort()
+            print(f"{mode:<8} {hits / len(entity_queries):12.3f} {statistics.mean(precision):12.3f} "
+                  f"{statistics.median(timings) * 1000:8.2f} {timings[int(0.99 * (len(timings) - 1))] * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compares the old scan-and-concatenate proposal builder with the indexed
+ProposalAgent on synthetic use cases and resources.
+
+Usage:
+    python -m benchmarks.bench_proposal --use-cases 1000 --resources 10000
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+from proposal import ProposalAgent
+
+
+def synthetic_inputs(use_case_count, resource_count, seed=0):
+    rng = random.Random(seed)
+    use_cases = [
+        {
+            "use_case": f"Use case {i}",
+            "impact": f"Improves operations for scenario {i}",
+            "strategy": f"Deploy a model for scenario {i}",
+            "metrics": [f"Metric {i}.{m}" for m in range(3)],
+            "references": [f"Reference {i}.{r}" for r in range(2)],
+        }
+        for i in range(use_case_count)
+    ]
+    datasets = [
+        {
+            "use_case": f"Use case {rng.randrange(use_case_count)}",
+            "title": f"dataset-{j}",
+            "url": f"https://github.com/example/dataset-{j}",
+            "description": f"Synthetic resource {j}",
+        }
+        for j in range(resource_count)
+    ]
+    return use_cases, datasets
+
+
+def legacy_proposal(agent):
+    # The previous implementation: a full scan of the datasets per use case, and
+    # the document built by repeated string concatenation
+    proposal_text = "# Apple Inc. AI/ML Implementation Proposal\n\n"
+    proposal_text += "## Executive Summary\n\n"
+    proposal_text += "This proposal outlines key artificial intelligence and machine learning initiatives "
+    proposal_text += f"aligned with {agent.company_data['company_name']}'s strategic goals "
+    proposal_text += f"of {', '.join(agent.company_data.get('goals', [])) or 'AI-driven growth'}.\n\n"
+    proposal_text += "## Industry Context\n\n"
+    proposal_text += f"Domain: {agent.industry_data['industry']}\n"
+    if agent.industry_data.get('focus'):
+        proposal_text += f"Current Focus: {agent.industry_data['focus']}\n"
+    proposal_text += "\n"
+    proposal_text += "## Proposed Use Cases\n\n"
+    for use_case in agent.use_cases:
+        proposal_text += f"### {use_case['use_case']}\n\n"
+        proposal_text += f"*Business Impact*: {use_case['impact']}\n\n"
+        proposal_text += f"*Implementation Strategy*: {use_case['strategy']}\n\n"
+        proposal_text += "#### Relevant Resources and Datasets:\n"
+        resources = [dataset for dataset in agent.datasets if dataset['use_case'] == use_case['use_case']]
+        if resources:
+            for resource in resources:
+                proposal_text += f"- [{resource['title']}]({resource['url']})\n"
+                if 'description' in resource:
+                    proposal_text += f"  - {resource['description']}\n"
+        else:
+            proposal_text += "- Custom data collection required\n"
+        if 'references' in use_case:
+            proposal_text += "\n#### Industry Research & References:\n"
+            for reference in use_case['references']:
+                proposal_text += f"- {reference}\n"
+        if 'metrics' in use_case:
+            proposal_text += "\n#### Key Performance Indicators:\n"
+            for metric in use_case['metrics']:
+                proposal_text += f"- {metric}\n"
+        proposal_text += "\n---\n\n"
+    return proposal_text
+
+
+def best_of(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--use-cases", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    use_cases, datasets = synthetic_inputs(args.use_cases, args.resources)
+    agent = ProposalAgent({"industry": "Technology"}, {"company_name": "Apple Inc."}, use_cases, datasets)
+
+    legacy, expected = best_of(lambda: legacy_proposal(agent), args.repeat)
+    indexed, text = best_of(agent.generate_proposal, args.repeat)
+    assert text == expected, "indexed builder output differs from the legacy builder"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "proposal.md")
+
+        def stream():
+            with open(path, "w", encoding="utf-8") as f:
+                return agent.write_to(f)
+        streamed, _ = best_of(stream, args.repeat)
+    to_buffer, _ = best_of(lambda: agent.write_to(io.StringIO()), args.repeat)
+
+    print(f"inputs                 : {args.use_cases} use cases x {args.resources} resources "
+          f"({len(text) / 1e6:.1f} MB proposal)")
+    print(f"scan + concatenation   : {legacy * 1000:.1f} ms")
+    print(f"indexed generate       : {indexed * 1000:.1f} ms ({legacy / indexed:.1f}x)")
+    print(f"write_to(StringIO)     : {to_buffer * 1000:.1f} ms")
+    print(f"write_to(file)         : {streamed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
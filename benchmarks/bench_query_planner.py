@@ -0,0 +1,69 @@
+"""
+Measures how many GitHub searches the query planner saves on overlapping use cases.
+
+The titles are the kind of overlapping list one generation run produces. Before
+measuring, the script checks that the planner, at its default threshold, merges
+near-identical use cases (the pairs in SAME) and keeps apart use cases that only
+share generic words (the pairs in DIFFERENT).
+
+Usage:
+    python -m benchmarks.bench_query_planner --similarity 0.8
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from query_planner import QueryPlanner
+
+TITLES = [
+    "Customer sentiment analysis", "Sentiment analysis of reviews", "Customer churn prediction",
+    "Churn prediction for subscribers", "Fraud detection", "Credit card fraud detection",
+    "Anomaly detection in transactions", "Demand forecasting", "Retail demand forecasting",
+    "Predictive maintenance", "Predictive maintenance for manufacturing equipment",
+    "Personalized product recommendations", "Product recommendation engine", "Customer segmentation",
+    "Customer lifetime value prediction", "Dynamic pricing optimization", "Supply chain optimization",
+    "Route optimization for delivery fleet", "Chatbot for customer support",
+    "Customer support ticket classification", "Visual quality inspection",
+    "Image classification for quality inspection", "Credit risk scoring", "Inventory optimization",
+]
+SAME = [
+    ("customer sentiment analysis", "sentiment analysis of reviews"),
+    ("fraud detection", "credit card fraud detection"),
+    ("predictive maintenance", "predictive maintenance for manufacturing equipment"),
+]
+DIFFERENT = [
+    ("customer churn prediction", "customer lifetime value prediction"),
+    ("credit risk scoring", "credit card fraud detection"),
+    ("supply chain optimization", "inventory optimization"),
+    ("chatbot for customer support", "customer support ticket classification"),
+]
+
+
+def plan(queries, **planner_args):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        planner = QueryPlanner(lambda query: query, executor, **planner_args)
+        futures = [planner.submit(query) for query in queries]
+    return planner, futures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--similarity", type=float, help="another near-match threshold to measure")
+    args = parser.parse_args()
+
+    for pairs, merged in ((SAME, True), (DIFFERENT, False)):
+        for first, second in pairs:
+            _, (a, b) = plan([first, second])
+            assert (a is b) == merged, f"{first!r} / {second!r} should {'' if merged else 'not '}share a search"
+
+    runs = [("exact", {"similarity": None}), ("default", {})]
+    if args.similarity is not None:
+        runs.append((args.similarity, {"similarity": args.similarity}))
+    print(f"{len(TITLES)} use cases\n")
+    print(f"{'similarity':>10} {'upstream calls':>14} {'saved':>5} {'near matches':>12}")
+    for label, planner_args in runs:
+        stats = plan(TITLES, **planner_args)[0].stats()
+        print(f"{label:>10} {stats['upstream_calls']:14d} {stats['saved']:5d} {stats['near_matches']:12d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures proposal rendering throughput (proposals/sec) for one format, for
+markdown + HTML + JSON in one pass, and for the same with use-case sections
+rendered in parallel on a process pool.
+
+Usage:
+    python -m benchmarks.bench_renderer --use-cases 50 --resources 500 --duration 2
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_proposal import synthetic_inputs
+from proposal import ProposalAgent
+from proposal_renderer import ProposalRenderer
+
+
+def proposals_per_second(agent, formats, duration):
+    count, start = 0, time.perf_counter()
+    while True:
+        agent.render(formats)
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--use-cases", type=int, default=50)
+    parser.add_argument("--resources", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per measurement")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=128)
+    args = parser.parse_args()
+
+    use_cases, datasets = synthetic_inputs(args.use_cases, args.resources)
+    industry, company = {"industry": "Technology"}, {"company_name": "Example Corp"}
+    all_formats = ("markdown", "html", "json")
+
+    serial = ProposalAgent(industry, company, use_cases, datasets,
+                           renderer=ProposalRenderer(chunk_size=args.chunk_size))
+    markdown = proposals_per_second(serial, ("markdown",), args.duration)
+    combined = proposals_per_second(serial, all_formats, args.duration)
+    with ProcessPoolExecutor(args.workers) as executor:
+        parallel_agent = ProposalAgent(industry, company, use_cases, datasets,
+                                       renderer=ProposalRenderer(executor=executor, chunk_size=args.chunk_size))
+        assert parallel_agent.render(all_formats) == serial.render(all_formats)
+        parallel = proposals_per_second(parallel_agent, all_formats, args.duration)
+
+    print(f"inputs                     : {args.use_cases} use cases x {args.resources} resources")
+    print(f"markdown                   : {markdown:.1f} proposals/s")
+    print(f"markdown + html + json     : {combined:.1f} proposals/s (one pass)")
+    print(f"  with {args.workers} processes          : {parallel:.1f} proposals/s "
+          f"(chunks of {args.chunk_size} use cases)")
+
+
+if __name__ == "__main__":
+    main()
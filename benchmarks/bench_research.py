@@ -0,0 +1,47 @@
+"""
+Compares sequential and concurrent IndustryResearchAgent.run() against a local
+Serper stand-in.
+
+Usage:
+    python -m benchmarks.bench_research --latency 0.2
+"""
+import argparse
+import time
+
+from benchmarks.fake_services import FakeSerper
+from industry_research_agent import FACETS, IndustryResearchAgent
+
+
+def time_run(agent, concurrent, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = agent.run(concurrent=concurrent)
+        best = min(best, time.perf_counter() - start)
+        assert all(results[key] is not None for key, _ in FACETS)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.1, help="fake per-request latency (s)")
+    parser.add_argument("--concurrency", type=int, default=len(FACETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with FakeSerper(latency=args.latency) as serper:
+        agent = IndustryResearchAgent(
+            "Apple Inc", "Technology", "test-key",
+            base_url=serper.search_url, max_concurrency=args.concurrency,
+        )
+        sequential = time_run(agent, False, args.repeat)
+        concurrent = time_run(agent, True, args.repeat)
+
+    print(f"latency per query : {args.latency * 1000:.0f} ms")
+    print(f"sequential run()  : {sequential * 1000:.1f} ms")
+    print(f"concurrent run()  : {concurrent * 1000:.1f} ms (max_concurrency={args.concurrency})")
+    print(f"speedup           : {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
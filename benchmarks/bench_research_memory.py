@@ -0,0 +1,110 @@
+"""
+Compares peak RSS per company for the full-JSON and compact research paths.
+
+Each mode runs in a fresh interpreter that researches --companies targets
+against a local Serper stand-in returning large, realistic responses, and keeps
+what a batch run keeps per target: the research results, the industry and
+company text handed to the RAG agent, and the per-result records stored in the
+DocumentStore. "full" is the previous path (response.json() of the whole body,
+json.dumps of the industry and company data); "compact" streams each body
+through SearchResultParser and keeps only SearchResults.
+
+Usage:
+    python -m benchmarks.bench_research_memory --companies 20 --results 100 --snippet-words 200
+"""
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.fake_services import FakeSerper
+
+MODES = ["full", "compact"]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(mode, url, companies):
+    from http_session import create_session
+    from industry_research_agent import IndustryResearchAgent
+    from research_records import explode_research
+
+    class FullResearchAgent(IndustryResearchAgent):
+        # The path before the compact form: the whole body parsed into dicts
+        def _post_search(self, query):
+            response = self.session.post(self.base_url, headers={"X-API-KEY": self.api_key},
+                                         data=json.dumps({"q": query}), timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    agent_class = FullResearchAgent if mode == "full" else IndustryResearchAgent
+    session = create_session(9)
+    # Warm up imports, the session and the parser before taking the baseline
+    agent_class("Warmup", "Technology", "test-key", base_url=url, session=session).run()
+    gc.collect()
+    baseline = peak_rss_mb()
+
+    kept, payload_bytes = [], 0
+    start = time.perf_counter()
+    for i in range(companies):
+        results = agent_class(f"Company {i}", "Technology", "test-key", base_url=url, session=session).run()
+        industry_data, company_data = results.get("industry_data"), results.get("company_data")
+        if mode == "full":
+            payload_bytes += sum(len(json.dumps(value)) for value in results.values())
+            industry_data, company_data = json.dumps(industry_data), json.dumps(company_data)
+        else:
+            industry_data, company_data = industry_data.to_text(), company_data.to_text()
+        kept.append((results, industry_data, company_data, explode_research(results, company=f"Company {i}")))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    peak = peak_rss_mb()
+    return {
+        "mode": mode,
+        "baseline_mb": baseline,
+        "peak_mb": peak,
+        "per_company_mb": (peak - baseline) / companies,
+        "records": sum(len(entry[3]) for entry in kept),
+        "payload_mb": payload_bytes / 1e6,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--results", type=int, default=100, help="organic hits per fake response")
+    parser.add_argument("--snippet-words", type=int, default=200)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.url, args.companies)))
+        return
+
+    with FakeSerper(results=args.results, snippet_words=args.snippet_words, rich=True) as serper:
+        print(f"{args.companies} companies x 9 facets, {args.results} hits per response, "
+              f"{args.snippet_words}-word snippets\n")
+        print(f"{'mode':<8} {'baseline MB':>11} {'peak MB':>8} {'MB/company':>11} {'records':>8} {'seconds':>8}")
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_research_memory", "--worker", mode,
+                 "--url", serper.search_url, "--companies", str(args.companies)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            print(f"{row['mode']:<8} {row['baseline_mb']:11.1f} {row['peak_mb']:8.1f} "
+                  f"{row['per_company_mb']:11.2f} {row['records']:8d} {row['seconds']:8.2f}")
+            if row["payload_mb"]:
+                print(f"{'':<8} (full responses re-serialized: {row['payload_mb']:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
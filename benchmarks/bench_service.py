@@ -0,0 +1,128 @@
+"""
+Load-tests the proposal service and reports p50/p99 request latency.
+
+By default starts local Serper, Groq and GitHub stand-ins and an in-process
+service pointed at them; with --url it drives an already running service
+instead. Clients send requests spread over --companies distinct targets, so
+concurrent requests for the same target exercise request coalescing.
+
+Usage:
+    python -m benchmarks.bench_service --model /path/to/small-bert --requests 200 --concurrency 16
+    python -m benchmarks.bench_service --url http://127.0.0.1:8000 --requests 50
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_services import FakeGitHub, FakeGroq, FakeSerper, sample_use_cases
+from http_session import create_session
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def load_test(url, requests, concurrency, companies, formats):
+    session = create_session(concurrency)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def one(i):
+        body = {"company": f"Company {i % companies}", "industry": "Technology", "formats": formats}
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/proposals", json=body, timeout=600)
+            ok = response.status_code == 200
+            error = None if ok else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        with lock:
+            if error is None:
+                latencies.append(elapsed)
+            else:
+                errors.append(error)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as clients:
+        list(clients.map(one, range(requests)))
+    wall = time.perf_counter() - start
+    stats = session.get(f"{url}/stats", timeout=10).json()
+    return sorted(latencies), errors, wall, stats
+
+
+@contextlib.contextmanager
+def local_service(args):
+    from service import ProposalService, create_server
+    from response_cache import ResponseCache
+
+    content = sample_use_cases(args.use_cases, as_json=True)
+    fake_kwargs = {"latency": args.latency, "error_rate": args.error_rate}
+    with tempfile.TemporaryDirectory() as directory, \
+            FakeSerper(**fake_kwargs) as serper, \
+            FakeGroq(content=content, **fake_kwargs) as groq, \
+            FakeGitHub(rate_limit=args.github_rate_limit, **fake_kwargs) as github:
+        os.environ.update({
+            "SERPER_BASE_URL": serper.search_url, "GROQ_BASE_URL": groq.url,
+            "GITHUB_SEARCH_URL": github.search_url, "PIPELINE_EMBEDDING_MODEL": args.model,
+            "SERPER_API_KEY": "test-key", "GROQ_API_KEY": "test-key", "GITHUB_API_KEY": "test-key",
+        })
+        previous = os.getcwd()
+        os.chdir(directory)  # document store and embedding cache go to the temp directory
+        # TTL 0 makes every pipeline execution go upstream, so latencies measure the
+        # pipeline and coalescing rather than response cache replay
+        cache = ResponseCache(path=os.path.join(directory, "responses.sqlite"), ttl=args.cache_ttl)
+        service = ProposalService(max_in_flight=args.max_in_flight, cache=cache)
+        service.embedding_model.warm_up(background=False)
+        server = create_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}"
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+            os.chdir(previous)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="existing service to test instead of starting one")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--companies", type=int, default=8, help="distinct targets the requests cycle through")
+    parser.add_argument("--formats", nargs="+", default=["markdown"])
+    parser.add_argument("--model", default="bert-base-uncased", help="embedding model for the local service")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake per-request latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--use-cases", type=int, default=10, help="use cases per fake completion")
+    parser.add_argument("--github-rate-limit", type=int, default=5000,
+                        help="searches per minute the fake GitHub advertises; the service paces itself to it")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--cache-ttl", type=float, default=0.0, help="response cache TTL of the local service")
+    args = parser.parse_args()
+
+    with contextlib.nullcontext(args.url) if args.url else local_service(args) as url:
+        latencies, errors, wall, stats = load_test(url, args.requests, args.concurrency,
+                                                   args.companies, args.formats)
+
+    print(f"requests           : {args.requests} ({args.concurrency} concurrent, "
+          f"{args.companies} distinct targets)")
+    print(f"throughput         : {len(latencies) / wall:.1f} req/s")
+    if latencies:
+        print(f"latency p50        : {percentile(latencies, 0.50) * 1000:.1f} ms")
+        print(f"latency p99        : {percentile(latencies, 0.99) * 1000:.1f} ms")
+        print(f"latency mean / max : {statistics.mean(latencies) * 1000:.1f} / {latencies[-1] * 1000:.1f} ms")
+    print(f"errors             : {len(errors)}{f' (e.g. {errors[0]})' if errors else ''}")
+    print(f"pipeline runs      : {stats['executions']} for {stats['requested']} requests "
+          f"({stats['coalesced']} coalesced)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Tracks cold-start latency of the pipeline modules.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+Reported per module: import time, and whether numpy/torch/transformers were
+pulled in by the import. With --model it also times SimpleEmbedding
+construction, and a blocking warm-up versus a warm-up overlapped with a
+simulated step-1 research wait.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 --model bert-base-uncased
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["industry_research_agent", "use_case_generation_agent", "resource_asset_agent", "proposal", "main"]
+HEAVY = ["numpy", "torch", "transformers", "sklearn"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+WARM_UP_SNIPPET = """
+import json, time
+from use_case_generation_agent import SimpleEmbedding
+start = time.perf_counter()
+model = SimpleEmbedding({model!r})
+construct = time.perf_counter() - start
+start = time.perf_counter()
+if {overlap}:
+    model.warm_up()
+    time.sleep({io_wait})  # stands in for step-1 research I/O
+    model.encode("warm")
+else:
+    model.warm_up(background=False)
+    model.encode("warm")
+    time.sleep({io_wait})
+print(json.dumps({{"construct": construct, "ready": time.perf_counter() - start}}))
+"""
+
+
+def run_snippet(code):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model", help="also time embedding construction and warm-up with this model")
+    parser.add_argument("--io-wait", type=float, default=1.0, help="simulated step-1 research time (s)")
+    args = parser.parse_args()
+
+    print(f"{'module':<28} {'import ms (median)':>18}  heavy modules loaded")
+    for module in MODULES:
+        samples = [run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY)) for _ in range(args.runs)]
+        median_ms = statistics.median(s["seconds"] for s in samples) * 1000
+        print(f"{module:<28} {median_ms:18.1f}  {', '.join(samples[0]['heavy']) or '-'}")
+
+    if args.model:
+        for overlap in (False, True):
+            samples = [run_snippet(WARM_UP_SNIPPET.format(model=args.model, overlap=overlap, io_wait=args.io_wait))
+                       for _ in range(args.runs)]
+            label = "background warm-up" if overlap else "blocking warm-up"
+            print(f"\n{label}: construct {statistics.median(s['construct'] for s in samples) * 1000:.1f} ms, "
+                  f"research + first encode {statistics.median(s['ready'] for s in samples):.2f} s "
+                  f"(research wait {args.io_wait:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
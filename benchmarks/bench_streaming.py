@@ -0,0 +1,59 @@
+"""
+Measures steps 2+3 (use-case generation then GitHub lookups) with a blocking
+completion versus streamed use cases consumed by ResourceAssetAgent as they
+arrive, against local Groq and GitHub stand-ins.
+
+Usage:
+    python -m benchmarks.bench_streaming --use-cases 8 --token-delay 0.01 --github-latency 0.3
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeGitHub, FakeGroq, sample_use_cases
+from document_store import DocumentStore
+from resource_asset_agent import ResourceAssetAgent
+from use_case_generation_agent import RAGAgent, SimpleEmbedding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="bert-base-uncased")
+    parser.add_argument("--use-cases", type=int, default=8)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--github-latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Serve JSON-mode completions instead of markdown")
+    args = parser.parse_args()
+
+    embedding_model = SimpleEmbedding(args.model)
+    embedding_model.warm_up(background=False)
+    content = sample_use_cases(args.use_cases, as_json=args.json)
+
+    with tempfile.TemporaryDirectory() as directory, \
+            FakeGroq(content=content, token_delay=args.token_delay) as groq, \
+            FakeGitHub(latency=args.github_latency) as github:
+        agent = RAGAgent("industry context", "company context", api_key="test-key",
+                         embedding_model=embedding_model, index_path=None, base_url=groq.url,
+                         json_mode=args.json, document_store=DocumentStore(f"{directory}/documents.jsonl"))
+
+        start = time.perf_counter()
+        use_cases = agent.generate_use_cases()
+        ResourceAssetAgent(use_cases, "test-key", max_workers=args.workers,
+                           base_url=github.search_url).search_datasets()
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resource_agent = ResourceAssetAgent(agent.iter_use_cases(), "test-key", max_workers=args.workers,
+                                            base_url=github.search_url)
+        datasets = resource_agent.search_datasets()
+        streaming = time.perf_counter() - start
+
+    print(f"use cases             : {len(datasets)}")
+    print(f"blocking generation   : {blocking:.2f} s")
+    print(f"streamed + overlapped : {streaming:.2f} s")
+    print(f"saved                 : {blocking - streaming:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmarks the memory-mapped FlatIndex against the previous list-of-arrays
+VectorStore search path (np.array rebuild + full argsort on every query).
+
+Usage:
+    python -m benchmarks.bench_vector_index --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from vector_index import FlatIndex
+
+
+def random_unit_vectors(rng, n, dimension):
+    vectors = rng.standard_normal((n, dimension), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def legacy_search(embeddings, query, top_k):
+    # What VectorStore.search did before: rebuild the matrix, score all, full argsort
+    doc_embeddings = np.array(embeddings)
+    similarities = doc_embeddings @ query
+    return similarities.argsort()[-top_k:][::-1]
+
+
+def median_ms(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_size(n, args, rng, directory):
+    path = os.path.join(directory, f"index_{n}")
+    index = FlatIndex(args.dimension, path)
+    start = time.perf_counter()
+    for offset in range(0, n, args.chunk):
+        rows = min(args.chunk, n - offset)
+        ids = np.arange(offset, offset + rows)
+        index.add(random_unit_vectors(rng, rows, args.dimension), ids, np.zeros((rows, 2), dtype=np.int64))
+    build = time.perf_counter() - start
+    del index
+
+    start = time.perf_counter()
+    index = FlatIndex(args.dimension, path)
+    reopen_ms = (time.perf_counter() - start) * 1000
+
+    queries = random_unit_vectors(rng, args.queries, args.dimension)
+    index.search(queries[0], args.top_k)  # fault the pages in once
+    flat_ms = median_ms(lambda q: index.search(q, args.top_k), queries)
+
+    legacy_ms = None
+    if n <= args.legacy_max:
+        embeddings = list(np.array(index.vectors[:n]))
+        legacy_ms = median_ms(lambda q: legacy_search(embeddings, q, args.top_k), queries)
+    return build, reopen_ms, flat_ms, legacy_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--chunk", type=int, default=10_000, help="rows appended per add() call")
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="largest size to run the legacy path at (it holds a second copy in RAM)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>10} {'build s':>9} {'reopen ms':>10} {'flat ms':>9} {'legacy ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.sizes:
+            build, reopen_ms, flat_ms, legacy_ms = bench_size(n, args, rng, directory)
+            legacy = f"{legacy_ms:10.2f}" if legacy_ms is not None else f"{'-':>10}"
+            print(f"{n:>10} {build:9.2f} {reopen_ms:10.2f} {flat_ms:9.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
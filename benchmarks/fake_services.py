@@ -0,0 +1,340 @@
+"""
+Local HTTP stand-ins for the external services the agents call.
+
+Each fake binds to an ephemeral port on 127.0.0.1 and can be used as a context
+manager; point the agent at ``fake.url`` instead of the real endpoint.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling is exercised
+
+    def _dispatch(self, method):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        fake._record(self)
+        if fake.latency:
+            time.sleep(fake.latency)
+        status, headers, payload = fake.handle(method, self.path, self.headers, body)
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload).encode("utf-8")
+            headers = {"Content-Type": "application/json", **headers}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, str(value))
+        if isinstance(payload, bytes):
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        # Any other payload is an iterator of byte chunks, sent as they are produced
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in payload:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeService:
+    """
+    Base class for a threaded local HTTP fake.
+
+    Args:
+        latency (float): Seconds to sleep before answering each request.
+        error_rate (float): Probability of answering with HTTP 500.
+        seed (int): Seed for the error injection RNG.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self):
+        return len(self.requests)
+
+    def _record(self, handler):
+        with self._lock:
+            self.requests.append((handler.command, handler.path))
+
+    def _inject_error(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def handle(self, method, path, headers, body):
+        """Returns ``(status, headers, payload)`` for one request."""
+        raise NotImplementedError
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeSerper(FakeService):
+    """
+    Stand-in for ``https://google.serper.dev/search``.
+
+    Args:
+        results (int): Number of ``organic`` hits returned per query.
+        snippet_words (int): Length of each generated snippet, to control payload size.
+        rich (bool): Also return the sections and per-hit fields a real response
+            carries but the pipeline never reads (sitelinks, attributes, images,
+            related searches, ...), plus a knowledge graph and "people also ask".
+    """
+
+    def __init__(self, results=10, snippet_words=30, rich=False, **kwargs):
+        super().__init__(**kwargs)
+        self.results = results
+        self.snippet_words = snippet_words
+        self.rich = rich
+
+    @property
+    def search_url(self):
+        return f"{self.url}/search"
+
+    def handle(self, method, path, headers, body):
+        if self._inject_error():
+            return 500, {}, {"message": "injected error"}
+        query = json.loads(body or b"{}").get("q", "")
+        words = query.split() or ["result"]
+        organic = [
+            {
+                "title": f"{query} result {rank}",
+                "link": f"https://example.com/{rank}?q={'+'.join(words)}",
+                "snippet": " ".join(words[i % len(words)] for i in range(self.snippet_words)),
+                "date": "Jan 1, 2025",
+                "position": rank,
+            }
+            for rank in range(1, self.results + 1)
+        ]
+        response = {"searchParameters": {"q": query, "type": "search"}, "organic": organic}
+        if self.rich:
+            self._enrich(response, query)
+        return 200, {}, response
+
+    def _enrich(self, response, query):
+        filler = " ".join(["lorem"] * self.snippet_words)
+        for hit in response["organic"]:
+            hit["sitelinks"] = [{"title": f"{query} section {i}", "link": f"{hit['link']}#s{i}"} for i in range(6)]
+            hit["attributes"] = {f"Attribute {i}": filler for i in range(4)}
+            hit["imageUrl"] = f"data:image/jpeg;base64,{'A' * 4 * self.snippet_words}"
+        response["knowledgeGraph"] = {
+            "title": query, "type": "Corporation", "description": filler,
+            "descriptionLink": "https://example.com/about",
+            "imageUrl": f"data:image/jpeg;base64,{'A' * 16 * self.snippet_words}",
+            "attributes": {f"Attribute {i}": f"value {i}" for i in range(8)},
+        }
+        response["peopleAlsoAsk"] = [
+            {"question": f"What is {query} {i}?", "snippet": filler, "title": f"{query} answer {i}",
+             "link": f"https://example.com/faq/{i}"}
+            for i in range(4)
+        ]
+        response["relatedSearches"] = [{"query": f"{query} related {i}"} for i in range(8)]
+        response["images"] = [
+            {"title": f"{query} image {i}", "imageUrl": f"data:image/jpeg;base64,{'A' * 8 * self.snippet_words}"}
+            for i in range(self.results)
+        ]
+        response["credits"] = 1
+
+
+# Topic x task pairs give up to 200 distinct use-case titles before they repeat
+TOPICS = ["churn", "fraud", "demand", "pricing", "support", "inventory", "sentiment", "maintenance",
+          "routing", "quality", "credit", "marketing", "recruiting", "energy", "logistics", "claims",
+          "retention", "supplier", "warranty", "security"]
+TASKS = ["prediction", "detection", "forecasting", "optimization", "classification", "recommendation",
+         "segmentation", "monitoring", "summarization", "automation"]
+
+
+def _use_case_terms(i):
+    return TOPICS[(i - 1) % len(TOPICS)], TASKS[(i - 1) // len(TOPICS) % len(TASKS)]
+
+
+def sample_use_cases(count, words_per_field=12, as_json=False):
+    """Markdown in the numbered layout the generation prompt usually produces, or the JSON-mode schema."""
+    filler = " ".join(("improves customer operations with timely insight " * words_per_field).split()[:words_per_field])
+    if as_json:
+        return json.dumps({"use_cases": [
+            {"use_case": " ".join(_use_case_terms(i)).title(), "impact": filler, "strategy": filler,
+             "metrics": ["Customer satisfaction score", "Operating cost"], "keywords": list(_use_case_terms(i))}
+            for i in range(1, count + 1)
+        ]}, indent=2)
+    blocks = [
+        f"{i}. **Use case {i}: {' '.join(_use_case_terms(i)).title()}**\n"
+        f"   * Business impact: {filler}\n"
+        f"   * Implementation strategy: {filler}\n"
+        for i in range(1, count + 1)
+    ]
+    return "Here are AI/ML use cases based on the context:\n\n" + "\n".join(blocks)
+
+
+class FakeGroq(FakeService):
+    """
+    Stand-in for the Groq (OpenAI-compatible) chat-completions API. Point the Groq
+    client at it with ``base_url=fake.url``.
+
+    Args:
+        content (str): Completion text returned for every request.
+        token_delay (float): Seconds between streamed chunks.
+        tokens_per_chunk (int): Whitespace-delimited tokens per streamed chunk.
+
+    Every request body is kept in ``completions``, so tests can check the prompt and
+    sampling parameters that reached the server.
+    """
+
+    def __init__(self, content=None, token_delay=0.0, tokens_per_chunk=1, **kwargs):
+        super().__init__(**kwargs)
+        self.content = content if content is not None else sample_use_cases(5)
+        self.token_delay = token_delay
+        self.tokens_per_chunk = tokens_per_chunk
+        self.completions = []
+
+    def _tokens(self):
+        pieces = re.findall(r"\S+\s*|\s+", self.content)
+        for start in range(0, len(pieces), self.tokens_per_chunk):
+            yield "".join(pieces[start:start + self.tokens_per_chunk])
+
+    def handle(self, method, path, headers, body):
+        if self._inject_error():
+            return 500, {}, {"error": {"message": "injected error", "type": "server_error"}}
+        request = json.loads(body or b"{}")
+        with self._lock:
+            self.completions.append(request)
+        model = request.get("model", "fake-model")
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": model}
+        if not request.get("stream"):
+            # A blocking completion still takes as long as generating every token
+            time.sleep(self.token_delay * sum(1 for _ in self._tokens()))
+            return 200, {}, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": self.content}}],
+                "usage": {"prompt_tokens": len(json.dumps(request.get("messages", [])).split()),
+                          "completion_tokens": len(self.content.split()),
+                          "total_tokens": len(json.dumps(request.get("messages", [])).split())
+                                          + len(self.content.split())},
+            }
+
+        def events():
+            for token in self._tokens():
+                if self.token_delay:
+                    time.sleep(self.token_delay)
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+            done = {**base, "object": "chat.completion.chunk",
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n".encode("utf-8")
+            yield b"data: [DONE]\n\n"
+
+        return 200, {"Content-Type": "text/event-stream"}, events()
+
+
+class FakeGitHub(FakeService):
+    """
+    Stand-in for ``https://api.github.com/search/repositories``.
+
+    Supports ``per_page``/``page`` pagination and, with ``rate_limit`` set, GitHub's
+    fixed-window rate limiting: every response carries ``X-RateLimit-*`` headers and
+    requests over the limit get a 403 with ``Retry-After``.
+
+    Args:
+        items (int): Total repositories matching each query.
+        rate_limit (int): Requests allowed per window, or None for no limit.
+        window (float): Rate-limit window in seconds.
+    """
+
+    def __init__(self, items=5, rate_limit=None, window=60.0, **kwargs):
+        super().__init__(**kwargs)
+        self.items = items
+        self.rate_limit = rate_limit
+        self.window = window
+        self.throttled = 0
+        self._window_start = None
+        self._window_used = 0
+
+    def _rate_limit_headers(self):
+        # Returns the headers for this request and whether it is over the limit
+        with self._lock:
+            now = time.time()
+            if self._window_start is None or now >= self._window_start + self.window:
+                self._window_start, self._window_used = now, 0
+            self._window_used += 1
+            reset = self._window_start + self.window
+            limited = self._window_used > self.rate_limit
+            self.throttled += limited
+        headers = {
+            "X-RateLimit-Limit": self.rate_limit,
+            "X-RateLimit-Remaining": max(0, self.rate_limit - self._window_used),
+            "X-RateLimit-Reset": math.ceil(reset),
+            "X-RateLimit-Used": min(self._window_used, self.rate_limit),
+        }
+        if limited:
+            headers["Retry-After"] = max(1, math.ceil(reset - now))
+        return headers, limited
+
+    @property
+    def search_url(self):
+        return f"{self.url}/search/repositories"
+
+    def handle(self, method, path, headers, body):
+        headers, limited = self._rate_limit_headers() if self.rate_limit else ({}, False)
+        if limited:
+            return 403, headers, {"message": "API rate limit exceeded"}
+        if self._inject_error():
+            return 500, headers, {"message": "injected error"}
+        params = parse_qs(urlparse(path).query)
+        query = params.get("q", [""])[0]
+        per_page = int(params.get("per_page", [30])[0])
+        page = int(params.get("page", [1])[0])
+        slug = "-".join(query.lower().split())[:60]
+        first = (page - 1) * per_page + 1
+        items = [{"name": f"{slug}-{rank}", "html_url": f"https://github.com/example/{slug}-{rank}"}
+                 for rank in range(first, min(first + per_page, self.items + 1))]
+        return 200, headers, {"total_count": self.items, "incomplete_results": False, "items": items}
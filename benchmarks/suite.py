@@ -0,0 +1,306 @@
+"""
+Offline end-to-end benchmark suite: runs each agent in isolation and the whole
+main.main() pipeline at increasing scale against local Serper, Groq and GitHub
+stand-ins, and appends the results to a JSON-lines history file.
+
+Each run is one line in the history, tagged with the git commit, so comparing
+two runs shows regressions between commits. After a run the suite compares
+itself with the most recent earlier run that used the same settings and flags
+every measurement that got slower by more than --threshold.
+
+Usage:
+    python -m benchmarks.suite --model /path/to/small-bert --quick
+    python -m benchmarks.suite --scenarios research resources --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.bench_proposal import synthetic_inputs
+from benchmarks.fake_services import FakeGitHub, FakeGroq, FakeSerper, sample_use_cases
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+# Slowdowns smaller than this are timer noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.001
+
+# Scale steps per scenario: (full run, --quick run)
+SCALES = {
+    "research": ([1, 4, 16], [1, 4]),           # companies
+    "use_cases": ([5, 20, 80], [5, 20]),        # generated use cases
+    "resources": ([5, 20, 80], [5, 20]),        # use cases searched on GitHub
+    "vector_store": ([100, 1000, 5000], [50, 200]),  # documents in the knowledge base
+    "proposal": ([10, 100, 1000], [10, 100]),   # use cases, with 10 resources each
+    "e2e": ([1, 2, 4], [1, 2]),                 # companies through main.main()
+}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_research(args, companies, directory):
+    from industry_research_agent import FACETS, IndustryResearchAgent
+
+    with FakeSerper(results=args.serper_results, snippet_words=args.snippet_words,
+                    latency=args.latency, error_rate=args.error_rate) as serper:
+        def run():
+            failed = 0
+            for i in range(companies):
+                agent = IndustryResearchAgent(f"Company {i}", "Technology", "test-key", base_url=serper.search_url)
+                results = agent.run()
+                failed += sum(results[key] is None for key, _ in FACETS)
+            return failed
+        seconds, failed = _timed(run)
+        requests = serper.request_count
+    return {"seconds": seconds, "requests": requests, "failed_queries": failed}
+
+
+def bench_use_cases(args, count, directory):
+    from document_store import DocumentStore
+    from use_case_generation_agent import RAGAgent
+
+    content = sample_use_cases(count, words_per_field=args.use_case_words, as_json=True)
+    with FakeGroq(content=content, latency=args.latency, error_rate=args.error_rate) as groq:
+        agent = RAGAgent("industry context", "company context", api_key="test-key",
+                         embedding_model=_embedding_model(args), index_path=None, base_url=groq.url,
+                         document_store=DocumentStore(os.path.join(directory, "documents.jsonl")))
+        seconds, use_cases = _timed(agent.generate_use_cases)
+    return {"seconds": seconds, "use_cases": len(use_cases or [])}
+
+
+def bench_resources(args, count, directory):
+    from resource_asset_agent import ResourceAssetAgent
+
+    use_cases = json.loads(sample_use_cases(count, as_json=True))["use_cases"]
+    with FakeGitHub(items=args.github_items, latency=args.latency, error_rate=args.error_rate) as github:
+        agent = ResourceAssetAgent(use_cases, "test-key", base_url=github.search_url)
+        seconds, resources = _timed(agent.search_datasets)
+        requests = github.request_count
+    return {"seconds": seconds, "requests": requests,
+            "resources": sum(len(group["datasets"] or []) for group in resources)}
+
+
+def bench_vector_store(args, documents, directory):
+    from use_case_generation_agent import VectorStore
+
+    words = "market growth customer retention supply chain pricing forecast regulation platform".split()
+    texts = [" ".join(words[(i + j) % len(words)] for j in range(args.use_case_words)) + f" record {i}"
+             for i in range(documents)]
+    store = VectorStore(_embedding_model(args), index_path=os.path.join(directory, "index"))
+    add_seconds, _ = _timed(lambda: store.add_embeddings(list(range(documents)), texts))
+    timings = [_timed(lambda: store.search(f"{words[i % len(words)]} forecast", top_k=5))[0]
+               for i in range(args.queries)]
+    return {"seconds": add_seconds + sum(timings), "add_seconds": add_seconds,
+            "search_p50_ms": statistics.median(timings) * 1000}
+
+
+def bench_proposal(args, count, directory):
+    from proposal import ProposalAgent
+
+    use_cases, datasets = synthetic_inputs(count, count * 10)
+    agent = ProposalAgent({"industry": "Technology"}, {"company_name": "Example Corp"}, use_cases, datasets)
+    seconds = min(_timed(lambda: agent.render(("markdown", "html", "json")))[0] for _ in range(3))
+    return {"seconds": seconds, "use_cases": count, "resources": count * 10}
+
+
+def bench_e2e(args, companies, directory):
+    import main as pipeline
+
+    workdir = directory
+    content = sample_use_cases(args.e2e_use_cases, words_per_field=args.use_case_words, as_json=True)
+    fake_kwargs = {"latency": args.latency, "error_rate": args.error_rate}
+    stages = {}
+    with FakeSerper(results=args.serper_results, snippet_words=args.snippet_words, **fake_kwargs) as serper, \
+            FakeGroq(content=content, **fake_kwargs) as groq, \
+            FakeGitHub(items=args.github_items, **fake_kwargs) as github:
+        environment = {
+            "SERPER_BASE_URL": serper.search_url, "GROQ_BASE_URL": groq.url,
+            "GITHUB_SEARCH_URL": github.search_url, "PIPELINE_EMBEDDING_MODEL": args.model,
+            "PIPELINE_EMBEDDING_BACKEND": args.backend,
+            "SERPER_API_KEY": "test-key", "GROQ_API_KEY": "test-key", "GITHUB_API_KEY": "test-key",
+            "PIPELINE_CACHE_PATH": os.path.join(workdir, "responses.sqlite"),
+            "PIPELINE_CACHE_TTL": "0",
+        }
+        start = time.perf_counter()
+        for i in range(companies):
+            environment["PIPELINE_TRACE_REPORT"] = os.path.join(workdir, f"trace_{i}.json")
+            with _environment(environment), _working_directory(workdir), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                pipeline.main(f"Company {i}", "Technology")
+            with open(environment["PIPELINE_TRACE_REPORT"], encoding="utf-8") as f:
+                for name, stage in json.load(f)["stages"].items():
+                    if name.startswith("step."):
+                        stages[name] = stages.get(name, 0.0) + stage["total_ms"] / 1000
+        seconds = time.perf_counter() - start
+        requests = serper.request_count + groq.request_count + github.request_count
+    return {"seconds": seconds, "requests": requests,
+            **{f"{name}_seconds": round(value, 6) for name, value in stages.items()}}
+
+
+SCENARIOS = {
+    "research": bench_research,
+    "use_cases": bench_use_cases,
+    "resources": bench_resources,
+    "vector_store": bench_vector_store,
+    "proposal": bench_proposal,
+    "e2e": bench_e2e,
+}
+# Scenarios that load the embedding model
+_NEEDS_MODEL = {"use_cases", "vector_store", "e2e"}
+_models = {}
+
+
+def _embedding_model(args):
+    from use_case_generation_agent import SimpleEmbedding
+
+    if args.model not in _models:
+        _models[args.model] = SimpleEmbedding(args.model, backend=args.backend)
+    return _models[args.model]
+
+
+@contextlib.contextmanager
+def _environment(values):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@contextlib.contextmanager
+def _working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, threshold):
+    """
+    Returns ``(key, metric, before, after)`` for every timing in ``current`` that is
+    more than ``threshold`` (a fraction) and MIN_REGRESSION_SECONDS slower than in
+    ``previous``.
+    """
+    regressions = []
+    for key, metrics in current["results"].items():
+        before = previous["results"].get(key, {})
+        for metric, value in metrics.items():
+            if not (metric == "seconds" or metric.endswith(("_seconds", "_ms"))):
+                continue
+            scale = 1000 if metric.endswith("_ms") else 1
+            if isinstance(before.get(metric), (int, float)) and before[metric] > 0 \
+                    and value > before[metric] * (1 + threshold) \
+                    and (value - before[metric]) / scale > MIN_REGRESSION_SECONDS:
+                regressions.append((key, metric, before[metric], value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--quick", action="store_true", help="run the smaller scale steps only")
+    parser.add_argument("--model", default="bert-base-uncased", help="embedding model name or local path")
+    parser.add_argument("--backend", default="fp32", help="embedding backend (fp32 or int8)")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake per-request latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a fake HTTP 500")
+    parser.add_argument("--serper-results", type=int, default=10, help="organic hits per Serper response")
+    parser.add_argument("--snippet-words", type=int, default=30, help="words per Serper snippet")
+    parser.add_argument("--use-case-words", type=int, default=12, help="words per generated use-case field")
+    parser.add_argument("--github-items", type=int, default=5, help="repositories per GitHub response")
+    parser.add_argument("--e2e-use-cases", type=int, default=10, help="use cases per pipeline run")
+    parser.add_argument("--queries", type=int, default=20, help="vector store searches per size")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON-lines file the run is appended to")
+    parser.add_argument("--no-history", action="store_true", help="do not record this run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    settings = {key: value for key, value in vars(args).items()
+                if key not in ("scenarios", "history", "no_history", "threshold")}
+    commit, dirty = git_revision()
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.scenarios:
+            if name in _NEEDS_MODEL:
+                _embedding_model(args)  # load once, outside the timings
+            for scale in SCALES[name][args.quick]:
+                key = f"{name}[{scale}]"
+                try:
+                    # Keep the fastest of --repeat runs, each in a fresh directory so
+                    # no run reuses the caches or indexes of an earlier one
+                    result = min((SCENARIOS[name](args, scale, tempfile.mkdtemp(dir=directory))
+                                  for _ in range(args.repeat)), key=lambda run: run["seconds"])
+                except Exception as e:
+                    print(f"{key:<20} failed: {e}")
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                else:
+                    extras = ", ".join(f"{metric}={value:g}" for metric, value in result.items()
+                                       if metric != "seconds")
+                    print(f"{key:<20} {result['seconds'] * 1000:10.1f} ms   {extras}")
+                record["results"][key] = {metric: round(value, 6) if isinstance(value, float) else value
+                                          for metric, value in result.items()}
+
+    history = load_history(args.history)
+    previous = next((run for run in reversed(history) if run.get("settings") == settings), None)
+    if previous is not None:
+        regressions = compare(previous, record, args.threshold)
+        print(f"\ncompared with {previous['commit']}{'+' if previous['dirty'] else ''} "
+              f"({previous['timestamp']}): {len(regressions)} regression(s)")
+        for key, metric, before, after in regressions:
+            print(f"  {key} {metric}: {before:g} -> {after:g} (+{(after / before - 1) * 100:.0f}%)")
+    if not args.no_history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nrecorded in {args.history}")
+    if previous is not None and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class ContextPacker:
+    """
+    Fills a prompt's context with the highest-scoring chunks that fit a token budget.
+
+    Candidates are ``(label, text, score)`` chunks, typically scored one by one
+    against the query. They are ranked by score and packed greedily; a chunk that
+    does not fit the remaining budget is skipped, so lower-ranked but smaller
+    chunks can still use the space. A candidate longer than ``chunk_size`` tokens
+    is split first, and its pieces keep its score. Tokens are counted with the
+    tokenizer of the ``SimpleEmbedding`` already loaded for retrieval. That is not
+    the LLM's own tokenizer, so the budget is a close proxy rather than an exact
+    count of the prompt tokens billed.
+
+    Args:
+        embedding_model (SimpleEmbedding): Supplies ``tokenize`` and ``chunk_spans``.
+        max_tokens (int): Token budget for the packed context.
+        chunk_size (int): Longest chunk in tokens; longer candidates are split.
+        separator (str): Placed between packed chunks.
+    """
+
+    def __init__(self, embedding_model, max_tokens: int, chunk_size: int = 256, separator: str = "\n\n"):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.embedding_model = embedding_model
+        self.max_tokens = max_tokens
+        # No chunk is longer than the whole budget, so a long best candidate is split
+        # rather than skipped
+        self.chunk_size = min(chunk_size, max_tokens)
+        self.separator = separator
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = self.embedding_model.tokenize(list(texts), add_special_tokens=False)['input_ids']
+        return [len(ids) for ids in encoded]
+
+    def _chunks(self, candidates: Sequence[Tuple[str, str, float]]) -> List[Tuple[str, str]]:
+        # (label, chunk text) for every piece, best score first; the sort is stable, so
+        # ties and the pieces of one candidate keep their order
+        chunks = []
+        for label, text, _ in sorted(candidates, key=lambda candidate: candidate[2], reverse=True):
+            for start, end in self.embedding_model.chunk_spans(text, self.chunk_size):
+                chunk = text[start:end].strip()
+                if chunk:
+                    chunks.append((label, chunk))
+        return chunks
+
+    def pack(self, candidates: Sequence[Tuple[str, str, float]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Packs scored ``(label, text, score)`` chunks into one context string.
+
+        The label (e.g. a research facet) prefixes the chunk, as ``[label] chunk``;
+        an empty label adds nothing. Packed chunks appear best first.
+
+        Returns:
+            tuple: The context and a report with the ``candidates`` and ``chunks``
+            considered, the chunks ``packed``, the ``tokens`` used, the ``budget``
+            and the candidate ``tokens_available`` before packing.
+        """
+        chunks = self._chunks(candidates)
+        entries = [f"[{label}] {chunk}" if label else chunk for label, chunk in chunks]
+        counts = self.count_tokens(entries)
+        separator_tokens = self.count_tokens([self.separator])[0]
+
+        packed, used = [], 0
+        for entry, count in zip(entries, counts):
+            cost = count + (separator_tokens if packed else 0)
+            if used + cost > self.max_tokens:
+                continue
+            packed.append(entry)
+            used += cost
+        return self.separator.join(packed), {
+            "candidates": len(candidates),
+            "chunks": len(chunks),
+            "packed": len(packed),
+            "tokens": used,
+            "budget": self.max_tokens,
+            "tokens_available": sum(counts),
+        }
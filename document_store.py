@@ -0,0 +1,418 @@
+import hashlib
+import json
+import os
+import threading
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from lexical_index import BM25Index
+
+
+class DocumentStore:
+    """
+    Append-only JSONL document store with an id -> byte offset index.
+
+    Every document is one JSON line in ``storage_path``. A binary sidecar
+    (``<storage_path>.idx``) holds an ``(id, offset)`` pair per line, so opening the
+    store reads only the sidecar plus any lines written after it, never the whole
+    corpus. ``get_document`` is a single seek and one line parse.
+
+    Writes are appended and fsync'd once per ``add_documents`` call. A torn final line
+    from a crash mid-write is truncated on the next open. Deleted documents are
+    recorded as tombstone lines and dropped from the file by ``compact()``.
+
+    Every document records a hash of its content. ``upsert_documents`` uses it to
+    reuse unchanged documents instead of appending duplicates, and supersedes the
+    previous version of a document whose ``source`` metadata matches but whose
+    content changed. Each document's hash and source are also appended to a
+    ``<storage_path>.keys`` companion file, so the lookups are loaded from that
+    small file the first time they are needed; only documents it does not cover
+    (e.g. written before it existed) are read from the store.
+
+    ``search_lexical`` ranks live documents with a BM25 inverted index. Like the
+    lookups it is built by one scan on first use; after that every add and delete
+    updates it incrementally.
+
+    Args:
+        storage_path (str): JSONL file backing the store. If it does not exist but a
+            legacy ``.json`` array with the same stem does, that file is imported.
+    """
+
+    def __init__(self, storage_path: str = "document_store.jsonl"):
+        self.storage_path = storage_path
+        self.index_path = f"{storage_path}.idx"
+        self.keys_path = f"{storage_path}.keys"
+        self._offsets: Dict[int, int] = {}
+        self._next_id = 0
+        # content hash -> doc id and source -> doc id for live documents, plus the
+        # reverse mapping; None until upsert_documents first needs them
+        self._by_hash: Dict[str, int] = None
+        self._by_source: Dict[str, int] = None
+        self._keys: Dict[int, Tuple[str, str]] = None
+        # BM25 index over live documents; None until search_lexical first needs it
+        self._lexical: BM25Index = None
+        # Serializes readers and writers when one store is shared by several agents
+        self._lock = threading.RLock()
+
+        legacy_path = os.path.splitext(storage_path)[0] + ".json"
+        if not os.path.exists(storage_path) and legacy_path != storage_path and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+        self._load_index()
+        self._reader = open(self.storage_path, "rb")
+
+    def _import_legacy(self, legacy_path: str):
+        # One-time migration from the old whole-file JSON array format
+        with open(legacy_path, "r") as f:
+            documents = json.load(f)
+        with open(self.storage_path, "wb") as f:
+            for doc in documents:
+                f.write(self._encode(doc))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record) + "\n").encode("utf-8")
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        if not os.path.exists(self.storage_path):
+            open(self.storage_path, "ab").close()
+
+        entries = array("q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            entries.frombytes(data[:len(data) - len(data) % (2 * entries.itemsize)])
+        data_size = os.path.getsize(self.storage_path)
+
+        tail_offset, tail_id = None, None
+        for i in range(0, len(entries), 2):
+            doc_id, offset = entries[i], entries[i + 1]
+            if offset >= data_size:
+                continue  # sidecar ran ahead of a truncated data file
+            self._apply(doc_id, offset)
+            if tail_offset is None or offset > tail_offset:
+                tail_offset, tail_id = offset, doc_id
+
+        # Parse only the lines after the last one the sidecar covers
+        with open(self.storage_path, "rb") as f:
+            stale = False
+            if tail_offset is not None:
+                f.seek(tail_offset)
+                if self._parse(f.readline()).get("id") != tail_id:
+                    # The sidecar describes another version of the data file, e.g. one
+                    # left by a crash during compact(), so rebuild it from the data
+                    self._offsets, self._next_id, stale = {}, 0, True
+                    f.seek(0)
+            valid_end = f.tell()
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                record = self._parse(line)
+                if not record or not line.endswith(b"\n"):
+                    break
+                valid_end = f.tell()
+                stale |= self._apply(record["id"], None if record.get("deleted") else offset)
+
+        if valid_end < data_size:
+            # Drop a torn final line left by a crash mid-write
+            with open(self.storage_path, "r+b") as f:
+                f.truncate(valid_end)
+        if stale or not os.path.exists(self.index_path):
+            self._rewrite_index()
+
+    @staticmethod
+    def _parse(line: bytes) -> Dict[str, Any]:
+        # A record line, or an empty dict for a torn or misaligned one
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {}
+        return record if isinstance(record, dict) else {}
+
+    def _apply(self, doc_id: int, offset) -> bool:
+        # Records one line in the in-memory index (offset None marks a tombstone) and
+        # returns whether the set of live documents changed
+        self._next_id = max(self._next_id, doc_id + 1)
+        if offset is None:
+            return self._offsets.pop(doc_id, None) is not None
+        self._offsets[doc_id] = offset
+        return True
+
+    def _rewrite_index(self):
+        entries = array("q")
+        for doc_id, offset in self._offsets.items():
+            entries.extend((doc_id, offset))
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            entries.tofile(f)
+        os.replace(tmp_path, self.index_path)
+
+    def _append(self, records: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        # Appends records with one write and one fsync, returning (id, offset) pairs
+        lines = [self._encode(record) for record in records]
+        with open(self.storage_path, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        placed = []
+        for record, line in zip(records, lines):
+            placed.append((record["id"], offset))
+            offset += len(line)
+        return placed
+
+    def add_documents(self, documents: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        """
+        Appends several ``(content, metadata)`` documents with a single fsync.
+
+        Returns:
+            list: The ids assigned to the documents, in input order.
+        """
+        with self._lock:
+            timestamp = datetime.now().isoformat()
+            records = []
+            for content, metadata in documents:
+                records.append({
+                    'id': self._next_id,
+                    'content': content,
+                    'metadata': metadata or {},
+                    'timestamp': timestamp,
+                    'hash': self.content_hash(content)
+                })
+                self._next_id += 1
+            placed = self._append(records)
+            self._append_keys(records)
+            if self._keys is not None:
+                for record in records:
+                    self._track(record['id'], record['hash'], record['metadata'].get('source'))
+            if self._lexical is not None:
+                self._lexical.add_documents((record['id'], record['content']) for record in records)
+
+            entries = array("q")
+            for doc_id, offset in placed:
+                self._offsets[doc_id] = offset
+                entries.extend((doc_id, offset))
+            # The sidecar is only a cache of the data file, so it is not fsync'd
+            with open(self.index_path, "ab") as f:
+                entries.tofile(f)
+            return [record['id'] for record in records]
+
+    def add_document(self, content: str, metadata: Dict[str, Any] = None) -> int:
+        return self.add_documents([(content, metadata)])[0]
+
+    def _append_keys(self, records: List[Dict[str, Any]]):
+        # Like the sidecar, the keys file is a cache of the data file and is not fsync'd
+        with open(self.keys_path, "a") as f:
+            f.writelines(json.dumps([record['id'], record['hash'], record['metadata'].get('source')]) + "\n"
+                         for record in records)
+
+    def _track(self, doc_id: int, content_hash: str, source: str):
+        self._by_hash[content_hash] = doc_id
+        if source is not None:
+            self._by_source[source] = doc_id
+        self._keys[doc_id] = (content_hash, source)
+
+    def _untrack(self, doc_id: int):
+        content_hash, source = self._keys.pop(doc_id)
+        if self._by_hash.get(content_hash) == doc_id:
+            del self._by_hash[content_hash]
+        if source is not None and self._by_source.get(source) == doc_id:
+            del self._by_source[source]
+
+    def _load_keys(self):
+        # Reads the keys file, then parses only the live documents it does not cover;
+        # records written before hashes existed are hashed here. Ids are never reused,
+        # so an entry stays valid for as long as its document is live
+        if self._keys is not None:
+            return
+        self._by_hash, self._by_source, self._keys = {}, {}, {}
+        stale = False
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                for line in f:
+                    try:
+                        doc_id, content_hash, source = json.loads(line)
+                    except (ValueError, TypeError):
+                        stale = True  # torn final line
+                        continue
+                    if doc_id in self._offsets and doc_id not in self._keys:
+                        self._track(doc_id, content_hash, source)
+                    else:
+                        stale = True  # deleted since
+        missing = [doc_id for doc_id in self.ids() if doc_id not in self._keys]
+        for doc_id in missing:
+            doc = self.get_document(doc_id)
+            self._track(doc_id, doc.get('hash') or self.content_hash(doc['content']), doc['metadata'].get('source'))
+        if stale or missing:
+            self._rewrite_keys()
+
+    def _rewrite_keys(self):
+        tmp_path = f"{self.keys_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps([doc_id, content_hash, source]) + "\n"
+                         for doc_id, (content_hash, source) in sorted(self._keys.items()))
+        os.replace(tmp_path, self.keys_path)
+
+    def upsert_documents(self, documents: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Adds documents that are not already stored, with a single fsync.
+
+        A document whose content matches a live document, and whose ``source``
+        metadata (if any) matches too, is not written again; its existing id is
+        returned. A document with the ``source`` of a live document but different
+        content supersedes it: the new version is appended and the old one deleted.
+
+        Returns:
+            tuple: The ids of the documents in input order, and a report with the
+            ``added`` and ``unchanged`` counts and the ``superseded`` doc ids.
+        """
+        with self._lock:
+            self._load_keys()
+            ids: List[int] = [None] * len(documents)
+            new, superseded, pending = [], [], {}
+            for position, (content, metadata) in enumerate(documents):
+                content_hash = self.content_hash(content)
+                source = (metadata or {}).get('source')
+                if source is None:
+                    existing = self._by_hash.get(content_hash)
+                else:
+                    existing = self._by_source.get(source)
+                    if existing is not None and self._keys[existing][0] != content_hash:
+                        superseded.append(existing)
+                        existing = None
+                if existing is None:
+                    # Repeats within this batch share the first copy
+                    existing = pending.get((content_hash, source))
+                if existing is not None:
+                    ids[position] = existing
+                    continue
+                pending[(content_hash, source)] = ~len(new)
+                ids[position] = ~len(new)
+                new.append((content, metadata))
+
+            added = self.add_documents(new) if new else []
+            ids = [added[~doc_id] if doc_id < 0 else doc_id for doc_id in ids]
+            superseded = list(dict.fromkeys(superseded))
+            self.delete_documents(superseded)
+            return ids, {
+                "added": len(added),
+                "unchanged": len(documents) - len(added),
+                "superseded": superseded,
+            }
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        with self._lock:
+            if self._lexical is None:
+                lexical = BM25Index()
+                lexical.add_documents((doc['id'], doc['content']) for doc in self)
+                self._lexical = lexical
+            return self._lexical
+
+    def search_lexical(self, query: str, top_k: int = 3, allowed_ids=None) -> List[Tuple[int, float]]:
+        """
+        Ranks live documents against ``query`` with BM25, without any embedding.
+
+        Returns:
+            list: Up to ``top_k`` ``(doc_id, score)`` pairs, best first, optionally
+            only from the documents in ``allowed_ids``.
+        """
+        with self._lock:
+            return self.lexical_index.search(query, top_k, allowed_ids)
+
+    def get_document(self, doc_id: int) -> Dict[str, Any]:
+        with self._lock:
+            offset = self._offsets.get(doc_id)
+            if offset is None:
+                return None
+            self._reader.seek(offset)
+            record = self._parse(self._reader.readline())
+            if record.get("id") == doc_id:
+                return record
+            # The offset points at another record, so the sidecar was out of date:
+            # rebuild the index from the data file and look the document up again
+            self._reload()
+            return self.get_document(doc_id) if doc_id in self._offsets else None
+
+    def _reload(self):
+        # Rebuilds every in-memory index from the data file alone
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        self._offsets, self._next_id = {}, 0
+        self._by_hash = self._by_source = self._keys = None
+        self._lexical = None
+        self._load_index()
+
+    def delete_document(self, doc_id: int):
+        self.delete_documents([doc_id])
+
+    def delete_documents(self, doc_ids: List[int]):
+        with self._lock:
+            doc_ids = [doc_id for doc_id in dict.fromkeys(doc_ids) if doc_id in self._offsets]
+            if not doc_ids:
+                return
+            self._append([{'id': doc_id, 'deleted': True} for doc_id in doc_ids])
+            for doc_id in doc_ids:
+                del self._offsets[doc_id]
+                if self._keys is not None:
+                    self._untrack(doc_id)
+            if self._lexical is not None:
+                self._lexical.remove(doc_ids)
+            # The sidecar only lists live documents, so rebuild it without these
+            self._rewrite_index()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._offsets
+
+    def ids(self) -> List[int]:
+        return sorted(self._offsets)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Streams live documents in id order without holding them all in memory
+        for doc_id in self.ids():
+            doc = self.get_document(doc_id)
+            if doc is not None:
+                yield doc
+
+    def compact(self):
+        """
+        Rewrites the data file with only live documents, dropping tombstones, and
+        rebuilds the sidecar index. The new file replaces the old one atomically.
+        The old sidecar is removed before the swap, so a crash before the new one is
+        written leaves no sidecar and the next open rebuilds it from the data file.
+        """
+        with self._lock:
+            tmp_path = f"{self.storage_path}.tmp"
+            offsets = {}
+            with open(tmp_path, "wb") as out:
+                for doc_id in self.ids():
+                    self._reader.seek(self._offsets[doc_id])
+                    offsets[doc_id] = out.tell()
+                    out.write(self._reader.readline())
+                last_id = self._next_id - 1
+                if last_id >= 0 and last_id not in offsets:
+                    # Keep the newest tombstone so ids are never reused after reopening
+                    out.write(self._encode({'id': last_id, 'deleted': True}))
+                out.flush()
+                os.fsync(out.fileno())
+            self._reader.close()
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            os.replace(tmp_path, self.storage_path)
+            self._offsets = offsets
+            self._rewrite_index()
+            self._reader = open(self.storage_path, "rb")
+
+    def close(self):
+        self._reader.close()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, TYPE_CHECKING
+
+# numpy is imported on first lookup so that creating the cache stays cheap at startup
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.path.join(".cache", "embeddings.sqlite")
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed on model name plus a hash of the text.
+
+    Vectors are stored as raw float32 bytes in SQLite, so a 768-d embedding costs
+    3 KB on disk. Entries beyond ``max_entries`` are evicted least-recently-used.
+    A single instance is thread-safe and can be shared by every embedding model.
+
+    Args:
+        path (str): SQLite file backing the cache.
+        max_entries (int): Upper bound on stored vectors before LRU eviction.
+    """
+
+    def __init__(self, path: str = DEFAULT_EMBEDDING_CACHE_PATH, max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY, vector BLOB, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> bytes:
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Returns the cached vectors for whichever of ``keys`` are present.
+        """
+        import numpy as np
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+            self.hits += sum(key in found for key in keys)
+            self.misses += sum(key not in found for key in keys)
+        return found
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """
+        Stores one vector per key, evicting the least recently used entries if the
+        cache is over capacity.
+        """
+        import numpy as np
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in zip(keys, vectors)]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)", rows
+            )
+            self._count += self._conn.total_changes - before
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN"
+                    " (SELECT key FROM embeddings ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": self._count,
+        }
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+
+import requests
+
+from http_session import create_session
+import tracing
+
+GITHUB_SEARCH_URL = "https://api.github.com/search/repositories"
+
+# GitHub's search API allows 30 requests a minute with a token and 10 without
+SEARCH_RATE_AUTHENTICATED = 30 / 60
+SEARCH_RATE_ANONYMOUS = 10 / 60
+# GitHub never returns more than the first 1000 results of a search
+MAX_SEARCH_RESULTS = 1000
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket kept in step with GitHub's rate-limit headers.
+
+    Every request takes one token. Tokens refill at ``rate`` per second up to
+    ``capacity``. After each response, ``update`` clamps the bucket to the server's
+    ``X-RateLimit-Remaining`` and spreads that budget over the time left until
+    ``X-RateLimit-Reset``. An exhausted limit or a ``Retry-After`` header blocks every
+    caller until the server says requests may resume.
+
+    Args:
+        rate (float): Initial refill rate in requests per second.
+        capacity (float): Largest burst allowed. Defaults to one minute of ``rate``.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate * 60)
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        # Start of the server's next window and its request budget, once known
+        self._reset_at = None
+        self._limit = None
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._reset_at is not None and now >= self._reset_at:
+            # A new window has started on the server, so its full budget is available again
+            self.tokens = max(self.tokens, min(self.capacity, self._limit or self.capacity))
+            self._reset_at = None
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent, then takes a token.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                    if self._reset_at is not None:
+                        delay = min(delay, self._reset_at - now)
+                self.waited += delay
+            time.sleep(delay)
+
+    def update(self, headers):
+        """
+        Adjusts the bucket from the rate-limit headers of a response.
+        """
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reset is a Unix timestamp; convert it to the monotonic clock
+            until_reset = max(0.0, float(reset) - time.time()) if reset is not None else None
+            if until_reset is not None:
+                self._reset_at = now + until_reset
+            if limit is not None:
+                self._limit = int(limit)
+            if remaining is not None:
+                remaining = int(remaining)
+                self.tokens = min(self.tokens, remaining)
+                if remaining == 0 and until_reset is not None:
+                    self.blocked_until = max(self.blocked_until, now + until_reset)
+                elif until_reset:
+                    self.rate = max(remaining / until_reset, 1e-3)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + float(retry_after))
+
+
+class GitHubSearch:
+    """
+    Rate-limited, paginated client for GitHub's repository search.
+
+    One instance is safe to share between threads: requests go through a pooled
+    session and a shared RateLimiter, so any number of concurrent callers stay
+    within the account's budget. Throttled (403/429) and server error responses are
+    retried with exponential backoff and full jitter.
+
+    Args:
+        api_key (str): Optional GitHub token sent as the Authorization header.
+        session (requests.Session): Optional pooled session.
+        base_url (str): Repository search endpoint, overridable for a local server.
+        per_page (int): Results requested per page (GitHub allows up to 100).
+        max_pages (int): Pages fetched per query.
+        max_retries (int): Retries per page after the first attempt.
+        backoff (float): Base delay in seconds for the retry backoff.
+        max_backoff (float): Upper bound on a single retry delay.
+        timeout (float): Seconds to wait for each response.
+        limiter (RateLimiter): Optional limiter shared with other clients.
+    """
+
+    def __init__(self, api_key: str = None, session=None, base_url: str = GITHUB_SEARCH_URL,
+                 per_page: int = 30, max_pages: int = 1, max_retries: int = 3, backoff: float = 1.0,
+                 max_backoff: float = 30.0, timeout: float = 10.0, limiter: RateLimiter = None):
+        self.api_key = api_key
+        self.session = session or create_session()
+        self.base_url = base_url
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter(SEARCH_RATE_AUTHENTICATED if api_key else SEARCH_RATE_ANONYMOUS)
+        self.retries = 0
+        self._headers = {"Accept": "application/vnd.github+json"}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+
+    def search(self, query: str):
+        """
+        Fetches up to ``max_pages`` pages of repositories matching ``query``.
+
+        Returns:
+            list: Title/URL pairs of the matching repositories, or None if the first
+            page could not be fetched.
+        """
+        tracing.current_span().set(cache_hit=False)
+        repositories = []
+        for page in range(1, self.max_pages + 1):
+            data = self._get_page({"q": query, "per_page": self.per_page, "page": page})
+            if data is None:
+                return repositories if page > 1 else None
+            items = data.get("items", [])
+            repositories.extend({"title": repo["name"], "url": repo["html_url"]} for repo in items)
+            total = min(data.get("total_count", 0), MAX_SEARCH_RESULTS)
+            if len(items) < self.per_page or page * self.per_page >= total:
+                break
+        return repositories
+
+    def _get_page(self, params: dict):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(self.base_url, params=params, headers=self._headers,
+                                            timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                self.limiter.update(response.headers)
+                tracing.current_span().add("bytes_in", len(response.content))
+                if response.status_code == 200:
+                    return response.json()
+                error = f"Status Code: {response.status_code}"
+                if not self._retryable(response):
+                    break
+            if attempt < self.max_retries:
+                self.retries += 1
+                tracing.current_span().add("retries")
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+        print(f"Error: Failed to fetch GitHub data for {params['q']} (page {params['page']}), {error}")
+        return None
+
+    @staticmethod
+    def _retryable(response) -> bool:
+        if response.status_code in (429, 500, 502, 503, 504):
+            return True
+        # GitHub signals both primary and secondary rate limits with 403
+        return response.status_code == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+        )
@@ -0,0 +1,20 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Creates a requests session backed by a keep-alive connection pool.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host. Should be at
+            least the number of threads that share the session.
+
+    Returns:
+        requests.Session: A session that reuses TCP/TLS connections across calls.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
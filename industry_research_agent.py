@@ -1,12 +1,39 @@
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from http_session import create_session
+import tracing
+from search_results import SearchResultParser, SearchResults
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+
+# Result key and fetch method for every facet collected by run()
+FACETS = [
+    ("industry_data", "fetch_industry_data"),
+    ("company_data", "fetch_company_data"),
+    ("market_size", "fetch_market_size"),
+    ("competitive_landscape", "fetch_competitive_landscape"),
+    ("technology_trends", "fetch_technology_trends"),
+    ("financial_performance", "fetch_financial_performance"),
+    ("customer_sentiment", "fetch_customer_sentiment"),
+    ("regulatory_updates", "fetch_regulatory_updates"),
+    ("esg_initiatives", "fetch_esg_initiatives"),
+]
 
 class IndustryResearchAgent:
-    def __init__(self, company_name, industry_name, api_key):
+    def __init__(self, company_name, industry_name, api_key, base_url=SERPER_SEARCH_URL,
+                 session=None, max_concurrency=len(FACETS), timeout=10.0, cache=None):
         self.company_name = company_name
         self.industry_name = industry_name
         self.api_key = api_key
-        self.base_url = "https://google.serper.dev/search"
+        self.base_url = base_url
+        # Concurrency limit for run() and per-query timeout in seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        # Keep-alive pool shared by every query; pass one in to share it across agents
+        self.session = session or create_session(self.max_concurrency)
+        # Optional ResponseCache shared with the other agents
+        self.cache = cache
 
     def fetch_industry_data(self):
         # Searching for industry trends related to AI
@@ -54,6 +81,23 @@ class IndustryResearchAgent:
         return self.perform_search(query)
 
     def perform_search(self, query):
+        # Returns the compact SearchResults form of the response, or None on failure
+        with tracing.span("serper.search", cache_hit=self.cache is not None):
+            try:
+                if self.cache is not None:
+                    # The cache holds the compact dict; entries cached as full Serper
+                    # responses are compacted on read
+                    data = self.cache.fetch(self.base_url, query, lambda: self._post_search(query).to_dict())
+                    return SearchResults.from_json(data)
+                return self._post_search(query)
+            except requests.exceptions.HTTPError as err:
+                print(f"HTTP error occurred: {err}")  # Handle HTTP errors
+                return None
+            except Exception as e:
+                print(f"An error occurred: {e}")  # Handle other exceptions
+                return None
+
+    def _post_search(self, query):
         # Prepare the payload and headers
         payload = json.dumps({"q": query})
         headers = {
@@ -61,43 +105,32 @@ class IndustryResearchAgent:
             'Content-Type': 'application/json'
         }
         
-        try:
-            # Make the POST request to the Serper API
-            response = requests.post(self.base_url, headers=headers, data=payload)
+        # Make the POST request to the Serper API over the pooled session, streaming the
+        # body through the parser so only the compact results are ever held in memory
+        with self.session.post(self.base_url, headers=headers, data=payload, timeout=self.timeout,
+                               stream=True) as response:
             response.raise_for_status()  # Raise an error for bad responses
-            data = response.json()  # Parse the JSON response
-            return data  # Return the JSON data
-        except requests.exceptions.HTTPError as err:
-            print(f"HTTP error occurred: {err}")  # Handle HTTP errors
-            return None
-        except Exception as e:
-            print(f"An error occurred: {e}")  # Handle other exceptions
-            return None
-
-    def run(self):
-        # Collecting data from all fetch functions
-        industry_data = self.fetch_industry_data()
-        company_data = self.fetch_company_data()
-        market_size = self.fetch_market_size()
-        competitive_landscape = self.fetch_competitive_landscape()
-        technology_trends = self.fetch_technology_trends()
-        financial_performance = self.fetch_financial_performance()
-        customer_sentiment = self.fetch_customer_sentiment()
-        regulatory_updates = self.fetch_regulatory_updates()
-        esg_initiatives = self.fetch_esg_initiatives()
-        
-        # Return a combined result
-        return {
-            "industry_data": industry_data,
-            "company_data": company_data,
-            "market_size": market_size,
-            "competitive_landscape": competitive_landscape,
-            "technology_trends": technology_trends,
-            "financial_performance": financial_performance,
-            "customer_sentiment": customer_sentiment,
-            "regulatory_updates": regulatory_updates,
-            "esg_initiatives": esg_initiatives
-        }
+            parser = SearchResultParser()
+            received = 0
+            for chunk in response.iter_content(chunk_size=16384):
+                received += len(chunk)
+                parser.feed(chunk)
+        span = tracing.current_span()
+        span.set(cache_hit=False)
+        span.add("bytes_out", len(payload))
+        span.add("bytes_in", received)
+        return parser.finish()  # Return the compact results
+
+    def run(self, concurrent=True):
+        # Collecting data from all fetch functions, fanned out over a bounded thread
+        # pool so the wall-clock cost is roughly one round-trip instead of nine
+        if not concurrent or self.max_concurrency == 1:
+            return {key: getattr(self, method)() for key, method in FACETS}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {key: executor.submit(getattr(self, method)) for key, method in FACETS}
+            # Return a combined result, keyed in facet order
+            return {key: future.result() for key, future in futures.items()}
 
 # Example usage
 if __name__ == "__main__":
@@ -109,4 +142,4 @@ if __name__ == "__main__":
     
     # Run the agent and print the results
     results = agent.run()
-    print(json.dumps(results, indent=2))  # Pretty-print the combined results
\ No newline at end of file
+    print(json.dumps({key: value and value.to_dict() for key, value in results.items()}, indent=2))  # Pretty-print the combined results
\ No newline at end of file
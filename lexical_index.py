@@ -0,0 +1,100 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# Lowercased alphanumeric runs, so "AAPL", "$AAPL" and "aapl's" all match "aapl" and
+# "iPhone-15" is indexed as "iphone" and "15"
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    Each term maps to a posting dict of ``doc_id -> term frequency``. Every
+    document's length and distinct terms are kept alongside, so adding or removing
+    a document touches only its own postings. A query scores just the postings of
+    its terms, with no model forward pass, so exact matches on product names,
+    tickers and other rare tokens rank first.
+
+    Args:
+        k1 (float): Term frequency saturation.
+        b (float): Strength of document length normalization.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: int, text: str):
+        self.add_documents([(doc_id, text)])
+
+    def add_documents(self, documents: Iterable[Tuple[int, str]]):
+        """
+        Indexes ``(doc_id, text)`` pairs; a doc id already indexed is replaced.
+        """
+        for doc_id, text in documents:
+            if doc_id in self._lengths:
+                self.remove([doc_id])
+            terms = tokenize(text)
+            frequencies = Counter(terms)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._terms[doc_id] = tuple(frequencies)
+            self._lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+
+    def remove(self, doc_ids: Iterable[int]):
+        for doc_id in doc_ids:
+            if doc_id not in self._lengths:
+                continue
+            for term in self._terms.pop(doc_id):
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(doc_id)
+
+    def search(self, query: str, top_k: int = 3, allowed_ids=None) -> List[Tuple[int, float]]:
+        """
+        Returns the ``top_k`` best ``(doc_id, score)`` pairs, best first.
+
+        Args:
+            query (str): Free-text query; documents sharing no term with it are not returned.
+            top_k (int): Number of results.
+            allowed_ids: Optional collection of doc ids to restrict the search to.
+        """
+        if not self._lengths:
+            return []
+        if allowed_ids is not None and not isinstance(allowed_ids, (set, frozenset, dict)):
+            allowed_ids = set(allowed_ids)
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                if allowed_ids is not None and doc_id not in allowed_ids:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
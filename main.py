@@ -1,18 +1,51 @@
-import json
 import os
 from dotenv import load_dotenv
-from industry_research_agent import IndustryResearchAgent
-from use_case_generation_agent import RAGAgent
-from resource_asset_agent import ResourceAssetAgent
+from industry_research_agent import SERPER_SEARCH_URL, IndustryResearchAgent
+from use_case_generation_agent import RAGAgent, SimpleEmbedding
+from embedding_cache import EmbeddingCache
+from resource_asset_agent import GITHUB_SEARCH_URL, ResourceAssetAgent
 from proposal import ProposalAgent
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from search_results import SearchResults
+import tracing
 
-def main():
+def main(company_name="APPLE INC", industry_name="Technology and Consumer Electronics"):
     # Load environment variables from .env file
     load_dotenv()
-
-    # Define company and industry names
-    company_name = "APPLE INC"
-    industry_name = "Technology and Consumer Electronics"
+    
+    # Endpoint and model overrides, e.g. to run against local stand-ins. The Groq
+    # client reads GROQ_BASE_URL itself
+    serper_url = os.getenv("SERPER_BASE_URL", SERPER_SEARCH_URL)
+    github_url = os.getenv("GITHUB_SEARCH_URL", GITHUB_SEARCH_URL)
+    embedding_model_name = os.getenv("PIPELINE_EMBEDDING_MODEL", "bert-base-uncased")
+    # PIPELINE_EMBEDDING_BACKEND=int8 quantizes the model; PIPELINE_EMBEDDING_THREADS caps torch's threads
+    embedding_backend = os.getenv("PIPELINE_EMBEDDING_BACKEND", "fp32")
+    embedding_threads = int(os.getenv("PIPELINE_EMBEDDING_THREADS", 0)) or None
+    # PIPELINE_RETRIEVAL picks hybrid (BM25 + dense, the default), dense or lexical context retrieval
+    retrieval = os.getenv("PIPELINE_RETRIEVAL", "hybrid")
+    # PIPELINE_CONTEXT_TOKENS budgets the retrieved prompt context; 0 uses whole documents
+    context_tokens = int(os.getenv("PIPELINE_CONTEXT_TOKENS", 2048)) or None
+    
+    # Shared on-disk response cache; PIPELINE_OFFLINE=1 replays it with no network access
+    offline = os.getenv("PIPELINE_OFFLINE") == "1"
+    if offline:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    cache = ResponseCache(
+        path=os.getenv("PIPELINE_CACHE_PATH", DEFAULT_CACHE_PATH),
+        ttl=float(os.getenv("PIPELINE_CACHE_TTL", 24 * 3600)),
+        offline=offline,
+    )
+    
+    # PIPELINE_TRACE_REPORT / PIPELINE_CHROME_TRACE name the files the per-stage timing
+    # report and Chrome trace are written to; with neither set tracing stays off
+    trace_report = os.getenv("PIPELINE_TRACE_REPORT")
+    chrome_trace = os.getenv("PIPELINE_CHROME_TRACE")
+    tracer = tracing.enable() if trace_report or chrome_trace else None
+    
+    # Load the embedding model on a background thread while step 1 waits on the network
+    embedding_model = SimpleEmbedding(embedding_model_name, cache=EmbeddingCache(),
+                                      backend=embedding_backend, num_threads=embedding_threads)
+    embedding_model.warm_up()
     
     try:
         # Step 1: Run Industry & Company Research Agent using Serper API key
@@ -21,58 +54,69 @@ def main():
         industry_research_agent = IndustryResearchAgent(
             company_name, 
             industry_name, 
-            os.getenv("SERPER_API_KEY")
+            os.getenv("SERPER_API_KEY"),
+            base_url=serper_url,
+            cache=cache
         )
-        industry_research_results = industry_research_agent.run()
+        with tracing.span("step.research"):
+            industry_research_results = industry_research_agent.run()
         
         # Validate and process data
         industry_data = industry_research_results.get("industry_data")
         company_data = industry_research_results.get("company_data")
         
-        print("Industry Data:", type(industry_data), industry_data)
-        print("Company Data:", type(company_data), company_data)
+        # Print a summary rather than the results themselves
+        print("Industry Data:", industry_data)
+        print("Company Data:", company_data)
         
-        # Convert non-string data types if necessary
+        # Convert the compact search results to the plain text the RAG agent stores
         if not isinstance(industry_data, str):
-            print("Converting industry data to string format...")
-            industry_data = json.dumps(industry_data) if isinstance(industry_data, dict) else str(industry_data)
+            industry_data = industry_data.to_text() if isinstance(industry_data, SearchResults) else str(industry_data)
             
         if not isinstance(company_data, str):
-            print("Converting company data to string format...")
-            company_data = json.dumps(company_data) if isinstance(company_data, dict) else str(company_data)
+            company_data = company_data.to_text() if isinstance(company_data, SearchResults) else str(company_data)
         
-        # Step 2: Generate Use Cases using GROQ API key
-        print("\nStep 2: Generating Use Cases")
-        print("=" * 50)
+        # Steps 2 and 3 run as a stream: use cases are yielded as soon as each one is
+        # complete, and their GitHub lookups start while the rest are still generating
         groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
+        if not groq_api_key and not offline:
             raise Exception("GROQ API key not found in environment variables")
-            
-        use_case_agent = RAGAgent(industry_data, company_data, api_key=groq_api_key)
-        use_cases = use_case_agent.generate_use_cases()
-        
-        if use_cases is None:
-            raise Exception("Use case generation failed")
+        github_api_key = os.getenv("GITHUB_API_KEY")
+        if not github_api_key and not offline:
+            raise Exception("GitHub API key not found in environment variables")
         
-        print(f"Generated {len(use_cases)} use cases")
+        # Step 2: Generate Use Cases using GROQ API key
+        print("\nStep 2: Generating Use Cases")
+        print("=" * 50)
+        use_case_agent = RAGAgent(
+            industry_data, company_data, api_key=groq_api_key, cache=cache, embedding_model=embedding_model,
+            research=industry_research_results, retrieval=retrieval, context_tokens=context_tokens
+        )
+        print("Knowledge base:", use_case_agent.kb_report)
+        use_case_stream = use_case_agent.iter_use_cases()
         
         # Step 3: Collect Resources using GitHub API key
         print("\nStep 3: Collecting Resources")
         print("=" * 50)
-        github_api_key = os.getenv("GITHUB_API_KEY")
-        if not github_api_key:
-            raise Exception("GitHub API key not found in environment variables")
-            
-        resource_agent = ResourceAssetAgent(use_cases, github_api_key)
-        datasets = resource_agent.run()
+        resource_agent = ResourceAssetAgent(use_case_stream, github_api_key, cache=cache, base_url=github_url)
+        with tracing.span("step.use_cases_and_resources"):
+            datasets = resource_agent.run()
+        use_cases = resource_agent.use_cases
+        
+        if not use_cases:
+            raise Exception("Use case generation failed")
         
+        print(f"Generated {len(use_cases)} use cases")
         print(f"Collected {len(datasets)} datasets")
         
         # Step 4: Generate Final Proposal
         print("\nStep 4: Generating Final Proposal")
         print("=" * 50)
-        proposal_agent = ProposalAgent(industry_data, company_data, use_cases, datasets)
-        final_proposal = proposal_agent.run()
+        proposal_agent = ProposalAgent(
+            {"industry": industry_name}, {"company_name": company_name}, use_cases, datasets
+        )
+        with tracing.span("step.proposal"):
+            final_proposal = proposal_agent.run()
         
         # Create output directory if it doesn't exist
         output_dir = "output"
@@ -87,10 +131,21 @@ def main():
         print(f"\nFinal proposal saved to: {proposal_path}")
         print("\nProposal Preview:\n")
         print(final_proposal[:500] + "...\n")
+        print("Response cache:", cache.stats())
         
     except Exception as e:
         print(f"\nError in pipeline execution: {str(e)}")
         raise
+    
+    finally:
+        if tracer is not None:
+            tracing.disable()
+            if trace_report:
+                tracer.write_report(trace_report)
+                print(f"Trace report saved to: {trace_report}")
+            if chrome_trace:
+                tracer.write_chrome_trace(chrome_trace)
+                print(f"Chrome trace saved to: {chrome_trace}")
 
 if __name__ == "__main__":
     main()
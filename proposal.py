@@ -1,18 +1,110 @@
+from proposal_renderer import ProposalRenderer
+import tracing
+
+
 class ProposalAgent:
-    def __init__(self, industry_data, company_data, use_cases, datasets):
+    def __init__(self, industry_data, company_data, use_cases, datasets, renderer=None):
         """
         Initializes the proposal agent with Apple-specific industry data, company data, use cases, and datasets.
         
         Args:
             industry_data (dict): Information on the tech industry context.
             company_data (dict): Information about Apple's goals and priorities.
-            use_cases (list): List of Apple-specific use cases.
-            datasets (list): List of dataset resources relevant to Apple's use cases.
+            use_cases (list): List of Apple-specific use cases, as UseCase records or dicts.
+            datasets (list): List of dataset resources relevant to Apple's use cases, either flat
+                entries with a ``use_case`` key or ResourceAssetAgent's per-use-case groups.
+            renderer (ProposalRenderer): Optional renderer whose executor and chunk size are
+                used for every format.
         """
         self.industry_data = industry_data
         self.company_data = company_data
         self.use_cases = use_cases
-        self.datasets = datasets
+        self.datasets = self._flatten_datasets(datasets)
+        self.resources_by_use_case = self._index_resources(self.datasets)
+        self.renderer = renderer
+
+    @staticmethod
+    def _flatten_datasets(datasets):
+        """
+        Flattens ResourceAssetAgent output (``{"use_case", "datasets": [...]}`` groups)
+        into one entry per resource, leaving already-flat entries unchanged.
+        
+        Args:
+            datasets (list): Grouped or flat dataset entries.
+        
+        Returns:
+            list: Resources, each carrying the ``use_case`` it belongs to.
+        """
+        resources = []
+        for entry in datasets or []:
+            if "datasets" in entry:
+                resources.extend({"use_case": entry["use_case"], **dataset} for dataset in entry["datasets"])
+            else:
+                resources.append(entry)
+        return resources
+
+    @staticmethod
+    def _index_resources(resources):
+        """
+        Groups resources by use case in one pass, so each use case looks up its
+        resources instead of scanning the whole list.
+        
+        Args:
+            resources (list): Flat resource entries with a ``use_case`` key.
+        
+        Returns:
+            dict: Use case title mapped to its resources, in input order.
+        """
+        index = {}
+        for resource in resources:
+            index.setdefault(resource['use_case'], []).append(resource)
+        return index
+
+    def _iter_sections(self):
+        """
+        Yields the markdown proposal one chunk at a time: the header, then the use cases.
+        
+        Returns:
+            generator: Markdown fragments that concatenate to the full proposal.
+        """
+        renderer = self._renderer_for(("markdown",))
+        for section in renderer.iter_sections(self.industry_data, self.company_data, self.use_cases,
+                                              self.resources_by_use_case):
+            yield section["markdown"]
+
+    def render(self, formats=("markdown", "html", "json")):
+        """
+        Renders the proposal to several formats in one pass over the use cases.
+        
+        Args:
+            formats (iterable): Format names from proposal_renderer.FORMATS.
+        
+        Returns:
+            dict: The rendered document per format name.
+        """
+        with tracing.span("proposal.render", use_cases=len(self.use_cases)) as span:
+            documents = self._renderer_for(formats).render(
+                self.industry_data, self.company_data, self.use_cases, self.resources_by_use_case
+            )
+            span.add("bytes_out", sum(len(document) for document in documents.values()))
+            return documents
+
+    def write_formats(self, outputs):
+        """
+        Streams the proposal to one file object per format in a single pass.
+        
+        Args:
+            outputs (dict): Writable text file objects keyed by format name.
+        """
+        with tracing.span("proposal.render", use_cases=len(self.use_cases)):
+            self._renderer_for(outputs).write(
+                outputs, self.industry_data, self.company_data, self.use_cases, self.resources_by_use_case
+            )
+
+    def _renderer_for(self, formats):
+        executor = self.renderer.executor if self.renderer else None
+        chunk_size = self.renderer.chunk_size if self.renderer else 128
+        return ProposalRenderer(list(formats), executor, chunk_size)
 
     def generate_proposal(self):
         """
@@ -22,46 +114,37 @@ class ProposalAgent:
         Returns:
             str: The final proposal as a markdown-formatted string.
         """
-        proposal_text = "# Apple Inc. AI/ML Implementation Proposal\n\n"
-        proposal_text += "## Executive Summary\n\n"
-        proposal_text += f"This proposal outlines key artificial intelligence and machine learning initiatives "
-        proposal_text += f"aligned with {self.company_data['company_name']}'s strategic goals "
-        proposal_text += f"of {', '.join(self.company_data['goals'])}.\n\n"
-        
-        proposal_text += "## Industry Context\n\n"
-        proposal_text += f"Domain: {self.industry_data['industry']}\n"
-        proposal_text += f"Current Focus: {self.industry_data['focus']}\n\n"
+        with tracing.span("proposal.generate", use_cases=len(self.use_cases)) as span:
+            proposal = "".join(self._iter_sections())
+            span.add("bytes_out", len(proposal))
+            return proposal
+
+    def write_to(self, fileobj):
+        """
+        Streams the proposal to a writable text file object one use case at a time,
+        without building the whole document in memory.
         
-        proposal_text += "## Proposed Use Cases\n\n"
+        Args:
+            fileobj: Any object with a ``write(str)`` method, such as an open file.
         
-        for use_case in self.use_cases:
-            proposal_text += f"### {use_case['use_case']}\n\n"
-            proposal_text += f"*Business Impact*: {use_case['impact']}\n\n"
-            proposal_text += f"*Implementation Strategy*: {use_case['strategy']}\n\n"
-            proposal_text += "#### Relevant Resources and Datasets:\n"
-            
-            resources = [dataset for dataset in self.datasets if dataset['use_case'] == use_case['use_case']]
-            if resources:
-                for resource in resources:
-                    proposal_text += f"- [{resource['title']}]({resource['url']})\n"
-                    if 'description' in resource:
-                        proposal_text += f"  - {resource['description']}\n"
-            else:
-                proposal_text += "- Custom data collection required\n"
-                
-            if 'references' in use_case:
-                proposal_text += "\n#### Industry Research & References:\n"
-                for reference in use_case['references']:
-                    proposal_text += f"- {reference}\n"
-            
-            if 'metrics' in use_case:
-                proposal_text += "\n#### Key Performance Indicators:\n"
-                for metric in use_case['metrics']:
-                    proposal_text += f"- {metric}\n"
-            
-            proposal_text += "\n---\n\n"
+        Returns:
+            int: Number of characters written.
+        """
+        written = 0
+        with tracing.span("proposal.write", use_cases=len(self.use_cases)) as span:
+            for section in self._iter_sections():
+                written += fileobj.write(section) or 0
+            span.add("bytes_out", written)
+        return written
+
+    def run(self):
+        """
+        Runs the agent and returns the generated proposal.
         
-        return proposal_text
+        Returns:
+            str: The final proposal as a markdown-formatted string.
+        """
+        return self.generate_proposal()
 
     def save_proposal(self, filename="Apple_AI_ML_Proposal.md"):
         """
@@ -70,10 +153,8 @@ class ProposalAgent:
         Args:
             filename (str): The filename to save the proposal as.
         """
-        proposal = self.generate_proposal()
-        
         with open(filename, "w", encoding='utf-8') as file:
-            file.write(proposal)
+            self.write_to(file)
         
         print(f"Apple Inc. proposal saved as {filename}")
 
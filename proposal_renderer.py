@@ -0,0 +1,324 @@
+import html
+import json
+from functools import lru_cache
+from json.encoder import encode_basestring
+from string import Formatter
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+
+
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Callable[..., str]:
+    """
+    Compiles a ``str.format``-style template into a function taking its fields as
+    keyword arguments.
+
+    The template is parsed once into its literal text and field slots; rendering
+    copies that list, fills the slots with the field values and joins it, with no
+    parsing. Compiled templates are cached by their text. Fields must be plain
+    names: no attribute access, indexing, conversions or format specs. Values must
+    already be strings. Unused keyword arguments are ignored, so callers can pass
+    the same fields to every format.
+    """
+    parts, slots = [], []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append(literal)
+        if field is not None:
+            if not field.isidentifier() or spec or conversion:
+                raise ValueError(f"Unsupported template field {{{field}}} in {template!r}")
+            slots.append((len(parts), field))
+            parts.append("")
+    if not slots:
+        text = "".join(parts)
+
+        def render(**_):
+            return text
+    else:
+        def render(**values):
+            pieces = parts.copy()
+            for position, field in slots:
+                pieces[position] = values[field]
+            return "".join(pieces)
+    return render
+
+
+def _json_escape(value) -> str:
+    # The C string encoder behind json.dumps, without its per-call setup
+    if isinstance(value, str):
+        return encode_basestring(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _html_escape(value) -> str:
+    return html.escape(str(value))
+
+
+class ProposalFormat:
+    """
+    A named set of section templates plus the escaping applied to every data value.
+
+    Lists (goals, resources, references, metrics) are rendered by a wrapper template
+    ``<list>`` around items rendered with ``<item>`` and joined with the list's
+    separator, or by ``<list>_empty`` when there are no items. Optional values
+    (focus, description) use their template only when present.
+
+    Args:
+        name (str): Format name, also the default file extension.
+        templates (dict): Template text per section name.
+        escape (callable): Converts a data value into safe output text.
+        separators (dict): Join string per list name, plus ``use_cases`` between sections.
+        extension (str): File extension for this format.
+    """
+
+    def __init__(self, name: str, templates: Dict[str, str], escape: Callable = str,
+                 separators: Dict[str, str] = None, extension: str = None):
+        self.name = name
+        self.templates = templates
+        self.escape = escape
+        self.separators = separators or {}
+        self.extension = extension or name
+        # Every section is compiled up front; missing sections render as empty text
+        self._compiled = {section: compile_template(text) for section, text in templates.items()}
+        self._empty = {section: self.template(section)() for section in
+                       ("goals_empty", "resources_empty", "references_empty", "metrics_empty", "footer")}
+
+    def template(self, section: str) -> Callable[..., str]:
+        return self._compiled.get(section) or compile_template("")
+
+    def __getstate__(self):
+        # Compiled templates are not picklable; process pools recompile them from the text
+        return {key: value for key, value in self.__dict__.items() if key not in ("_compiled", "_empty")}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["templates"], state["escape"], state["separators"], state["extension"])
+
+    def render_list(self, name: str, item: str, values: Sequence) -> str:
+        if not values:
+            return self._empty[f"{name}_empty"]
+        item_template, escape = self.template(item), self.escape
+        items = self.separators.get(name, "").join(item_template(item=escape(value)) for value in values)
+        return self.template(name)(items=items)
+
+    def render_optional(self, section: str, value) -> str:
+        return self.template(section)(**{section: self.escape(value)}) if value else ""
+
+    def render_header(self, context: Dict) -> str:
+        return self.template("header")(
+            company=self.escape(context["company"]),
+            industry=self.escape(context["industry"]),
+            goals=self.render_list("goals", "goal", context["goals"]),
+            focus=self.render_optional("focus", context["focus"]),
+        )
+
+    def render_use_case(self, context: Dict) -> str:
+        escape = self.escape
+        resources = context["resources"]
+        if resources:
+            resource_template, description_template = self.template("resource"), self.template("description")
+            items = self.separators.get("resources", "").join(
+                resource_template(
+                    title=escape(resource.get("title", "")),
+                    url=escape(resource.get("url", "")),
+                    description=description_template(description=escape(resource["description"]))
+                    if resource.get("description") else "",
+                )
+                for resource in resources
+            )
+            resources = self.template("resources")(items=items)
+        else:
+            resources = self._empty["resources_empty"]
+
+        return self.template("use_case")(
+            title=escape(context["title"]),
+            impact=escape(context["impact"]),
+            strategy=escape(context["strategy"]),
+            resources=resources,
+            references=self.render_list("references", "reference", context["references"]),
+            metrics=self.render_list("metrics", "metric", context["metrics"]),
+        )
+
+
+MARKDOWN = ProposalFormat("markdown", {
+    "header": (
+        "# {company} AI/ML Implementation Proposal\n\n"
+        "## Executive Summary\n\n"
+        "This proposal outlines key artificial intelligence and machine learning initiatives "
+        "aligned with {company}'s strategic goals of {goals}.\n\n"
+        "## Industry Context\n\n"
+        "Domain: {industry}\n{focus}\n"
+        "## Proposed Use Cases\n\n"
+    ),
+    "goals": "{items}",
+    "goal": "{item}",
+    "goals_empty": "AI-driven growth",
+    "focus": "Current Focus: {focus}\n",
+    "use_case": (
+        "### {title}\n\n"
+        "*Business Impact*: {impact}\n\n"
+        "*Implementation Strategy*: {strategy}\n\n"
+        "#### Relevant Resources and Datasets:\n"
+        "{resources}{references}{metrics}"
+        "\n---\n\n"
+    ),
+    "resources": "{items}",
+    "resource": "- [{title}]({url})\n{description}",
+    "description": "  - {description}\n",
+    "resources_empty": "- Custom data collection required\n",
+    "references": "\n#### Industry Research & References:\n{items}",
+    "reference": "- {item}\n",
+    "metrics": "\n#### Key Performance Indicators:\n{items}",
+    "metric": "- {item}\n",
+}, separators={"goals": ", "}, extension="md")
+
+HTML = ProposalFormat("html", {
+    "header": (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        "<title>{company} AI/ML Implementation Proposal</title>\n</head>\n<body>\n"
+        "<h1>{company} AI/ML Implementation Proposal</h1>\n"
+        "<h2>Executive Summary</h2>\n"
+        "<p>This proposal outlines key artificial intelligence and machine learning initiatives "
+        "aligned with {company}'s strategic goals of {goals}.</p>\n"
+        "<h2>Industry Context</h2>\n"
+        "<p>Domain: {industry}</p>\n{focus}"
+        "<h2>Proposed Use Cases</h2>\n"
+    ),
+    "goals": "{items}",
+    "goal": "{item}",
+    "goals_empty": "AI-driven growth",
+    "focus": "<p>Current Focus: {focus}</p>\n",
+    "use_case": (
+        "<section>\n<h3>{title}</h3>\n"
+        "<p><em>Business Impact</em>: {impact}</p>\n"
+        "<p><em>Implementation Strategy</em>: {strategy}</p>\n"
+        "<h4>Relevant Resources and Datasets</h4>\n"
+        "{resources}{references}{metrics}"
+        "</section>\n"
+    ),
+    "resources": "<ul>\n{items}</ul>\n",
+    "resource": "<li><a href=\"{url}\">{title}</a>{description}</li>\n",
+    "description": "<br>{description}",
+    "resources_empty": "<ul>\n<li>Custom data collection required</li>\n</ul>\n",
+    "references": "<h4>Industry Research &amp; References</h4>\n<ul>\n{items}</ul>\n",
+    "reference": "<li>{item}</li>\n",
+    "metrics": "<h4>Key Performance Indicators</h4>\n<ul>\n{items}</ul>\n",
+    "metric": "<li>{item}</li>\n",
+    "footer": "</body>\n</html>\n",
+}, escape=_html_escape, separators={"goals": ", "})
+
+JSON = ProposalFormat("json", {
+    "header": (
+        "{{\"company\": {company}, \"industry\": {industry}{focus}, "
+        "\"goals\": {goals}, \"use_cases\": [\n"
+    ),
+    "goals": "[{items}]",
+    "goal": "{item}",
+    "goals_empty": "[]",
+    "focus": ", \"focus\": {focus}",
+    "use_case": (
+        "{{\"use_case\": {title}, \"impact\": {impact}, \"strategy\": {strategy}, "
+        "\"resources\": {resources}, \"references\": {references}, \"metrics\": {metrics}}}"
+    ),
+    "resources": "[{items}]",
+    "resource": "{{\"title\": {title}, \"url\": {url}{description}}}",
+    "description": ", \"description\": {description}",
+    "resources_empty": "[]",
+    "references": "[{items}]",
+    "reference": "{item}",
+    "references_empty": "[]",
+    "metrics": "[{items}]",
+    "metric": "{item}",
+    "metrics_empty": "[]",
+    "footer": "\n]}}\n",
+}, escape=_json_escape,
+    separators={"goals": ", ", "resources": ", ", "references": ", ", "metrics": ", ", "use_cases": ",\n"})
+
+# Built-in formats selectable by name
+FORMATS = {fmt.name: fmt for fmt in (MARKDOWN, HTML, JSON)}
+
+
+def _render_chunk(formats: Sequence[ProposalFormat], contexts: List[Dict]) -> List[str]:
+    # Renders a run of use cases for every format; module level so process pools can pickle it
+    return [fmt.separators.get("use_cases", "").join(fmt.render_use_case(context) for context in contexts)
+            for fmt in formats]
+
+
+class ProposalRenderer:
+    """
+    Renders proposal data to one or more output formats in a single pass.
+
+    Each use case is normalized once and then rendered by every requested format's
+    compiled templates. Use cases are rendered in chunks; with an ``executor`` the
+    chunks are rendered in parallel and written back in order. Thread pools only
+    help on a free-threaded interpreter, so pass a ``ProcessPoolExecutor`` to
+    spread large proposals across cores.
+
+    Args:
+        formats (iterable): Format names from ``FORMATS`` or ProposalFormat objects.
+        executor (Executor): Optional pool the use-case chunks are rendered on.
+        chunk_size (int): Use cases per rendering task.
+    """
+
+    def __init__(self, formats: Iterable = ("markdown",), executor=None, chunk_size: int = 128):
+        self.formats = [FORMATS[fmt] if isinstance(fmt, str) else fmt for fmt in formats]
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _use_case_context(use_case, resources_by_use_case: Dict) -> Dict:
+        title = use_case['use_case']
+        return {
+            "title": title,
+            "impact": use_case.get('impact') or "",
+            "strategy": use_case.get('strategy') or "",
+            "resources": resources_by_use_case.get(title) or [],
+            "references": list(use_case.get('references') or []),
+            "metrics": list(use_case.get('metrics') or []),
+        }
+
+    def iter_sections(self, industry_data: Dict, company_data: Dict, use_cases: Iterable,
+                      resources_by_use_case: Dict) -> Iterator[Dict[str, str]]:
+        """
+        Yields ``{format name: text}`` fragments that concatenate, per format, to the
+        full document: the header, then use cases a chunk at a time, then the footer.
+        """
+        header = {
+            "company": company_data['company_name'],
+            "goals": list(company_data.get('goals') or []),
+            "industry": industry_data['industry'],
+            "focus": industry_data.get('focus'),
+        }
+        yield {fmt.name: fmt.render_header(header) for fmt in self.formats}
+
+        contexts = [self._use_case_context(use_case, resources_by_use_case) for use_case in use_cases]
+        chunks = [contexts[i:i + self.chunk_size] for i in range(0, len(contexts), self.chunk_size)]
+        if self.executor is not None and len(chunks) > 1:
+            rendered = self.executor.map(_render_chunk, [self.formats] * len(chunks), chunks)
+        else:
+            rendered = (_render_chunk(self.formats, chunk) for chunk in chunks)
+        for i, texts in enumerate(rendered):
+            yield {
+                fmt.name: (fmt.separators.get("use_cases", "") if i else "") + text
+                for fmt, text in zip(self.formats, texts)
+            }
+
+        yield {fmt.name: fmt._empty["footer"] for fmt in self.formats}
+
+    def render(self, industry_data: Dict, company_data: Dict, use_cases: Iterable,
+               resources_by_use_case: Dict) -> Dict[str, str]:
+        """
+        Returns the complete document for every format, keyed by format name.
+        """
+        parts = {fmt.name: [] for fmt in self.formats}
+        for section in self.iter_sections(industry_data, company_data, use_cases, resources_by_use_case):
+            for name, text in section.items():
+                parts[name].append(text)
+        return {name: "".join(texts) for name, texts in parts.items()}
+
+    def write(self, outputs: Dict[str, object], industry_data: Dict, company_data: Dict,
+              use_cases: Iterable, resources_by_use_case: Dict):
+        """
+        Streams every format to its own writable file object, keyed by format name.
+        """
+        for section in self.iter_sections(industry_data, company_data, use_cases, resources_by_use_case):
+            for name, text in section.items():
+                outputs[name].write(text)
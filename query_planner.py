@@ -0,0 +1,143 @@
+import re
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+# Words that do not change what a repository search matches
+STOPWORDS = frozenset("""
+a an and the of for to in on with by from into via using use based driven powered
+ai ml ai/ml system systems solution solutions
+dataset datasets
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#/]*")
+
+
+def _stem(token: str) -> str:
+    # Light plural folding, enough to make "reviews" and "review" one term
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+# Task and audience words shared by many unrelated use cases; two queries that only
+# have these in common are about different things
+GENERIC_TERMS = frozenset(_stem(word) for word in """
+analysis analytics prediction predictive forecasting forecast detection classification
+recommendation segmentation optimization monitoring automation automated scoring
+management insights engine model platform intelligent smart personalized real-time
+customer customers client user
+""".split())
+
+
+def core_terms(terms: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Returns the terms that say what a query is about, without GENERIC_TERMS, or all
+    of them if every term is generic.
+    """
+    return (terms - GENERIC_TERMS) or terms
+
+
+def canonicalize(query: str) -> Tuple[FrozenSet[str], str]:
+    """
+    Normalizes a search query into a set of terms and a canonical query string.
+
+    Returns:
+        tuple: The frozenset of stemmed, stopword-free terms used for matching, and
+        the corresponding unstemmed words in their original order, which is what gets
+        searched. Falls back to the lowercased query if every word is a stopword.
+    """
+    terms, words = [], []
+    for token in _TOKEN.findall(query.lower()):
+        term = _stem(token)
+        if token not in STOPWORDS and term not in terms:
+            terms.append(term)
+            words.append(token)
+    if not terms:
+        terms = words = query.lower().split() or [""]
+    return frozenset(terms), " ".join(words)
+
+
+class QueryPlanner:
+    """
+    Coalesces identical and near-identical searches into one upstream request.
+
+    Each submitted query is canonicalized (lowercased, plurals folded, stopwords
+    dropped). A query whose terms match an earlier one exactly, or nearly, shares
+    that query's future, so it gets the same results without another request,
+    including while the first one is still in flight. Otherwise a new search is
+    submitted to ``executor``.
+
+    Near matches compare core terms, i.e. without generic task words such as
+    "analysis" or "prediction": two queries match when at least ``similarity`` of
+    the shorter query's core terms appear in the other. So "customer sentiment
+    analysis" and "sentiment analysis of reviews" share one search, while "customer
+    churn prediction" and "customer lifetime value prediction", which only share
+    generic words, do not.
+
+    Args:
+        search (callable): Runs one search for a canonical query string.
+        executor (Executor): Pool the upstream searches are submitted to.
+        similarity (float): Share of the shorter query's core terms the other query
+            must contain to be merged with it; None coalesces exact matches only.
+    """
+
+    def __init__(self, search: Callable[[str], object], executor: Executor, similarity: float = 0.6):
+        self.search = search
+        self.executor = executor
+        self.similarity = similarity
+        self.requested = 0
+        self.near_matches = 0
+        # (core terms, canonical query, future) per upstream search
+        self._plans: List[Tuple[FrozenSet[str], str, Future]] = []
+        self._exact: Dict[FrozenSet[str], int] = {}
+        # core term -> indices of the plans containing it, to find near matches quickly
+        self._postings: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _near_match(self, core: FrozenSet[str]):
+        best, best_score = None, self.similarity
+        candidates = {i for term in core for i in self._postings.get(term, ())}
+        for i in sorted(candidates):
+            other = self._plans[i][0]
+            score = len(core & other) / min(len(core), len(other))
+            if score >= best_score and (best is None or score > best_score):
+                best, best_score = i, score
+        return best
+
+    def submit(self, query: str) -> Future:
+        """
+        Returns a future for the results of ``query``, shared with any earlier query
+        it was coalesced with.
+        """
+        terms, canonical = canonicalize(query)
+        with self._lock:
+            self.requested += 1
+            index = self._exact.get(terms)
+            core = core_terms(terms)
+            if index is None and self.similarity is not None:
+                index = self._near_match(core)
+                if index is not None:
+                    self.near_matches += 1
+                    self._exact[terms] = index
+            if index is not None:
+                return self._plans[index][2]
+
+            future = self.executor.submit(self.search, canonical)
+            index = len(self._plans)
+            self._plans.append((core, canonical, future))
+            self._exact[terms] = index
+            for term in core:
+                self._postings.setdefault(term, []).append(index)
+            return future
+
+    def stats(self) -> dict:
+        upstream = len(self._plans)
+        return {
+            "requested": self.requested,
+            "upstream_calls": upstream,
+            "saved": self.requested - upstream,
+            "near_matches": self.near_matches,
+        }
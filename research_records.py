@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Tuple, Union
+
+from search_results import SearchResults, as_search_results
+
+
+def explode_response(response: Union[SearchResults, Dict[str, Any]], facet: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Splits one Serper search response into per-result records.
+
+    Every organic hit, top story, news item and "people also ask" entry becomes its
+    own record, as do the answer box and the knowledge graph (with its attributes).
+
+    Args:
+        response (SearchResults or dict): Compact search results, or a raw or
+            ``to_dict()`` Serper response, which is compacted first.
+        facet (str): Research facet the response belongs to, e.g. ``market_size``.
+
+    Returns:
+        list: ``(content, metadata)`` pairs ready for ``DocumentStore.add_documents``.
+        The metadata holds the facet, the result ``kind``, the search query and,
+        when known, the result's title, url and position. Its ``source`` identifies
+        the result across searches (query, kind and url or position), so a changed
+        result supersedes its earlier version in the DocumentStore.
+    """
+    if not isinstance(response, (SearchResults, dict)):
+        return []
+    response = as_search_results(response)
+    query = response.query
+    records = []
+    for result in response:
+        content = result.to_text()
+        if not content:
+            continue
+        metadata = {"type": "research", "facet": facet, "kind": result.kind, "query": query}
+        for key, value in (("title", result.title), ("url", result.link), ("position", result.position)):
+            if value is not None:
+                metadata[key] = value
+        identity = metadata.get("url") or metadata.get("position") or metadata.get("title") or len(records)
+        metadata["source"] = f"serper:{query}:{result.kind}:{identity}"
+        records.append((content, metadata))
+    return records
+
+
+def explode_research(results: Dict[str, Any], **metadata) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Explodes every facet of ``IndustryResearchAgent.run()`` into per-result records.
+
+    Args:
+        results (dict): Facet name -> search results; failed facets (None) are skipped.
+        **metadata: Extra metadata added to every record, e.g. ``company`` and ``industry``.
+
+    Returns:
+        list: ``(content, metadata)`` pairs in facet order.
+    """
+    records = []
+    for facet, response in results.items():
+        for content, record_metadata in explode_response(response, facet):
+            record_metadata.update(metadata)
+            records.append((content, record_metadata))
+    return records
@@ -1,14 +1,41 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from github_search import GITHUB_SEARCH_URL, GitHubSearch
+from http_session import create_session
+from query_planner import QueryPlanner
+import tracing
+from use_cases import as_use_case
 
 class ResourceAssetAgent:
-    def __init__(self, use_cases: list):
+    def __init__(self, use_cases, api_key: str = None, cache=None, session=None, max_workers: int = 4,
+                 base_url: str = GITHUB_SEARCH_URL, search_engine: GitHubSearch = None,
+                 similarity: float = 0.6):
         """
         Initializes the agent with the proposed use cases.
         
         Args:
-            use_cases (list): List of proposed use cases for which datasets are needed.
+            use_cases (iterable): Proposed use cases for which datasets are needed, as UseCase
+                records, dicts or plain titles. May be a generator such as
+                RAGAgent.iter_use_cases(), consumed as use cases arrive.
+            api_key (str): Optional GitHub token sent as the Authorization header.
+            cache (ResponseCache): Optional response cache shared with the other agents.
+            session (requests.Session): Optional pooled session to reuse across agents.
+            max_workers (int): Number of GitHub searches run concurrently.
+            base_url (str): Repository search endpoint, overridable for a local server.
+            search_engine (GitHubSearch): Optional rate-limited search client; share one between
+                agents so they draw on the same rate-limit budget.
+            similarity (float): Share of the shorter query's core terms another query must
+                contain for the two use cases to share one GitHub search (see QueryPlanner);
+                None only merges queries that are identical after normalization.
         """
         self.use_cases = use_cases
+        self.api_key = api_key
+        self.cache = cache
+        self.max_workers = max_workers
+        self.base_url = base_url
+        self.session = session or create_session(max_workers)
+        self.search_engine = search_engine or GitHubSearch(api_key, session=self.session, base_url=base_url)
+        self.similarity = similarity
+        self.planner_stats = None
 
     def search_datasets(self):
         """
@@ -17,15 +44,26 @@ class ResourceAssetAgent:
         Returns:
             list: A list of dictionaries containing datasets for each use case.
         """
-        datasets = []
-        for use_case in self.use_cases:
-            case_datasets = {
-                "use_case": use_case,
-                "datasets": self.search_github(use_case)
-            }
-            datasets.append(case_datasets)
+        # Each search is submitted as soon as its use case arrives, so with a streaming
+        # source the lookups overlap with generation of the remaining use cases. The
+        # planner folds overlapping use cases onto one request and shares its results
+        titles, futures = [], []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            planner = QueryPlanner(self.search_github, executor, self.similarity)
+            consumed = []
+            for item in self.use_cases:
+                use_case = as_use_case(item)
+                consumed.append(use_case)
+                titles.append(use_case.use_case)
+                futures.append(planner.submit(use_case.search_query))
+            # Keep the materialized use cases for later stages once a generator is drained
+            self.use_cases = consumed
+        self.planner_stats = planner.stats()
         
-        return datasets
+        return [
+            {"use_case": title, "datasets": future.result()}
+            for title, future in zip(titles, futures)
+        ]
 
     def search_github(self, use_case: str):
         """
@@ -37,18 +75,20 @@ class ResourceAssetAgent:
         Returns:
             list: List of datasets from GitHub.
         """
-        github_api_url = f"https://api.github.com/search/repositories?q={use_case}+dataset"
-        response = requests.get(github_api_url)
+        with tracing.span("github.search", cache_hit=self.cache is not None):
+            query = f"{use_case} dataset"
+            engine = self.search_engine
+            try:
+                if self.cache is not None:
+                    params = {"q": query, "per_page": engine.per_page, "pages": engine.max_pages}
+                    repositories = self.cache.fetch(engine.base_url, params, lambda: engine.search(query))
+                else:
+                    repositories = engine.search(query)
+            except Exception as e:
+                print(f"Error: Failed to fetch GitHub data for {use_case}: {e}")
+                return []
         
-        if response.status_code == 200:
-            data = response.json()
-            return [
-                {"title": repo["name"], "url": repo["html_url"]}
-                for repo in data.get("items", [])
-            ]
-        else:
-            print(f"Error: Failed to fetch GitHub data for {use_case}, Status Code: {response.status_code}")
-            return []
+            return repositories or []
 
     def run(self):
         """
@@ -58,6 +98,9 @@ class ResourceAssetAgent:
             list: The datasets found for each use case.
         """
         datasets = self.search_datasets()
+        stats = self.planner_stats
+        print(f"GitHub searches: {stats['upstream_calls']} for {stats['requested']} use cases "
+              f"({stats['saved']} saved by query planning)")
         
         # Save the results to a markdown file
         with open("assets.md", "w") as file:
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "responses.sqlite")
+
+
+class OfflineCacheMiss(Exception):
+    """Raised when an offline cache has no stored response for a request."""
+
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache for external API responses.
+
+    Responses are keyed on the endpoint plus a normalized form of the query (or the
+    exact query, for callers passing ``normalize=False``), stored in SQLite with a
+    TTL, and evicted least-recently-used once ``max_entries`` is exceeded. A single
+    instance is thread-safe and can be shared by all agents.
+
+    Args:
+        path (str): SQLite file backing the cache.
+        ttl (float): Seconds a stored response stays fresh. ``None`` never expires.
+        max_entries (int): Upper bound on stored responses before LRU eviction.
+        offline (bool): Replay mode. Stored responses are served regardless of age and
+            a miss raises ``OfflineCacheMiss`` instead of touching the network.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 24 * 3600,
+                 max_entries: int = 10000, offline: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT, value TEXT,"
+            " created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def normalize_query(query) -> str:
+        """
+        Normalizes a query so trivially different spellings share one entry.
+
+        Strings are lower-cased with whitespace collapsed; dicts and lists (request
+        params or payloads) are serialized with sorted keys.
+        """
+        if isinstance(query, str):
+            return " ".join(query.lower().split())
+        return json.dumps(query, sort_keys=True, separators=(",", ":"))
+
+    @classmethod
+    def make_key(cls, endpoint: str, query, normalize: bool = True) -> str:
+        """
+        Hashes the endpoint with the query. With ``normalize=False`` a string query
+        is hashed exactly as given, for requests such as LLM prompts where case and
+        formatting change the response.
+        """
+        if not normalize and isinstance(query, str):
+            text = query
+        else:
+            text = cls.normalize_query(query)
+        digest = hashlib.sha256()
+        digest.update(endpoint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, endpoint: str, query, normalize: bool = True):
+        """
+        Returns the stored response for ``(endpoint, query)`` or ``None``.
+        """
+        key = self.make_key(endpoint, query, normalize)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (self.offline or self.ttl is None or now - row[1] <= self.ttl):
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def set(self, endpoint: str, query, value, normalize: bool = True):
+        """
+        Stores a JSON-serializable response, evicting the least recently used
+        entries if the cache is over capacity.
+        """
+        key = self.make_key(endpoint, query, normalize)
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone() is None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, value, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(value), now, now),
+            )
+            self._count += inserted
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def fetch(self, endpoint: str, query, loader, normalize: bool = True):
+        """
+        Returns the cached response or calls ``loader()`` and caches its result.
+
+        ``None`` results are treated as failures and are not cached.
+
+        Raises:
+            OfflineCacheMiss: If the cache is offline and holds no response.
+        """
+        value = self.get(endpoint, query, normalize)
+        if value is not None:
+            return value
+        if self.offline:
+            raise OfflineCacheMiss(f"No cached response for {endpoint} {self.normalize_query(query)!r}")
+        value = loader()
+        if value is not None:
+            self.set(endpoint, query, value, normalize)
+        return value
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": self._count,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,266 @@
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+# Serper sections kept in the compact form; everything else (sitelinks, images,
+# related searches, credits, ...) is dropped while parsing
+_LIST_SECTIONS = ("organic", "topStories", "news", "peopleAlsoAsk")
+
+_WHITESPACE = " \t\n\r"
+
+
+class SearchResult:
+    """
+    One search hit, keeping only the fields later stages read.
+
+    ``kind`` is the Serper section it came from: ``organic``, ``topStories``,
+    ``news``, ``peopleAlsoAsk``, ``answer_box`` or ``knowledge_graph``.
+    """
+
+    __slots__ = ("kind", "title", "snippet", "link", "date", "position")
+
+    def __init__(self, kind: str, title: str = None, snippet: str = None, link: str = None,
+                 date: str = None, position: int = None):
+        self.kind = kind
+        self.title = title
+        self.snippet = snippet
+        self.link = link
+        self.date = date
+        self.position = position
+
+    @classmethod
+    def from_entry(cls, kind: str, entry: Dict[str, Any]) -> "SearchResult":
+        """
+        Builds a result from one raw Serper entry of section ``kind``.
+        """
+        if kind == "peopleAlsoAsk":
+            return cls(kind, entry.get("question") or entry.get("title"), entry.get("snippet"),
+                       entry.get("link"), entry.get("date"), entry.get("position"))
+        if kind == "answer_box":
+            snippet = "\n".join(str(entry[key]) for key in ("answer", "snippet") if entry.get(key))
+            return cls(kind, entry.get("title"), snippet or None, entry.get("link"), entry.get("date"))
+        if kind == "knowledge_graph":
+            title = entry.get("title")
+            if title and entry.get("type"):
+                title = f"{title} ({entry['type']})"
+            lines = [entry.get("description")]
+            lines += [f"{key}: {value}" for key, value in (entry.get("attributes") or {}).items()]
+            return cls(kind, title, "\n".join(line for line in lines if line) or None,
+                       entry.get("descriptionLink") or entry.get("website"))
+        # organic, topStories and news; a story without a snippet is described by its source
+        return cls(kind, entry.get("title"), entry.get("snippet") or entry.get("source"),
+                   entry.get("link"), entry.get("date"), entry.get("position"))
+
+    def to_text(self) -> str:
+        return "\n".join(str(value) for value in (self.title, self.snippet, self.date) if value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchResult":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"SearchResult({self.kind!r}, {self.title!r})"
+
+
+class SearchResults:
+    """
+    Compact form of one Serper response: the query plus its results, in the order
+    answer box, knowledge graph, then each list section.
+    """
+
+    __slots__ = ("query", "results")
+
+    def __init__(self, query: str = None, results: List[SearchResult] = None):
+        self.query = query
+        self.results = results if results is not None else []
+
+    def __iter__(self) -> Iterator[SearchResult]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchResults):
+            return NotImplemented
+        return self.query == other.query and self.results == other.results
+
+    def __repr__(self):
+        return f"SearchResults(query={self.query!r}, {len(self.results)} results)"
+
+    def to_text(self) -> str:
+        """
+        Plain text of every result, one block per result, for prompts and documents.
+        """
+        return "\n\n".join(text for text in (result.to_text() for result in self.results) if text)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # JSON-serializable form, for the response cache and batch checkpoints
+        return {"query": self.query, "results": [result.to_dict() for result in self.results]}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SearchResults":
+        """
+        Accepts either ``to_dict()`` output or a raw Serper response (e.g. one cached
+        before the compact form existed) and returns the compact form.
+        """
+        if "results" in data and "organic" not in data:
+            return cls(data.get("query"), [SearchResult.from_dict(result) for result in data["results"]])
+        parser = SearchResultParser()
+        for key, value in data.items():
+            if key in _LIST_SECTIONS and isinstance(value, list):
+                for entry in value:
+                    parser._element(key, entry)
+            else:
+                parser._value(key, value)
+        return parser.finish()
+
+
+def as_search_results(data: Union[SearchResults, Dict[str, Any], None]) -> SearchResults:
+    """
+    Returns ``data`` in compact form; None stays None.
+    """
+    if data is None or isinstance(data, SearchResults):
+        return data
+    return SearchResults.from_json(data)
+
+
+class SearchResultParser:
+    """
+    Incremental parser from the bytes of a Serper response to SearchResults.
+
+    Feed it the body in chunks as they arrive. The top-level object is walked key by
+    key; list sections are decoded one element at a time, converted to a
+    SearchResult and released, and values of sections that are not kept are decoded
+    and dropped one at a time, so the full response is never held in memory. Memory
+    stays around one chunk plus the largest single element.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._query = None
+        self._head = {}  # answer box and knowledge graph, which lead the results
+        self._results: List[SearchResult] = []
+
+    def feed(self, chunk: bytes):
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        self._parse(final=False)
+
+    def finish(self) -> SearchResults:
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(b"", final=True)
+        self._pos = 0
+        self._parse(final=True)
+        if self._state not in ("done", "start"):
+            raise ValueError("Truncated search response")
+        head = [self._head[kind] for kind in ("answer_box", "knowledge_graph") if kind in self._head]
+        return SearchResults(self._query, head + self._results)
+
+    def _element(self, section: str, entry):
+        if section in _LIST_SECTIONS and isinstance(entry, dict):
+            self._results.append(SearchResult.from_entry(section, entry))
+
+    def _value(self, key: str, value):
+        if not isinstance(value, dict):
+            return
+        if key == "searchParameters":
+            self._query = value.get("q")
+        elif key == "answerBox":
+            self._head["answer_box"] = SearchResult.from_entry("answer_box", value)
+        elif key == "knowledgeGraph":
+            self._head["knowledge_graph"] = SearchResult.from_entry("knowledge_graph", value)
+
+    def _skip_whitespace(self) -> bool:
+        # Advances past whitespace; returns False if the buffer ran out
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _decode(self, final: bool):
+        # Decodes one JSON value at the current position, or returns (None, False) if
+        # it is not complete yet. A value that ends exactly at the end of the buffer
+        # may be a number cut off mid-digits, so it waits for more input
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None, False
+        if end == len(self._buffer) and not final:
+            return None, False
+        self._pos = end
+        return value, True
+
+    def _parse(self, final: bool):
+        while self._state != "done" and self._skip_whitespace():
+            char = self._buffer[self._pos]
+            if self._state == "start":
+                if char != "{":
+                    raise ValueError(f"Expected a JSON object, got {char!r}")
+                self._pos += 1
+                self._state = "key"
+            elif self._state == "key":
+                if char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    key, complete = self._decode(final)
+                    if not complete:
+                        return
+                    self._key = key
+                    self._state = "colon"
+            elif self._state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {self._key!r}")
+                self._pos += 1
+                self._state = "value"
+            elif self._state == "value":
+                if char == "[":
+                    # Step into every array so even sections that are dropped are only
+                    # ever decoded one element at a time
+                    self._pos += 1
+                    self._state = "array"
+                    continue
+                value, complete = self._decode(final)
+                if not complete:
+                    return
+                self._value(self._key, value)
+                self._state = "key"
+            elif self._state == "array":
+                if char == "]":
+                    self._pos += 1
+                    self._state = "key"
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    entry, complete = self._decode(final)
+                    if not complete:
+                        return
+                    self._element(self._key, entry)
+
+
+def parse_search_stream(chunks: Iterable[bytes]) -> SearchResults:
+    """
+    Parses a Serper response body given as an iterable of byte chunks.
+    """
+    parser = SearchResultParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.finish()
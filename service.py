@@ -0,0 +1,254 @@
+"""
+Long-lived HTTP service that generates proposals on request.
+
+The BERT model, document store, vector index, HTTP connection pools, GitHub rate
+limiter and response cache are loaded once when the service starts and shared by
+every request, so a request only pays for the pipeline itself. The vector index
+is kept on disk under a directory named after the embedding version, so research
+already embedded by an earlier request or run is not embedded again. Requests run through
+the same per-stage worker pools as batch.py. Identical requests (same company,
+industry and formats) that arrive while one is already running share that
+execution instead of starting another.
+
+Endpoints:
+    POST /proposals  {"company": ..., "industry": ..., "formats": ["markdown"]}
+                     -> {"company", "industry", "proposals": {format: text}, "elapsed_ms"}
+    GET  /stats      request, coalescing and cache counters
+    GET  /health     liveness check
+
+Usage:
+    python service.py --port 8000
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from batch import BatchRunner, target_key
+from proposal import ProposalAgent
+from proposal_renderer import FORMATS
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from use_case_generation_agent import DEFAULT_INDEX_PATH, VectorStore, versioned_index_path
+
+
+class ProposalService(BatchRunner):
+    """
+    Resident proposal pipeline with request coalescing.
+
+    Args:
+        workers (dict): Worker count per stage name.
+        max_in_flight (int): Number of distinct requests running the pipeline at once;
+            further requests queue.
+        cache (ResponseCache): Response cache shared by every request.
+        formats (list): Formats rendered when a request does not name any.
+        index_path (str): Location of the shared vector index, before the embedding
+            version directory is added; None keeps it in memory for the service's lifetime.
+    """
+
+    def __init__(self, workers=None, max_in_flight=8, cache=None, formats=("markdown",),
+                 index_path=DEFAULT_INDEX_PATH):
+        super().__init__(checkpoint=None, output_dir=None, workers=workers, max_in_flight=max_in_flight,
+                         cache=cache, formats=formats)
+        # One index for every request; each request's retrieval is limited to its own documents
+        if index_path is not None:
+            index_path = versioned_index_path(index_path, self.embedding_model.version)
+        self.vector_store = VectorStore(self.embedding_model, index_path=index_path)
+        self.drivers = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="request")
+        self.requested = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._executions = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, company, industry, formats=None):
+        """
+        Starts generating a proposal, or joins an identical one already running.
+
+        Args:
+            company (str): Company name.
+            industry (str): Industry name.
+            formats (list): Formats to render, or a single format name; defaults to the
+                service's formats.
+
+        Returns:
+            Future: Resolves to a dict mapping each format to the rendered proposal.
+        """
+        if isinstance(formats, str):
+            formats = [formats]
+        if formats is not None and (not isinstance(formats, (list, tuple))
+                                    or not all(isinstance(fmt, str) for fmt in formats)):
+            raise ValueError("formats must be a format name or a list of format names")
+        formats = tuple(formats or self.formats)
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown proposal formats: {', '.join(unknown)}")
+        target = {"company": company.strip(), "industry": industry.strip(), "formats": formats}
+        key = (target_key(target), formats)
+        with self._lock:
+            self.requested += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self.drivers.submit(self.run_target, target)
+            self._in_flight[key] = future
+            self._executions += 1
+        # Outside the lock: the callback runs immediately if the future is already done
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            self.failed += future.cancelled() or future.exception() is not None
+
+    def generate(self, company, industry, formats=None, timeout=None):
+        """
+        Generates a proposal and waits for it. Returns a dict of format -> text.
+        """
+        return self.submit(company, industry, formats).result(timeout)
+
+    def _stage(self, key, stage, fn, *args):
+        # No checkpoint: a service request always runs every stage, with repeated
+        # upstream calls answered by the response cache
+        return self.pools[stage].submit(self._run_stage, stage, fn, *args).result()
+
+    def proposal(self, target, research, use_cases, datasets):
+        agent = ProposalAgent({"industry": target["industry"]}, {"company_name": target["company"]},
+                              use_cases, datasets)
+        return agent.render(target["formats"])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "executions": self._executions,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+                "in_flight": len(self._in_flight),
+                "cache": self.cache.stats(),
+            }
+
+    def close(self):
+        self.drivers.shutdown()
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so a UI or load generator can reuse its connection
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/stats":
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if path != "/proposals":
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+            return
+        try:
+            request = json.loads(body or b"{}")
+            company, industry = request["company"], request["industry"]
+            if (not isinstance(company, str) or not isinstance(industry, str)
+                    or not company.strip() or not industry.strip()):
+                raise ValueError("company and industry must be non-empty strings")
+            start = time.perf_counter()
+            future = self.server.service.submit(company, industry, request.get("formats"))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        try:
+            proposals = future.result(self.server.request_timeout)
+        except FutureTimeoutError:
+            self._send_json(504, {"error": "Proposal generation timed out"})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {
+            "company": company,
+            "industry": industry,
+            "proposals": proposals,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        })
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(service, host="127.0.0.1", port=8000, request_timeout=600.0, verbose=False):
+    """
+    Creates a threaded HTTP server for ``service``; port 0 picks a free port.
+
+    Returns:
+        ThreadingHTTPServer: Call ``serve_forever()`` to start serving.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.request_timeout = request_timeout
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve proposal generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--formats", default="markdown",
+                        help=f"Comma-separated default proposal formats ({', '.join(FORMATS)})")
+    parser.add_argument("--request-timeout", type=float, default=600.0, help="seconds before a 504")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    load_dotenv()
+    cache = ResponseCache(
+        path=os.getenv("PIPELINE_CACHE_PATH", DEFAULT_CACHE_PATH),
+        ttl=float(os.getenv("PIPELINE_CACHE_TTL", 24 * 3600)),
+    )
+    service = ProposalService(max_in_flight=args.max_in_flight, cache=cache,
+                              formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+                              index_path=os.getenv("PIPELINE_INDEX_PATH", DEFAULT_INDEX_PATH))
+    server = create_server(service, args.host, args.port, args.request_timeout, args.verbose)
+    print(f"Proposal service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        print("Service stats:", service.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Lightweight tracing for the pipeline stages.
+
+Stages wrap their work in ``tracing.span(name)`` and attach measurements to the
+span: ``set(key=value)`` for attributes and ``add(key, amount)`` for counters
+such as ``bytes_in``, ``bytes_out``, ``tokens`` and ``retries``. A ``cache_hit``
+attribute is counted as a hit or a miss in the report.
+
+Tracing is off by default. While it is off, ``span()`` returns a shared no-op
+span, so instrumented code pays one global check per call. ``enable()`` installs
+a Tracer that keeps every finished span, and from which a per-stage JSON report
+and a Chrome trace (``chrome://tracing`` / Perfetto) can be written.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+# Counters summed per stage in the report
+COUNTERS = ("bytes_in", "bytes_out", "tokens", "retries")
+
+_tracer = None
+_local = threading.local()
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is disabled; every method does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    One timed stage invocation. Use as a context manager via ``tracing.span``.
+    """
+
+    __slots__ = ("tracer", "name", "attrs", "start", "end", "thread_id", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = self.end = 0.0
+        self.thread_id = threading.get_ident()
+        self.error = None
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        stack = getattr(_local, "stack", [])
+        # Remove this span specifically: a span held open by a generator can be closed
+        # after spans opened later on the same thread
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i] is self:
+                del stack[i]
+                break
+        self.tracer._finish(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """
+    Collects finished spans and summarizes them.
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns per-stage call counts, wall-time totals and percentiles, counter sums
+        and cache hit/miss counts, plus the overall run time.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span.name, {"calls": 0, "errors": 0, "durations": []})
+            stage["calls"] += 1
+            stage["errors"] += span.error is not None
+            stage["durations"].append(span.duration)
+            for key in COUNTERS:
+                if key in span.attrs:
+                    stage[key] = stage.get(key, 0) + span.attrs[key]
+            if "cache_hit" in span.attrs:
+                outcome = "cache_hits" if span.attrs["cache_hit"] else "cache_misses"
+                stage[outcome] = stage.get(outcome, 0) + 1
+
+        for stage in stages.values():
+            durations = sorted(stage.pop("durations"))
+            stage["total_ms"] = round(sum(durations) * 1000, 3)
+            stage["mean_ms"] = round(stage["total_ms"] / len(durations), 3)
+            stage["p50_ms"] = round(durations[len(durations) // 2] * 1000, 3)
+            stage["max_ms"] = round(durations[-1] * 1000, 3)
+        return {
+            "started_at": self.started_at,
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total_ms"])),
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Returns the spans in Chrome's trace event format, one complete event per span.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = {key: value for key, value in span.attrs.items() if isinstance(value, (str, int, float, bool))}
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": (span.start - self.started) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": os.getpid(),
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_report(self, path: str):
+        _write_json(path, self.report())
+
+    def write_chrome_trace(self, path: str):
+        _write_json(path, self.chrome_trace())
+
+
+def _write_json(path: str, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def enable() -> Tracer:
+    """
+    Starts collecting spans in a new Tracer and returns it.
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Tracer:
+    """
+    Stops collecting spans and returns the Tracer that was active, if any.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def current_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """
+    Returns a context manager timing one invocation of stage ``name``.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def current_span():
+    """
+    Returns the innermost open span on this thread, so helpers called inside a stage
+    (cache loaders, retry loops) can attach measurements to it.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else _NULL_SPAN
@@ -1,162 +1,747 @@
+from __future__ import annotations
+
 import os
 # Set these environment variables before importing transformers
 os.environ["TRANSFORMERS_FRAMEWORK"] = "pt"  # Tell transformers to use PyTorch only
 os.environ["USE_TORCH"] = "TRUE"
 os.environ["USE_TF"] = "FALSE"
 
-from typing import List, Dict, Any
-import numpy as np
+from typing import List, Dict, Any, Iterator, Tuple, TYPE_CHECKING
 from datetime import datetime
 import json
-import torch
-from transformers import AutoTokenizer, AutoModel, AutoConfig
+import re
+import threading
 import warnings
 warnings.filterwarnings('ignore')  # Suppress warning messages
-from sklearn.metrics.pairwise import cosine_similarity
-
-# Document Store Class to load, save, and manage documents
-class DocumentStore:
-    def __init__(self, storage_path: str = "document_store.json"):
-        self.storage_path = storage_path
-        self.documents = self._load_documents()
-        
-    def _load_documents(self) -> List[Dict[str, Any]]:
-        if os.path.exists(self.storage_path):
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        return []
-    
-    def save_documents(self):
-        with open(self.storage_path, 'w') as f:
-            json.dump(self.documents, f)
-            
-    def add_document(self, content: str, metadata: Dict[str, Any] = None):
-        doc = {
-            'id': len(self.documents),
-            'content': content,
-            'metadata': metadata or {},
-            'timestamp': datetime.now().isoformat()
-        }
-        self.documents.append(doc)
-        self.save_documents()
-        return doc['id']
-    
-    def get_document(self, doc_id: int) -> Dict[str, Any]:
-        return next((doc for doc in self.documents if doc['id'] == doc_id), None)
+from context_packer import ContextPacker
+from document_store import DocumentStore
+from lexical_index import BM25Index
+from research_records import explode_research
+from response_cache import OfflineCacheMiss
+import tracing
+from use_cases import UseCase, UseCaseParser, parse_use_cases
+
+# numpy, torch, transformers and the numpy-backed helpers are imported on first use,
+# so importing this module and constructing the agents does not pay for them
+if TYPE_CHECKING:
+    import numpy as np
+    from embedding_cache import EmbeddingCache
+
+# A 6-layer, 384-d sentence-embedding model trained for mean-pooled cosine
+# similarity, several times cheaper to run on CPU than bert-base
+SMALL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Short names accepted in place of a model name or path
+EMBEDDING_MODELS = {
+    "base": "bert-base-uncased",
+    "small": SMALL_EMBEDDING_MODEL,
+}
+
+def _fp32_backend(model):
+    return model
+
+def _int8_backend(model):
+    import torch
+    # Dynamic quantization stores the Linear weights (nearly all of BERT's weights and
+    # FLOPs) as int8 and quantizes activations on the fly, so it needs no calibration
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+# Embedding backends selectable by name in SimpleEmbedding: how the loaded model is
+# prepared for CPU inference
+EMBEDDING_BACKENDS = {
+    "fp32": _fp32_backend,
+    "int8": _int8_backend,
+}
 
 # Simple Embedding Class for text encoding using BERT-based model
 class SimpleEmbedding:
-    def __init__(self):
-        config = AutoConfig.from_pretrained('bert-base-uncased', trust_remote_code=True)
-        self.tokenizer = AutoTokenizer.from_pretrained('bert-base-uncased', config=config)
-        self.model = AutoModel.from_pretrained('bert-base-uncased', config=config)
-        self.model.eval()  # Set to evaluation mode
+    def __init__(self, model_name: str = 'bert-base-uncased', batch_size: int = 16, max_length: int = 512,
+                 cache: EmbeddingCache = None, backend: str = "fp32", num_threads: int = None):
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {', '.join(EMBEDDING_BACKENDS)}")
+        self.model_name = EMBEDDING_MODELS.get(model_name, model_name)
+        self.batch_size = batch_size
+        self.max_length = max_length
+        # "fp32" runs the model as loaded, "int8" dynamically quantizes it. num_threads
+        # sets torch's intra-op thread count, which is process-wide, when the model loads
+        self.backend = backend
+        self.num_threads = num_threads
+        # Optional EmbeddingCache; texts already embedded by this model skip the forward pass
+        self.cache = cache
+        # The tokenizer and model are loaded on first use, or ahead of time by warm_up()
+        self._tokenizer = None
+        self._model = None
+        self._dimension = None
+        self._load_lock = threading.Lock()
+        # One instance is shared by worker threads, and a fast (Rust) tokenizer raises
+        # "Already borrowed" when two threads use it at once, so every tokenizer and
+        # model call goes through this lock
+        self._use_lock = threading.RLock()
+        self._warm_up_thread = None
+        
+    def _load(self):
+        with self._load_lock:
+            if self._model is not None:
+                return
+            from transformers import AutoTokenizer, AutoModel, AutoConfig
+            if self.num_threads:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            config = AutoConfig.from_pretrained(self.model_name, trust_remote_code=True)
+            tokenizer = self._tokenizer or AutoTokenizer.from_pretrained(self.model_name, config=config)
+            model = AutoModel.from_pretrained(self.model_name, config=config)
+            model.eval()  # Set to evaluation mode
+            model = EMBEDDING_BACKENDS[self.backend](model)
+            self._dimension = config.hidden_size
+            self._tokenizer = tokenizer
+            self._model = model
+            
+    def _background_load(self):
+        try:
+            self._load()
+        except Exception as e:
+            # Loading is retried, and the error raised, on first use
+            print(f"Embedding model warm-up failed: {str(e)}")
+            
+    def warm_up(self, background: bool = True):
+        # Loads the model ahead of first use; in the background this overlaps the load
+        # with other work such as research I/O. Returns the loader thread, if any
+        if self._model is not None:
+            return None
+        if not background:
+            self._load()
+            return None
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(
+                target=self._background_load, name="embedding-warm-up", daemon=True
+            )
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+        
+    @property
+    def tokenizer(self):
+        # Loaded without the model, for chunking and token counting
+        if self._tokenizer is None:
+            with self._load_lock:
+                if self._tokenizer is None:
+                    from transformers import AutoTokenizer
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self._tokenizer
+    
+    def tokenize(self, texts, **kwargs):
+        # Thread-safe tokenizer call, for callers outside this class such as ContextPacker
+        tokenizer = self.tokenizer
+        with self._use_lock:
+            return tokenizer(texts, **kwargs)
+    
+    @property
+    def model(self):
+        if self._model is None:
+            self._load()
+        return self._model
+    
+    @property
+    def dimension(self) -> int:
+        # Read from the model config when the model is not loaded yet, so opening an
+        # index or serving cached embeddings does not pay for the full model load
+        if self._dimension is None:
+            # Under the load lock: transformers' lazy imports are not safe to race with
+            # a warm-up thread importing the model classes
+            with self._load_lock:
+                if self._dimension is None:
+                    from transformers import AutoConfig
+                    config = AutoConfig.from_pretrained(self.model_name, trust_remote_code=True)
+                    self._dimension = config.hidden_size
+        return self._dimension
+    
+    @property
+    def version(self) -> str:
+        # Names the embedding space. Vectors from different versions are not comparable,
+        # so cache keys and index headers carry it. fp32 is the bare model name, which
+        # keeps caches written before backends existed valid
+        if self.backend == "fp32":
+            return self.model_name
+        return f"{self.model_name}@{self.backend}"
         
     def mean_pooling(self, model_output, attention_mask):
+        import torch
         token_embeddings = model_output[0]
         input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
         return torch.sum(token_embeddings * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
     
+    def chunk_spans(self, text: str, chunk_size: int, overlap: int = 0) -> List[Tuple[int, int]]:
+        # Splits text into windows of chunk_size tokens, each sharing overlap tokens with
+        # the previous one, and returns them as (start, end) character offsets
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        offsets = self.tokenize(text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+        if len(offsets) <= chunk_size:
+            return [(0, len(text))]
+        
+        spans = []
+        for start in range(0, len(offsets), chunk_size - overlap):
+            window = offsets[start:start + chunk_size]
+            spans.append((window[0][0], window[-1][1]))
+            if start + chunk_size >= len(offsets):
+                break
+        return spans
+    
     def encode(self, text: str) -> np.ndarray:
-        encoded_input = self.tokenizer(text, padding=True, truncation=True, return_tensors='pt', max_length=512)
-        with torch.no_grad():
-            model_output = self.model(**encoded_input)
-        sentence_embeddings = self.mean_pooling(model_output, encoded_input['attention_mask'])
-        normalized_embeddings = torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
-        return normalized_embeddings.numpy()
+        return self.encode_batch([text])
+    
+    def encode_batch(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        # Returns one contiguous (len(texts), dimension) float32 matrix of normalized embeddings
+        with tracing.span("embedding.encode", texts=len(texts)) as span:
+            if self.cache is None:
+                return self._encode_batch(texts, batch_size)
+            return self._encode_cached(texts, batch_size, span)
+    
+    def _encode_cached(self, texts: List[str], batch_size: int, span) -> np.ndarray:
+        import numpy as np
+        from embedding_cache import EmbeddingCache
+        keys = [EmbeddingCache.make_key(self.version, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        # Encode each distinct uncached text once, then fill every row from the results.
+        # The model is only loaded when something is missing
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        span.set(cache_hit=not missing)
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            encoded = self._encode_batch([text_by_key[key] for key in missing], batch_size)
+            self.cache.put_many(missing, encoded)
+            cached.update(zip(missing, encoded))
+        if not keys:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.vstack([cached[key] for key in keys]).astype(np.float32, copy=False)
+    
+    def _encode_batch(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        import numpy as np
+        import torch
+        batch_size = batch_size or self.batch_size
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return embeddings
+        
+        # Tokenize once without padding, then sort by length so each batch is padded
+        # only to its own longest member instead of the longest text overall
+        tokenizer, model = self.tokenizer, self.model
+        encoded = self.tokenize(list(texts), truncation=True, max_length=self.max_length)
+        features = [
+            {key: values[i] for key, values in encoded.items()}
+            for i in range(len(texts))
+        ]
+        order = sorted(range(len(texts)), key=lambda i: len(features[i]['input_ids']))
+        tracing.current_span().add("tokens", sum(len(feature['input_ids']) for feature in features))
+        
+        # Forward passes are serialized too; each already uses torch's intra-op threads
+        with self._use_lock, torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                bucket = order[start:start + batch_size]
+                encoded_input = tokenizer.pad([features[i] for i in bucket], return_tensors='pt')
+                model_output = model(**encoded_input)
+                sentence_embeddings = self.mean_pooling(model_output, encoded_input['attention_mask'])
+                normalized_embeddings = torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
+                embeddings[bucket] = normalized_embeddings.numpy()
+        return embeddings
+
+def versioned_index_path(index_path: str, version: str) -> str:
+    # Places the index under a directory named after the embedding version, e.g.
+    # vector_index/bert-base-uncased_int8/embeddings, so switching model or backend
+    # opens a separate index instead of failing the version check on the old one
+    directory, name = os.path.split(index_path)
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]+", "_", version).strip("_."), name)
+
+# Default on-disk index; the embedding version is added as a directory by versioned_index_path
+DEFAULT_INDEX_PATH = os.path.join("vector_index", "embeddings")
 
 # Vector Store to store and search document embeddings
 class VectorStore:
-    def __init__(self, embedding_model):
+    def __init__(self, embedding_model, chunk_size: int = 256, chunk_overlap: int = 32,
+                 index_path: str = None, index_backend: str = "flat", index_params: Dict[str, Any] = None):
         self.embedding_model = embedding_model
-        self.embeddings = []
-        self.doc_ids = []
+        # Documents longer than chunk_size tokens are split before embedding instead of
+        # being truncated at the model's max length; None embeds each document whole
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # One row per chunk: its embedding, parent doc id and (start, end) character span.
+        # With an index_path the rows are memory-mapped from disk and survive restarts.
+        # index_backend picks exact "flat" search or approximate "ivf" (see vector_index).
+        # The index is opened on first use, since its dimension comes from the model
+        self.index_path = index_path
+        self.index_backend = index_backend
+        self.index_params = index_params or {}
+        self._index = None
+        # Ids of the documents with rows in the index, built on first use
+        self._indexed = None
+        # One store may be shared by concurrent agents (e.g. the proposal service);
+        # index growth, removal and search are serialized
+        self._lock = threading.RLock()
+        
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                from vector_index import INDEX_BACKENDS
+                index_class = INDEX_BACKENDS[self.index_backend]
+                self._index = index_class(self.embedding_model.dimension, self.index_path,
+                                          version=self.embedding_model.version, **self.index_params)
+            return self._index
         
-    def add_embedding(self, doc_id: int, text: str):
-        embedding = self.embedding_model.encode(text)
-        self.embeddings.append(embedding.squeeze())
-        self.doc_ids.append(doc_id)
+    @property
+    def indexed_ids(self) -> set:
+        with self._lock:
+            if self._indexed is None:
+                import numpy as np
+                from vector_index import REMOVED
+                self._indexed = set(np.unique(self.index.doc_ids).tolist()) - {REMOVED}
+            return self._indexed
         
-    def search(self, query: str, top_k: int = 3) -> List[tuple]:
-        query_embedding = self.embedding_model.encode(query)
-        doc_embeddings = np.array(self.embeddings)
-        similarities = cosine_similarity(query_embedding, doc_embeddings)[0]
-        top_k_indices = similarities.argsort()[-top_k:][::-1]
-        return [(self.doc_ids[idx], similarities[idx]) for idx in top_k_indices]
+    def add_embedding(self, doc_id: int, text: str) -> int:
+        return self.add_embeddings([doc_id], [text])
+        
+    def add_embeddings(self, doc_ids: List[int], texts: List[str]) -> int:
+        # Chunks every document not already in the index, then encodes all chunks in
+        # batches and appends them in one call. Returns the number of documents embedded.
+        # Held under the lock, so agents sharing the store never embed a document twice
+        with self._lock:
+            indexed = self.indexed_ids
+            chunk_ids, chunk_spans, chunk_texts = [], [], []
+            embedded = set()
+            for doc_id, text in zip(doc_ids, texts):
+                if doc_id in indexed or doc_id in embedded:
+                    continue
+                embedded.add(doc_id)
+                if self.chunk_size:
+                    spans = self.embedding_model.chunk_spans(text, self.chunk_size, self.chunk_overlap)
+                else:
+                    spans = [(0, len(text))]
+                for start, end in spans:
+                    chunk_ids.append(doc_id)
+                    chunk_spans.append((start, end))
+                    chunk_texts.append(text[start:end])
+            
+            if not embedded:
+                return 0
+            embeddings = self.embedding_model.encode_batch(chunk_texts)
+            self.index.add(embeddings, chunk_ids, chunk_spans)
+            indexed.update(embedded)
+            return len(embedded)
+        
+    def remove(self, doc_ids: List[int]) -> int:
+        # Drops the documents' rows from search results; returns the rows removed
+        with self._lock:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id in self.indexed_ids]
+            if not doc_ids:
+                return 0
+            self.indexed_ids.difference_update(doc_ids)
+            return self.index.remove(doc_ids)
+        
+    def prune(self, document_store: DocumentStore) -> int:
+        # Removes documents that are no longer in the store, e.g. deleted or superseded
+        # by another run, so index and store agree. Returns the number of documents removed
+        with self._lock:
+            stale = [doc_id for doc_id in self.indexed_ids if doc_id not in document_store]
+            self.remove(stale)
+            return len(stale)
+        
+    def _rows_for(self, allowed_ids):
+        # Index rows belonging to the allowed documents, or None for no filter
+        if allowed_ids is None:
+            return None
+        import numpy as np
+        allowed = np.fromiter(allowed_ids, dtype=np.int64)
+        return np.flatnonzero(np.isin(self.index.doc_ids, allowed))
+        
+    def search_chunks(self, query: str, top_k: int = 3, allowed_ids=None) -> List[tuple]:
+        # Returns the best-scoring chunks as (doc_id, (start, end), score), optionally
+        # only from the documents in allowed_ids
+        query_embedding = self.embedding_model.encode(query)[0]
+        with self._lock:
+            rows, scores = self.index.search(query_embedding, top_k, self._rows_for(allowed_ids))
+            doc_ids, spans = self.index.doc_ids, self.index.spans
+            # Removed rows are dropped, so fewer than top_k chunks may come back
+            return [
+                (int(doc_ids[row]), (int(spans[row][0]), int(spans[row][1])), float(score))
+                for row, score in zip(rows, scores) if doc_ids[row] >= 0
+            ]
+        
+    def search(self, query: str, top_k: int = 3, allowed_ids=None) -> List[tuple]:
+        # Merges chunk hits per parent document, scoring each by its best chunk. Widens
+        # the chunk candidate set until it covers top_k distinct parents. With
+        # allowed_ids (e.g. the documents matching a metadata filter) only those
+        # documents' chunks are scored
+        with tracing.span("vector.search", top_k=top_k):
+            query_embedding = self.embedding_model.encode(query)[0]
+            with self._lock:
+                doc_ids = self.index.doc_ids
+                allowed_rows = self._rows_for(allowed_ids)
+                candidates = top_k * 4
+                while True:
+                    rows, scores = self.index.search(query_embedding, candidates, allowed_rows)
+                    best = {}
+                    for row, score in zip(rows, scores):
+                        doc_id = int(doc_ids[row])
+                        if doc_id not in best and doc_id >= 0:
+                            best[doc_id] = float(score)
+                            if len(best) == top_k:
+                                return list(best.items())
+                    if candidates >= (len(self.index) if allowed_rows is None else len(allowed_rows)):
+                        return list(best.items())
+                    candidates *= 4
+
+# "dense" ranks by embedding similarity, "lexical" by BM25 alone (no query forward
+# pass, for latency-sensitive lookups), "hybrid" fuses both rankings
+RETRIEVAL_MODES = ("hybrid", "dense", "lexical")
+
+def reciprocal_rank_fusion(rankings: List[List[tuple]], top_k: int, k: int = 60) -> List[tuple]:
+    # Merges ranked (doc_id, score) lists by summing 1 / (k + rank) per document, so a
+    # document ranked well by either retriever surfaces without comparing raw scores
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+def _metadata_matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    # Every key must match; a list, tuple or set value matches any of its members
+    for key, expected in where.items():
+        value = metadata.get(key)
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
 
 # RAG Agent for generating use cases based on industry and company data
 class RAGAgent:
-    def __init__(self, industry_data: str, company_data: str):
+    def __init__(self, industry_data: str, company_data: str, api_key: str = None, cache=None,
+                 embedding_model: "SimpleEmbedding" = None, document_store: DocumentStore = None,
+                 index_path: str = DEFAULT_INDEX_PATH, model: str = "llama3-8b-8192",
+                 base_url: str = None, json_mode: bool = True, research: Dict[str, Any] = None,
+                 context_size: int = 8, retrieval: str = "hybrid", context_tokens: int = 2048,
+                 temperature: float = 0.7, max_tokens: int = 1024, top_p: float = 1,
+                 vector_store: VectorStore = None):
         self.industry_data = industry_data
         self.company_data = company_data
+        # Full IndustryResearchAgent.run() output. When given, every search result is
+        # indexed as its own record and the prompt context is the context_size best
+        # matching records instead of the two industry/company blobs
+        self.research = research
+        self.context_size = context_size
+        # Default retrieval mode, one of RETRIEVAL_MODES
+        if retrieval not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {retrieval!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+        self.retrieval = retrieval
+        # Token budget for the retrieved prompt context, filled best chunk first by a
+        # ContextPacker; None joins the retrieved documents whole
+        self.context_tokens = context_tokens
+        self.context_report: Dict[str, Any] = {}
+        # Metadata of every document this agent added, for filtered retrieval
+        self.knowledge: Dict[int, Dict[str, Any]] = {}
+        # Indexing work done and skipped by this agent's knowledge base updates
+        self.kb_report = {"documents": 0, "added": 0, "unchanged": 0, "superseded": 0,
+                          "embedded": 0, "embedding_skipped": 0, "pruned": 0}
+        # Groq chat model, sampling parameters, credentials and an optional endpoint
+        # override (e.g. a local server)
+        self.model = model
+        self.completion_params = {"temperature": temperature, "max_tokens": max_tokens, "top_p": top_p}
+        self.api_key = api_key
+        self.base_url = base_url
+        # Ask for use cases as JSON records; switched off if the backend rejects JSON mode
+        self.json_mode = json_mode
+        # Optional ResponseCache; completions are replayed from it for an identical
+        # prompt with the same model and sampling parameters
+        self.cache = cache
         
-        # Initialize components
-        self.document_store = DocumentStore()
-        self.embedding_model = SimpleEmbedding()
-        self.vector_store = VectorStore(self.embedding_model)
+        # Initialize components, reusing a loaded model and store when one is passed in
+        self.document_store = document_store if document_store is not None else DocumentStore()
+        if embedding_model is None:
+            from embedding_cache import EmbeddingCache
+            embedding_model = SimpleEmbedding(cache=EmbeddingCache())
+        self.embedding_model = embedding_model
+        # A vector_store passed in (e.g. one shared by a long-running service) is used
+        # as is and index_path is ignored; retrieval stays limited to this agent's documents
+        if vector_store is None:
+            if index_path is not None:
+                index_path = versioned_index_path(index_path, self.embedding_model.version)
+            vector_store = VectorStore(self.embedding_model, index_path=index_path)
+        self.vector_store = vector_store
         
         # Initialize knowledge base
         self._initialize_knowledge_base()
         
     def _initialize_knowledge_base(self):
-        # Add initial documents to the document store
-        industry_doc_id = self.document_store.add_document(self.industry_data, {'type': 'industry_data'})
-        company_doc_id = self.document_store.add_document(self.company_data, {'type': 'company_data'})
+        # One record per search result, tagged with its facet and result kind; without
+        # research, the industry and company documents
+        documents = explode_research(self.research) if self.research else []
+        if not documents:
+            documents = [
+                (self.industry_data, {'type': 'industry_data'}),
+                (self.company_data, {'type': 'company_data'}),
+            ]
         
-        # Generate embeddings for the documents
-        self.vector_store.add_embedding(industry_doc_id, self.industry_data)
-        self.vector_store.add_embedding(company_doc_id, self.company_data)
+        # Reconcile rather than re-add: documents already in the store are reused,
+        # changed ones supersede their old version, and only documents missing from the
+        # index are embedded
+        with tracing.span("kb.reconcile") as span:
+            self.kb_report["pruned"] += self.vector_store.prune(self.document_store)
+            self.add_knowledge_batch(documents)
+            span.set(**self.kb_report)
         
-    def add_knowledge(self, content: str, metadata: Dict[str, Any] = None):
-        doc_id = self.document_store.add_document(content, metadata)
-        self.vector_store.add_embedding(doc_id, content)
+    def add_knowledge(self, content: str, metadata: Dict[str, Any] = None) -> int:
+        return self.add_knowledge_batch([(content, metadata)])[0]
         
-    def generate_use_cases(self) -> str:
-        try:
-            # Retrieve relevant context for use case generation
-            query = "AI/ML use cases for improving customer satisfaction and operations"
-            relevant_docs = self.vector_store.search(query)
-            
-            # Build context from relevant documents
-            context = "\n\n".join([
-                self.document_store.get_document(doc_id)['content']
-                for doc_id, _ in relevant_docs
-            ])
-            
-            # Create a prompt for use case generation
-            prompt = f"""Based on the following context and data, propose specific AI/ML use cases for improving customer satisfaction and operations:
+    def add_knowledge_batch(self, documents: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        # Bulk ingestion: one document store write and batched embedding for all new documents
+        doc_ids, report = self.document_store.upsert_documents(documents)
+        if report["superseded"]:
+            self.vector_store.remove(report["superseded"])
+            for doc_id in report["superseded"]:
+                self.knowledge.pop(doc_id, None)
+        embedded = self.vector_store.add_embeddings(doc_ids, [content for content, _ in documents])
+        for doc_id, (_, metadata) in zip(doc_ids, documents):
+            self.knowledge[doc_id] = metadata or {}
+        
+        self.kb_report["documents"] += len(documents)
+        self.kb_report["added"] += report["added"]
+        self.kb_report["unchanged"] += report["unchanged"]
+        self.kb_report["superseded"] += len(report["superseded"])
+        self.kb_report["embedded"] += embedded
+        self.kb_report["embedding_skipped"] += len(set(doc_ids)) - embedded
+        return doc_ids
+        
+    def retrieve(self, query: str, top_k: int = 3, where: Dict[str, Any] = None, mode: str = None) -> List[tuple]:
+        # Top-k (doc_id, score) pairs from this agent's documents only, never other
+        # targets' or earlier runs' documents sharing the store and index. With where,
+        # only those whose metadata matches it, e.g. {'type': 'research', 'facet': 'market_size'}.
+        # mode overrides the agent's retrieval mode; hybrid scores are fused ranks, not
+        # similarities
+        mode = mode or self.retrieval
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+        allowed_ids = {doc_id for doc_id, metadata in self.knowledge.items()
+                       if where is None or _metadata_matches(metadata, where)}
+        if mode == "dense":
+            return self.vector_store.search(query, top_k, allowed_ids)
+        
+        # Hybrid fuses a wider candidate list from each retriever
+        candidates = top_k if mode == "lexical" else top_k * 4
+        with tracing.span("lexical.search", top_k=candidates):
+            lexical = self.document_store.search_lexical(query, candidates, allowed_ids)
+        if mode == "lexical":
+            return lexical
+        dense = self.vector_store.search(query, candidates, allowed_ids)
+        return reciprocal_rank_fusion([dense, lexical], top_k)
+        
+    def _context_candidate(self, doc_id: int) -> Tuple[str, str]:
+        # (label, content) of a retrieved document; the label is its facet, if any
+        document = self.document_store.get_document(doc_id)
+        if document is None:
+            return None  # superseded by another agent sharing the store
+        facet = self.knowledge.get(doc_id, {}).get('facet')
+        return (facet.replace('_', ' ') if facet else '', document['content'])
+        
+    def _score_chunks(self, query: str, documents: Dict[int, Tuple[str, str]]) -> List[tuple]:
+        # Scores every chunk of the retrieved documents against the query on its own,
+        # as (label, chunk text, score): by dense similarity of the indexed chunk rows,
+        # by BM25 over the chunks, or by fusing both ranks, following self.retrieval
+        chunk_size = self.vector_store.chunk_size or 256
+        rows = 0 if self.retrieval == "lexical" else len(self.vector_store._rows_for(documents))
+        if rows:
+            hits = self.vector_store.search_chunks(query, rows, allowed_ids=documents)
+            chunks = [(doc_id, span) for doc_id, span, _ in hits]
+            dense = [(position, score) for position, (_, _, score) in enumerate(hits)]
+        else:
+            chunks = [(doc_id, span) for doc_id, (_, content) in documents.items()
+                      for span in self.embedding_model.chunk_spans(content, chunk_size)]
+            dense = None
+        texts = [documents[doc_id][1][start:end] for doc_id, (start, end) in chunks]
+        
+        if dense is not None and self.retrieval == "dense":
+            scores = dict(dense)
+        else:
+            lexical_index = BM25Index()
+            lexical_index.add_documents(enumerate(texts))
+            # Chunks sharing no term with the query rank last in the lexical list
+            lexical = lexical_index.search(query, len(texts))
+            matched = {position for position, _ in lexical}
+            lexical += [(position, 0.0) for position in range(len(texts)) if position not in matched]
+            scores = dict(reciprocal_rank_fusion([dense, lexical], len(texts)) if dense is not None else lexical)
+        return [(documents[doc_id][0], text, scores[position])
+                for position, ((doc_id, _), text) in enumerate(zip(chunks, texts))]
+        
+    def _build_context(self, query: str, relevant_docs: List[tuple]) -> str:
+        documents = {doc_id: self._context_candidate(doc_id) for doc_id, _ in relevant_docs}
+        documents = {doc_id: candidate for doc_id, candidate in documents.items() if candidate is not None}
+        if not self.context_tokens:
+            return "\n\n".join(f"[{label}] {content}" if label else content for label, content in documents.values())
+        with tracing.span("context.pack") as span:
+            packer = ContextPacker(self.embedding_model, self.context_tokens,
+                                   chunk_size=self.vector_store.chunk_size or 256)
+            context, self.context_report = packer.pack(self._score_chunks(query, documents))
+            span.set(**self.context_report)
+        return context
+        
+    def _build_prompt(self) -> str:
+        # Retrieve relevant context for use case generation
+        query = "AI/ML use cases for improving customer satisfaction and operations"
+        if any(metadata.get('type') == 'research' for metadata in self.knowledge.values()):
+            relevant_docs = self.retrieve(query, self.context_size, where={'type': 'research'})
+        else:
+            relevant_docs = self.retrieve(query)
+        
+        # Build context from relevant documents, within the token budget
+        context = self._build_context(query, relevant_docs)
+        
+        # Create a prompt for use case generation
+        return f"""Based on the following context and data, propose specific AI/ML use cases for improving customer satisfaction and operations:
 
 Context:
 {context}
 
-Please provide detailed use cases that leverage AI/ML technologies to address specific business needs and opportunities."""
+Please provide detailed use cases that leverage AI/ML technologies to address specific business needs and opportunities.{self._format_instructions()}"""
+        
+    def _format_instructions(self) -> str:
+        if not self.json_mode:
+            return ""
+        return """
+
+Respond with a JSON object of the form {"use_cases": [{"use_case": "<title>", "impact": "<business impact>", "strategy": "<implementation strategy>", "metrics": ["<KPI>", ...], "keywords": ["<search keyword>", ...]}]}."""
+        
+    def generate_use_cases(self) -> List[UseCase]:
+        try:
+            prompt = self._build_prompt()
             
             # Generate use cases using a language model (Groq model assumed)
-            from groq import Groq
-            self.client = Groq()
-            completion = self.client.chat.completions.create(
-                model="llama3-8b-8192",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1024,
-                top_p=1,
-                stream=False
-            )
+            with tracing.span("groq.completion", stream=False, cache_hit=self.cache is not None):
+                text = self._complete(prompt)
             
-            if hasattr(completion, 'choices') and len(completion.choices) > 0:
-                use_cases = completion.choices[0].message.content
-                
-                # Store the generated use cases
-                self.add_knowledge(use_cases, {'type': 'generated_use_cases', 'timestamp': datetime.now().isoformat()})
-                
-                return use_cases
-            else:
-                print("Error: No choices found in the response")
+            if text is None:
                 return None
+            
+            # Store the raw completion, hand structured records to the later stages
+            self.add_knowledge(text, {'type': 'generated_use_cases', 'timestamp': datetime.now().isoformat()})
+            
+            return list(parse_use_cases([text]))
                 
         except Exception as e:
             print(f"Error generating use cases: {str(e)}")
             return None
+            
+    def iter_use_cases(self) -> Iterator[UseCase]:
+        # Streaming variant of generate_use_cases: yields each use case as soon as it is
+        # complete in the token stream, so consumers can start on it while the rest is
+        # still being generated. The full text is cached and stored once the stream ends
+        try:
+            prompt = self._build_prompt()
+            with tracing.span("groq.completion", stream=True) as span:
+                cached = None
+                if self.cache is not None:
+                    cached = self.cache.get(self._cache_endpoint, prompt, normalize=False)
+                span.set(cache_hit=cached is not None)
+            if cached is not None:
+                yield from parse_use_cases([cached])
+                return
+            if self.cache is not None and self.cache.offline:
+                raise OfflineCacheMiss(f"No cached completion for {self._cache_endpoint}")
+            
+            chunks = []
+            parser = UseCaseParser()
+            for delta in self._stream_completion(prompt):
+                chunks.append(delta)
+                yield from parser.feed(delta)
+            yield from parser.finish()
+            
+            use_cases = "".join(chunks)
+            if not use_cases:
+                print("Error: Empty completion stream")
+                return
+            if self.cache is not None:
+                self.cache.set(self._cache_endpoint, prompt, use_cases, normalize=False)
+            self.add_knowledge(use_cases, {'type': 'generated_use_cases', 'timestamp': datetime.now().isoformat()})
+            
+        except Exception as e:
+            print(f"Error generating use cases: {str(e)}")
+            return
+            
+    @property
+    def _cache_endpoint(self) -> str:
+        # The cache key hashes this with the prompt, so a completion is only replayed
+        # for the same model, output mode and sampling parameters
+        params = json.dumps(self.completion_params, sort_keys=True, separators=(",", ":"))
+        return f"groq:chat.completions:{self.model}" + (":json" if self.json_mode else "") + f":{params}"
+        
+    def _client(self):
+        from groq import Groq
+        options = {}
+        if self.api_key:
+            options['api_key'] = self.api_key
+        if self.base_url:
+            options['base_url'] = self.base_url
+        return Groq(**options)
+        
+    def _complete(self, prompt: str) -> str:
+        # Served from the cache when one is set. Each attempt is keyed on its own output
+        # mode, so a plain-text retry after a JSON-mode rejection is stored under the
+        # plain-text key and never replayed as a JSON-mode completion
+        from groq import BadRequestError
+        try:
+            if self.cache is not None:
+                return self.cache.fetch(self._cache_endpoint, prompt,
+                                        lambda: self._request_completion(prompt), normalize=False)
+            return self._request_completion(prompt)
+        except BadRequestError as e:
+            if not self.json_mode:
+                raise
+            # Backend or model without JSON mode: retry as plain text, which the parser also reads
+            print(f"JSON mode rejected, falling back to plain completions: {e}")
+            self.json_mode = False
+            return self._complete(prompt)
+        
+    def _request_completion(self, prompt: str) -> str:
+        self.client = self._client()
+        options = {'response_format': {"type": "json_object"}} if self.json_mode else {}
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=False,
+            **self.completion_params,
+            **options
+        )
+        
+        if hasattr(completion, 'choices') and len(completion.choices) > 0:
+            content = completion.choices[0].message.content
+            span = tracing.current_span()
+            span.set(cache_hit=False)
+            span.add("bytes_out", len(prompt.encode("utf-8")))
+            span.add("bytes_in", len((content or "").encode("utf-8")))
+            if getattr(completion, 'usage', None) is not None:
+                span.add("tokens", completion.usage.total_tokens)
+            return content
+        print("Error: No choices found in the response")
+        return None
+        
+    def _stream_completion(self, prompt: str) -> Iterator[str]:
+        # Groq does not accept response_format on streamed requests, so JSON output here
+        # relies on the prompt instructions alone. The span stays open until the stream
+        # is drained, so its wall time includes the consumer's work between chunks
+        with tracing.span("groq.stream", bytes_out=len(prompt.encode("utf-8"))) as span:
+            self.client = self._client()
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **self.completion_params
+            )
+            for chunk in stream:
+                # Groq reports usage on the final chunk under x_groq
+                usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+                if usage is not None:
+                    span.add("tokens", usage.total_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    span.add("bytes_in", len(chunk.choices[0].delta.content.encode("utf-8")))
+                    yield chunk.choices[0].delta.content
 
 # Main function for running the agent
 def main():
@@ -198,7 +783,8 @@ def main():
         if use_cases:
             print("\nGenerated Use Cases:")
             print("-" * 50)
-            print(use_cases)
+            for use_case in use_cases:
+                print(f"- {use_case.use_case}: {use_case.impact}")
         else:
             print("Failed to generate use cases.")
             
@@ -0,0 +1,377 @@
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# A numbered use-case start, e.g. "1. ...", "### 2) ...", "**Use Case 3:** ..."
+_NUMBERED_START = re.compile(r"^(?P<prefix>(?:#{1,6}\s*)?(?:\*\*)?\s*(?:use case\s*)?)\d+\s*[.:)\-]", re.I)
+# Heading, bold and "Use Case N:" / "N." markers in front of a use-case title
+_TITLE_MARKER = re.compile(r"^(?:#{1,6}\s*)?(?:\*\*)?\s*(?:(?:use case\s*\d*|\d+)\s*[.:)\-]\s*)?", re.I)
+# An unnumbered markdown heading, e.g. "### Personalized Recommendations"
+_HEADING_START = re.compile(r"^(?P<prefix>#{1,6})\s+\S")
+# A labelled field line, e.g. "* **Business Impact:** ...", "*Impact*: ..." or "Metrics:"
+_FIELD_LINE = re.compile(r"^[\s*+\-]*(?:\*\*|_)?(?P<label>[A-Za-z][A-Za-z /&()-]{0,40}?)\s*(?:\*\*|[*_])?\s*:\s*(?:\*\*)?\s*(?P<value>.*)$")
+# Bullet or numbered list item
+_LIST_ITEM = re.compile(r"^\s*(?:[*+\-]|\d+[.)])\s+(?P<value>.+)$")
+
+# Label words mapped to UseCase fields, checked in order
+_FIELD_LABELS = [
+    ("metrics", ("metric", "kpi", "key performance", "success measure", "measure")),
+    ("references", ("reference", "source")),
+    ("keywords", ("keyword", "tag")),
+    ("strategy", ("strategy", "implementation", "approach", "solution", "how")),
+    ("impact", ("impact", "benefit", "value", "outcome")),
+    ("description", ("description", "overview", "summary", "problem", "objective")),
+]
+_LIST_FIELDS = ("metrics", "references", "keywords")
+
+
+def _start_style(line: str):
+    """
+    Returns a key describing how ``line`` opens a use case, or None if it does not.
+    Only unindented lines count, so nested numbered lists are not split on.
+    """
+    if line[:1].isspace():
+        return None
+    match = _NUMBERED_START.match(line)
+    if match:
+        return "numbered:" + "".join(match.group("prefix").lower().split())
+    match = _HEADING_START.match(line)
+    if match:
+        return "heading:" + match.group("prefix")
+    return None
+
+
+def use_case_title(block: str) -> str:
+    """
+    Extracts a plain title from the first line of a use-case block.
+    """
+    first_line = block.strip().splitlines()[0] if block.strip() else ""
+    title = first_line
+    # Two passes strip both markers in lines like "1. **Use Case 1: Title**"
+    for _ in range(2):
+        title = _TITLE_MARKER.sub("", title.strip())
+    return title.replace("**", "").strip(" :*#-") or first_line.strip()
+
+
+def _field_for_label(label: str) -> Optional[str]:
+    label = label.lower()
+    for field, words in _FIELD_LABELS:
+        if any(word in label for word in words):
+            return field
+    return None
+
+
+def _is_field_line(line: str) -> bool:
+    match = _FIELD_LINE.match(line)
+    return bool(match and _field_for_label(match.group("label")))
+
+
+def _strip_outro(block: str) -> str:
+    """
+    Drops closing text after the last use case, e.g. "These use cases will help ...".
+
+    Trailing paragraphs whose first line is unindented and neither a labelled field
+    nor a list item are cut, provided a field or list item comes before them, so a
+    block that is only a title and a plain description keeps its description.
+    """
+    lines = block.splitlines()
+    structured, cut = False, None
+    for i, line in enumerate(lines[1:], start=1):
+        if not line.strip():
+            continue
+        if _LIST_ITEM.match(line) or _is_field_line(line):
+            structured, cut = True, None
+        elif structured and cut is None and not lines[i - 1].strip() and not line[:1].isspace():
+            cut = i
+    return "\n".join(lines[:cut]).strip() if cut is not None else block
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in re.split(r"[;\n]", value) if item.strip()]
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+class UseCase:
+    """
+    One generated use case, as passed between the pipeline stages.
+
+    Supports the mapping access ProposalAgent already uses for its dict inputs
+    (``use_case['impact']``, ``'metrics' in use_case``), where a field counts as
+    present only when it is non-empty.
+    """
+
+    __slots__ = ("use_case", "impact", "strategy", "description", "metrics", "references", "keywords")
+
+    def __init__(self, use_case: str, impact: str = "", strategy: str = "", description: str = "",
+                 metrics: List[str] = None, references: List[str] = None, keywords: List[str] = None):
+        self.use_case = use_case
+        self.impact = impact
+        self.strategy = strategy
+        self.description = description
+        self.metrics = metrics or []
+        self.references = references or []
+        self.keywords = keywords or []
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and bool(getattr(self, key))
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self else default
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UseCase) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"UseCase({self.use_case!r})"
+
+    @property
+    def search_query(self) -> str:
+        # Keywords make a tighter GitHub query than the full title when the model gives them
+        return " ".join(self.keywords[:4]) if self.keywords else self.use_case
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UseCase":
+        # Accepts the JSON-mode schema plus the common key variations models produce
+        fields = {}
+        for key, value in data.items():
+            field = "use_case" if key.lower() in ("use_case", "title", "name", "use case") else _field_for_label(key)
+            if field and field not in fields:
+                fields[field] = value
+        for field in _LIST_FIELDS:
+            if field in fields:
+                fields[field] = _as_list(fields[field])
+        for field in ("use_case", "impact", "strategy", "description"):
+            value = fields.get(field)
+            if isinstance(value, list):
+                fields[field] = " ".join(str(item) for item in value)
+            elif value is not None:
+                fields[field] = str(value).strip()
+        return cls(**fields) if fields.get("use_case") else None
+
+    @classmethod
+    def from_markdown(cls, block: str) -> "UseCase":
+        """
+        Parses one markdown use-case block, or a bare use-case title.
+        """
+        lines = block.strip().splitlines()
+        record = cls(use_case_title(block))
+        field = None
+        # Set once a list field's items are followed by plain text; that text is not a
+        # field value, so it is skipped until the next label
+        closed = False
+        description = []
+        for line in lines[1:]:
+            if not line.strip():
+                continue
+            match = _FIELD_LINE.match(line)
+            labelled = _field_for_label(match.group("label")) if match else None
+            if labelled:
+                field, closed = labelled, False
+                value = match.group("value").replace("**", "").strip()
+            else:
+                item = _LIST_ITEM.match(line)
+                if (not item and not line[:1].isspace() and field in _LIST_FIELDS
+                        and getattr(record, field)):
+                    closed = True
+                value = (item.group("value") if item else line).replace("**", "").strip()
+            if not value or closed:
+                continue
+            if field in _LIST_FIELDS:
+                getattr(record, field).extend(_as_list(value))
+            elif field:
+                current = getattr(record, field)
+                setattr(record, field, f"{current} {value}".strip())
+            else:
+                description.append(value)
+        record.description = " ".join(filter(None, [record.description] + description))
+        return record
+
+
+def as_use_case(item) -> UseCase:
+    """
+    Normalizes a UseCase, dict, or markdown/plain-text use case into a UseCase.
+    """
+    if isinstance(item, UseCase):
+        return item
+    if isinstance(item, dict):
+        return UseCase.from_dict(item) or UseCase(str(item))
+    return UseCase.from_markdown(str(item))
+
+
+class UseCaseStreamSplitter:
+    """
+    Incrementally splits streamed LLM markdown into one block per use case.
+
+    Text is fed as it arrives. A block is emitted as soon as the line opening the
+    next use case is complete, so downstream stages can start on use case 1 while
+    later ones are still being generated. The first line that opens a use case
+    fixes the style (numbered item or heading level), except that a leading
+    top-level ``#`` title is treated as preamble once another style appears.
+    Preamble text is discarded, and so is closing text after the last use case.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._style = None
+        self._style_confirmed = False
+        self._lines: List[str] = []
+
+    def _process_line(self, line: str) -> List[str]:
+        style = _start_style(line)
+        emitted = []
+        if style is not None and self._style is None:
+            self._style = style
+            self._lines = [line]
+        elif style is not None and style == self._style:
+            emitted.append("".join(self._lines).strip())
+            self._style_confirmed = True
+            self._lines = [line]
+        elif style is not None and not self._style_confirmed and self._style == "heading:#":
+            # The first start line was a document title, not a use case
+            self._style = style
+            self._lines = [line]
+        elif self._style is not None:
+            self._lines.append(line)
+        return [block for block in emitted if block]
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Adds streamed text and returns any use-case blocks completed by it.
+        """
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        emitted = []
+        for line in lines:
+            emitted.extend(self._process_line(line + "\n"))
+        return emitted
+
+    def finish(self) -> List[str]:
+        """
+        Flushes the final use-case block once the stream has ended.
+        """
+        emitted = self._process_line(self._buffer) if self._buffer else []
+        self._buffer = ""
+        last = _strip_outro("".join(self._lines).strip())
+        self._lines = []
+        return emitted + ([last] if last and self._style is not None else [])
+
+
+class _JsonObjectScanner:
+    """
+    Incrementally extracts the objects that are elements of a JSON array, e.g. each
+    use case in ``{"use_cases": [{...}, {...}]}``, as soon as each one closes.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._capture = None
+        self._capture_depth = 0
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        objects = []
+        for char in text:
+            if self._capture is not None:
+                self._capture.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._capture is None and self._stack and self._stack[-1] == "[":
+                    self._capture = [char]
+                    self._capture_depth = len(self._stack)
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if self._capture is not None and len(self._stack) == self._capture_depth:
+                    try:
+                        objects.append(json.loads("".join(self._capture)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._capture = None
+        return objects
+
+
+class UseCaseParser:
+    """
+    Incrementally turns streamed LLM output into UseCase records.
+
+    The format is detected from the first non-whitespace text: JSON (optionally in
+    a code fence) is scanned object by object, anything else is split into markdown
+    blocks. Each record is returned as soon as it is complete in the stream.
+    """
+
+    def __init__(self):
+        self._mode = None
+        self._pending = ""
+        self._json = _JsonObjectScanner()
+        self._markdown = UseCaseStreamSplitter()
+
+    def _records(self, items) -> List[UseCase]:
+        if self._mode == "json":
+            records = [UseCase.from_dict(item) for item in items if isinstance(item, dict)]
+        else:
+            records = [UseCase.from_markdown(block) for block in items]
+        return [record for record in records if record is not None]
+
+    def feed(self, text: str) -> List[UseCase]:
+        if self._mode is None:
+            self._pending += text
+            stripped = self._pending.lstrip()
+            if not stripped or (stripped.startswith("`") and len(stripped) < 8):
+                return []
+            self._mode = "json" if stripped[0] in "{[" or stripped.startswith("```json") else "markdown"
+            text, self._pending = self._pending, ""
+        if self._mode == "json":
+            return self._records(self._json.feed(text))
+        return self._records(self._markdown.feed(text))
+
+    def finish(self) -> List[UseCase]:
+        if self._mode is None and self._pending.strip():
+            records = self.feed("")
+            if self._mode is None:
+                self._mode = "markdown"
+                records = self._records(self._markdown.feed(self._pending))
+            return records + self.finish()
+        if self._mode == "markdown":
+            return self._records(self._markdown.finish())
+        return []
+
+
+def parse_use_cases(chunks: Iterable[str]) -> Iterator[UseCase]:
+    """
+    Yields UseCase records from an iterable of streamed text chunks.
+    """
+    parser = UseCaseParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.finish()
+
+
+def split_use_cases(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Yields use-case blocks from an iterable of streamed text chunks.
+    """
+    splitter = UseCaseStreamSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.finish()
@@ -0,0 +1,318 @@
+import json
+import os
+from array import array
+from typing import List, Tuple
+
+import numpy as np
+
+# Columns of the per-row metadata matrix; IVFIndex adds the row's inverted list
+DOC_ID, SPAN_START, SPAN_END, LIST_ID = range(4)
+# Doc id of a removed row
+REMOVED = -1
+
+_EMPTY = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+    # Positions of the top_k highest scores, best first
+    if top_k < len(scores):
+        best = np.argpartition(scores, -top_k)[-top_k:]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(scores[best])[::-1]]
+
+
+class FlatIndex:
+    """
+    Exact inner-product index over normalized float32 vectors.
+
+    With a ``path`` the index lives on disk as three files: ``<path>.vectors`` (a
+    preallocated float32 matrix opened with ``np.memmap``), ``<path>.meta`` (an int64
+    matrix holding each row's doc id and character span) and ``<path>.json`` (a small
+    header with the dimension, row count and embedding version). Capacity doubles when
+    full, so appends are amortized O(1), and reopening maps the files without reading
+    them. Without a ``path`` the same layout is kept in memory.
+
+    Args:
+        dimension (int): Length of every vector.
+        path (str): File prefix for the persisted index, or None for in-memory.
+        initial_capacity (int): Rows preallocated before the first growth.
+        version (str): Embedding model/backend the vectors come from. Opening an index
+            written with a different version raises, so embedding spaces never mix.
+    """
+
+    META_COLUMNS = 3
+
+    def __init__(self, dimension: int, path: str = None, initial_capacity: int = 1024, version: str = None):
+        self.dimension = dimension
+        self.path = path
+        self.version = version
+        self.count = 0
+        capacity = initial_capacity
+
+        if path and os.path.exists(self._header_path):
+            with open(self._header_path) as f:
+                header = json.load(f)
+            if header["dimension"] != dimension:
+                raise ValueError(
+                    f"Index at {path} has dimension {header['dimension']}, expected {dimension}"
+                )
+            if header.get("meta_columns", 3) != self.META_COLUMNS:
+                raise ValueError(f"Index at {path} was written by a different index backend")
+            # Headers from before versioning carry none and are adopted as they are
+            if version and header.get("version", version) != version:
+                raise ValueError(
+                    f"Index at {path} holds {header['version']} embeddings, expected {version}"
+                )
+            self.version = version or header.get("version")
+            self.count = header["count"]
+            capacity = header["capacity"]
+        self._open(capacity)
+
+    @property
+    def _header_path(self) -> str:
+        return f"{self.path}.json"
+
+    def _open(self, capacity: int):
+        self.capacity = capacity
+        if not self.path:
+            vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            meta = np.zeros((capacity, self.META_COLUMNS), dtype=np.int64)
+            if self.count:
+                vectors[:self.count] = self.vectors[:self.count]
+                meta[:self.count] = self.meta[:self.count]
+            self.vectors, self.meta = vectors, meta
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.vectors = self._map(f"{self.path}.vectors", np.float32, (capacity, self.dimension))
+        self.meta = self._map(f"{self.path}.meta", np.int64, (capacity, self.META_COLUMNS))
+
+    @staticmethod
+    def _map(filename: str, dtype, shape) -> np.memmap:
+        # Extend (or create) the file to the full capacity, then map it read-write
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(filename, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(filename, dtype=dtype, mode="r+", shape=shape)
+
+    def _write_header(self):
+        if not self.path:
+            return
+        self.vectors.flush()
+        self.meta.flush()
+        # Rows past the recorded count are ignored, so a crash before this point
+        # leaves the previous, consistent index
+        tmp_path = f"{self._header_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dimension": self.dimension, "count": self.count, "capacity": self.capacity,
+                       "meta_columns": self.META_COLUMNS, "version": self.version}, f)
+        os.replace(tmp_path, self._header_path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def doc_ids(self) -> np.ndarray:
+        return self.meta[:self.count, DOC_ID]
+
+    @property
+    def spans(self) -> np.ndarray:
+        return self.meta[:self.count, SPAN_START:SPAN_END + 1]
+
+    def add(self, vectors: np.ndarray, doc_ids: List[int], spans: List[Tuple[int, int]]):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        n = len(vectors)
+        if n == 0:
+            return
+        if self.count + n > self.capacity:
+            if self.path:
+                # Drop the old maps before the files are extended and remapped
+                self.vectors.flush()
+                self.meta.flush()
+                del self.vectors, self.meta
+            self._open(max(self.count + n, self.capacity * 2))
+
+        rows = slice(self.count, self.count + n)
+        self.vectors[rows] = vectors
+        self.meta[rows, DOC_ID] = doc_ids
+        self.meta[rows, SPAN_START:SPAN_END + 1] = spans
+        self._on_add(rows, vectors)
+        self.count += n
+        self._write_header()
+
+    def _on_add(self, rows: slice, vectors: np.ndarray):
+        # Hook for subclasses that maintain extra per-row state
+        pass
+
+    def remove(self, doc_ids: List[int]) -> int:
+        """
+        Tombstones every row of the given documents: the row's doc id becomes REMOVED
+        and its vector zero, and callers skip such rows. The rows keep their space
+        until the index is rebuilt. Returns the number of rows removed.
+        """
+        if self.count == 0 or not doc_ids:
+            return 0
+        rows = np.flatnonzero(np.isin(self.doc_ids, np.asarray(list(doc_ids), dtype=np.int64)))
+        if len(rows) == 0:
+            return 0
+        self.meta[rows, DOC_ID] = REMOVED
+        self.vectors[rows] = 0
+        self._write_header()
+        return len(rows)
+
+    def search(self, query: np.ndarray, top_k: int, rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the row indices and scores of the ``top_k`` best rows, best first.
+        With ``rows``, only those row indices are scored, e.g. to apply a metadata filter.
+        """
+        if self.count == 0 or top_k <= 0 or (rows is not None and len(rows) == 0):
+            return _EMPTY
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if rows is None:
+            scores = self.vectors[:self.count] @ query
+            best = _top_k(scores, top_k)
+            return best, scores[best]
+        rows = np.sort(np.asarray(rows, dtype=np.int64))  # sequential access into the matrix
+        scores = self.vectors[rows] @ query
+        best = _top_k(scores, top_k)
+        return rows[best], scores[best]
+
+
+class IVFIndex(FlatIndex):
+    """
+    Approximate inverted-file index (IVF-flat) over the same storage as FlatIndex.
+
+    Rows are partitioned into ``nlist`` clusters by spherical k-means. A query scores
+    the centroids, then scans only the rows of the ``nprobe`` closest clusters, so
+    latency scales with ``nprobe / nlist`` of the corpus. Raising ``nprobe`` trades
+    latency for recall; ``nprobe == nlist`` is exact.
+
+    The index searches exhaustively until it holds ``train_size`` rows, then trains
+    once and from then on assigns new rows to their nearest centroid on insert. Call
+    ``train()`` again to re-cluster after the corpus has drifted or grown a lot.
+
+    Args:
+        dimension (int): Length of every vector.
+        path (str): File prefix for the persisted index, or None for in-memory.
+        nlist (int): Number of clusters.
+        nprobe (int): Clusters scanned per query.
+        train_size (int): Row count that triggers training. Defaults to ``39 * nlist``.
+        iterations (int): k-means iterations per training run.
+        initial_capacity (int): Rows preallocated before the first growth.
+        version (str): Embedding model/backend the vectors come from.
+    """
+
+    META_COLUMNS = 4
+
+    def __init__(self, dimension: int, path: str = None, nlist: int = 100, nprobe: int = 8,
+                 train_size: int = None, iterations: int = 10, initial_capacity: int = 1024,
+                 version: str = None):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or 39 * nlist
+        self.iterations = iterations
+        self.centroids = None
+        self._lists = []
+        super().__init__(dimension, path, initial_capacity, version)
+
+        if path and os.path.exists(self._centroids_path):
+            self.centroids = np.load(self._centroids_path)
+            self.nlist = len(self.centroids)
+            self._build_lists()
+
+    @property
+    def _centroids_path(self) -> str:
+        return f"{self.path}.centroids.npy"
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _build_lists(self):
+        # One growable int64 row list per cluster, filled from the stored assignments
+        assignments = self.meta[:self.count, LIST_ID]
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(self.nlist + 1))
+        self._lists = [array("q", order[bounds[c]:bounds[c + 1]].tolist()) for c in range(self.nlist)]
+
+    def _nearest_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def train(self, seed: int = 0):
+        """
+        Clusters the stored rows with spherical k-means and reassigns every row.
+        """
+        if self.count == 0:
+            return
+        rng = np.random.default_rng(seed)
+        nlist = min(self.nlist, self.count)
+        sample_size = min(self.count, max(self.train_size, 64 * nlist))
+        sample = np.asarray(self.vectors[np.sort(rng.choice(self.count, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignments, kind="stable")
+            clusters, starts = np.unique(assignments[order], return_index=True)
+            sums = np.zeros_like(centroids)
+            sums[clusters] = np.add.reduceat(sample[order], starts, axis=0)
+            empty = ~sums.any(axis=1)
+            # Reseed empty clusters from random sample rows
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        self.centroids = centroids.astype(np.float32)
+        self.nlist = nlist
+        for start in range(0, self.count, 65536):
+            rows = slice(start, min(start + 65536, self.count))
+            self.meta[rows, LIST_ID] = self._nearest_centroids(np.asarray(self.vectors[rows]))
+        self._build_lists()
+        if self.path:
+            np.save(self._centroids_path, self.centroids)
+            self._write_header()
+
+    def _on_add(self, rows: slice, vectors: np.ndarray):
+        if not self.is_trained:
+            return
+        assignments = self._nearest_centroids(vectors)
+        self.meta[rows, LIST_ID] = assignments
+        for row, cluster in zip(range(rows.start, rows.stop), assignments):
+            self._lists[cluster].append(row)
+
+    def add(self, vectors: np.ndarray, doc_ids: List[int], spans: List[Tuple[int, int]]):
+        super().add(vectors, doc_ids, spans)
+        if not self.is_trained and self.count >= self.train_size:
+            self.train()
+
+    def search(self, query: np.ndarray, top_k: int, rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        # A filter smaller than the expected probe is cheaper, and exact, to scan directly
+        if not self.is_trained or self.nprobe >= self.nlist or \
+                (rows is not None and len(rows) * self.nlist <= self.count * self.nprobe):
+            return super().search(query, top_k, rows)
+        if self.count == 0 or top_k <= 0:
+            return _EMPTY
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        probes = np.argpartition(self.centroids @ query, -self.nprobe)[-self.nprobe:]
+        candidates = np.concatenate([np.frombuffer(self._lists[c], dtype=np.int64) for c in probes])
+        if rows is not None:
+            allowed = np.zeros(self.count, dtype=bool)
+            allowed[rows] = True
+            candidates = candidates[allowed[candidates]]
+        if len(candidates) == 0:
+            return _EMPTY
+        candidates.sort()  # sequential access into the memory-mapped matrix
+        scores = self.vectors[candidates] @ query
+        best = _top_k(scores, top_k)
+        return candidates[best], scores[best]
+
+
+# Index backends selectable by name in VectorStore
+INDEX_BACKENDS = {
+    "flat": FlatIndex,
+    "ivf": IVFIndex,
+}